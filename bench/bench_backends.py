@@ -0,0 +1,80 @@
+"""
+Running loop and call heavy programs with each interpreter backend.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_parser import PlaygroundParser
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+PROGRAMS = {
+    "while loop arithmetic": """
+        i = 0; total = 0;
+        while (i < 20000) {
+            total = total + i * 2 % 7;
+            if (total > 1000 and i > 3) { total = total - 1000; }
+            i = i + 1;
+        }
+        print(total);
+    """,
+    "recursive calls": """
+        def fib(n){
+            r = n;
+            if (n > 1) { r = fib(n - 1) + fib(n - 2); }
+            return r;
+        }
+        print(fib(18));
+    """,
+    "method calls": """
+        Class Counter {
+            count = 0;
+            def add(k){ this.count = count + k; }
+        }
+        c = Counter();
+        i = 0;
+        while (i < 5000) { c.add(i); i = i + 1; }
+        print(c.count);
+    """,
+    "dotted access": """
+        Class Point {
+            x; y;
+            def Point(x, y){ this.x = x; this.y = y; }
+            def norm(){ return x * x + y * y; }
+        }
+        p = Point(3, 4); q = Point(5, 6);
+        i = 0; total = 0;
+        while (i < 5000) {
+            total = total + p.x + q.y + p.norm();
+            i = i + 1;
+        }
+        print(total);
+    """,
+}
+
+
+def parse(source):
+    parser = PlaygroundParser(input_str=source)
+    parser.testing = True
+    return parser.program()
+
+
+def run(root, backend):
+    interp = PlaygroundInterpreter(backend=backend)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp._program(root)
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    for title, source in PROGRAMS.items():
+        root = parse(source)
+        outputs = {backend: run(root, backend) for backend in BACKENDS}
+        assert len(set(outputs.values())) == 1, outputs
+
+        rows = [
+            (backend, best_of(lambda: run(root, backend), repeat=3))
+            for backend in BACKENDS
+        ]
+        report(title, rows)
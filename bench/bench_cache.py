@@ -0,0 +1,37 @@
+"""
+Importing a large generated class library, with and without the AST cache.
+"""
+import os
+import tempfile
+
+from bench_util import generated_module, best_of, report
+
+import playground_cache
+from playground_interpreter import PlaygroundInterpreter
+
+
+def run_import(library, use_cache):
+    pgp = PlaygroundInterpreter(use_cache=use_cache)
+    pgp.interp(input_str=f'import "{library}";')
+
+
+def cold_import(library):
+    playground_cache.clear(library)
+    run_import(library, use_cache=True)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        library = os.path.join(tmp, "library.plgd")
+        with open(library, "w") as f:
+            f.write(generated_module())
+
+        rows = [
+            ("no cache", best_of(lambda: run_import(library, use_cache=False))),
+            ("cold cache (parse + store)", best_of(lambda: cold_import(library))),
+            ("warm cache (load)", best_of(lambda: run_import(library, use_cache=True))),
+        ]
+        report(f"Importing a {os.path.getsize(library) / 1024:.0f} KiB module", rows)
+
+        for entry in playground_cache.info(library):
+            print(f"cache entry: {entry['entry_size'] / 1024:.0f} KiB")
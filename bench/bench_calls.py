@@ -0,0 +1,56 @@
+"""
+Loops of plain function and constructor calls, run with the call sites'
+caches, and with every call resolving its target again (as each one did
+before call caches: resolving its name through the scope chain, then
+picking the function for its number of arguments). Each row also gives
+the share of calls the caches answered.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+PROGRAM = """
+Class Pair {
+    a; b;
+    def Pair(a, b){ }
+}
+def sq(x){ return x * x; }
+def sq(x, y){ return x * y; }
+def dist(p){ return sq(p.a) + sq(p.b, p.b); }
+def step(i){ return Pair(i % 7, i % 5); }
+i = 0; t = 0;
+while (i < 3000) {
+    t = t + dist(step(i)) + sq(i % 3);
+    i = i + 1;
+}
+print(t);
+"""
+
+
+def run(backend, cached):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend)
+    if not cached:
+        interp._call_target = interp._resolve_call
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=PROGRAM)
+    return out.getvalue(), interp.call_cache_stats()
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        out, stats = run(backend, cached=True)
+        assert out == run(backend, cached=False)[0]
+        calls = stats["hits"] + stats["misses"]
+        report(
+            f"{backend} backend",
+            [
+                ("resolved every call", best_of(lambda: run(backend, False), repeat=3)),
+                (
+                    f"call caches ({stats['hits'] / calls:.1%} hits)",
+                    best_of(lambda: run(backend, True), repeat=3),
+                ),
+            ],
+        )
@@ -0,0 +1,71 @@
+"""
+Functions that define a nested function, and a class with a few methods,
+each time they are called. The tree-walker and the VM make the PG_Function
+of each def once, and only bind it again when the def runs again; here with
+that, and with a new PG_Function made every time (as before), through a
+table of made functions that never keeps any. The closure backend makes
+them when it compiles the def, so it isn't compared.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter
+
+PROGRAM = """
+def outer(a){
+    def inner(b){ return a * b; }
+    def twice(b){ return inner(b) + inner(b); }
+    return twice(a % 7);
+}
+def make(a){
+    Class Vec {
+        x; y;
+        def Vec(x, y){ }
+        def dot(o){ return x * o.x + y * o.y; }
+        def scaled(k){ return Vec(x * k, y * k); }
+        def sum(){ return x + y; }
+    }
+    v = Vec(a, a + 1);
+    return v.dot(v);
+}
+i = 0; t = 0;
+while (i < 2000) {
+    t = t + outer(i) + make(i % 5);
+    i = i + 1;
+}
+print(t);
+"""
+
+
+class Forgetful(dict):
+    """A table of made functions that never keeps any"""
+
+    def get(self, key, default=None):
+        return default
+
+    def __setitem__(self, key, value):
+        pass
+
+
+def run(backend, hoisted):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend)
+    if not hoisted:
+        interp.functions = Forgetful()
+        interp.vm.functions = Forgetful()
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=PROGRAM)
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    for backend in ("tree", "vm"):
+        assert run(backend, True) == run(backend, False)
+        report(
+            f"{backend} backend",
+            [
+                ("a new function every def", best_of(lambda: run(backend, False), repeat=3)),
+                ("functions made once per def", best_of(lambda: run(backend, True), repeat=3)),
+            ],
+        )
@@ -0,0 +1,37 @@
+"""
+Parsing expression heavy code, and a deeply parenthesized expression.
+"""
+import sys
+
+from bench_util import letters, best_of, report
+
+from playground_parser import PlaygroundParser
+
+EXPR_TEMPLATE = (
+    "v{tag} = (a + b * {n} - c / 2) >= (d % 3 + {n}.5) and (e < f or g == h) "
+    "or (i * (j + (k - l)) <= {n});\n"
+)
+
+
+def expression_module(n_lines=2000):
+    return "".join(EXPR_TEMPLATE.format(n=n, tag=letters(n)) for n in range(n_lines))
+
+
+def parse(source):
+    parser = PlaygroundParser(input_str=source)
+    parser.testing = True
+    return parser.program()
+
+
+if __name__ == "__main__":
+    source = expression_module()
+    rows = [("expression heavy module", best_of(lambda: parse(source)))]
+    report(f"Parsing {len(source)} chars of expressions", rows)
+
+    depth = 10 * sys.getrecursionlimit()
+    nested = "(" * depth + "1 + 2" + ")" * depth + ";"
+    try:
+        seconds = best_of(lambda: parse(nested))
+        print(f"{depth} nested parentheses parsed in {seconds * 1000:.2f} ms")
+    except Exception as e:
+        print(f"{depth} nested parentheses failed to parse: {type(e).__name__}")
@@ -0,0 +1,62 @@
+"""
+Globals read from deep scope chains: a recursive function, and methods
+called from inside it, reading global constants and calling global
+functions. Run with the load sites' global caches, and with every load
+looking its name up in each scope up to the globals (as each one did before
+global caches). Each row also gives the share of loads the caches answered,
+and how many scopes each of those didn't look the name up in, on average.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+PROGRAM = """
+LIMIT = 40; STEP = 3; BASE = 7;
+Class Acc {
+    total = 0;
+    def Acc(){ }
+    def add(v){ this.total = total + v % BASE + STEP; }
+}
+def clamp(v){ if (v > LIMIT) { return LIMIT; } return v; }
+def walk(n, acc){
+    if (n == 0) { return 0; }
+    acc.add(clamp(n * STEP));
+    return walk(n - 1, acc) + BASE;
+}
+acc = Acc();
+i = 0; t = 0;
+while (i < 100) {
+    t = t + walk(30, acc);
+    i = i + 1;
+}
+print(t, acc.total);
+"""
+
+
+def run(backend, cached):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend)
+    if not cached:
+        interp._load_global = lambda cache: interp.current_space.resolve(cache.name)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=PROGRAM)
+    return out.getvalue(), interp.global_cache_stats()
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        out, stats = run(backend, cached=True)
+        assert out == run(backend, cached=False)[0]
+        report(
+            f"{backend} backend",
+            [
+                ("looked up in every scope", best_of(lambda: run(backend, False), repeat=3)),
+                (
+                    f"global caches ({stats['hit_rate']:.1%} hits,"
+                    f" {stats['depth_avoided']:.1f} scopes avoided)",
+                    best_of(lambda: run(backend, True), repeat=3),
+                ),
+            ],
+        )
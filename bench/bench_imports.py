@@ -0,0 +1,69 @@
+"""
+Importing a layered graph of modules, where every module imports every
+module of the layer below it: the shared modules at the bottom are reached
+along many paths, as in a diamond. Each module is run once, however many
+times it is imported; PlaygroundInterpreter.import_stats() shows the time
+spent in each.
+"""
+import os
+import tempfile
+
+from bench_util import CLASS_TEMPLATE, letters, best_of, report
+
+from playground_interpreter import PlaygroundInterpreter
+
+LAYERS = 4
+WIDTH = 3
+CLASSES_PER_MODULE = 5
+
+
+def write_graph(directory):
+    """
+    Writes the modules of the graph to 'directory'; returns the path of the
+    module at its top, which imports the first layer
+    """
+    n = 0
+    below = []
+    for layer in reversed(range(LAYERS)):
+        modules = []
+        for i in range(WIDTH):
+            module = os.path.join(directory, f"layer{layer}_{i}.plgd")
+            imports = "".join(f'import "{path}";\n' for path in below)
+            classes = ""
+            for _ in range(CLASSES_PER_MODULE):
+                classes += CLASS_TEMPLATE.format(n=n, tag=letters(n))
+                n += 1
+            with open(module, "w") as f:
+                f.write(imports + classes)
+            modules.append(module)
+        below = modules
+
+    top = os.path.join(directory, "top.plgd")
+    with open(top, "w") as f:
+        f.write("".join(f'import "{path}";\n' for path in below))
+    return top
+
+
+def run(top):
+    pgp = PlaygroundInterpreter()
+    pgp.interp_file(top)
+    return pgp
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        top = write_graph(tmp)
+        run(top)  # Fill the AST cache
+
+        report(
+            f"{LAYERS} layers of {WIDTH} modules, each importing the layer below",
+            [("import graph", best_of(lambda: run(top)))],
+        )
+
+        stats = run(top).import_stats()
+        print(f"{'module':<20} {'parse ms':>9} {'run ms':>9} {'imports':>8}")
+        for module_path, module in stats.items():
+            print(
+                f"{os.path.basename(module_path):<20} {module['parse'] * 1000:9.2f}"
+                f" {module['run'] * 1000:9.2f} {module['imports']:8}"
+            )
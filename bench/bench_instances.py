@@ -0,0 +1,69 @@
+"""
+Memory per instance, and instantiation rate, of Playground class instances.
+"""
+import contextlib
+import io
+import tracemalloc
+from os import path
+
+from bench_util import EXAMPLES_DIR, best_of, report
+
+from playground_parser import PlaygroundParser
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+N_INSTANCES = 2000
+
+LOOP = f"""
+i = 0; p = 0; q = 0;
+while (i < {N_INSTANCES}) {{
+    p = Point(i, i + 1);
+    q = Point();
+    i = i + 1;
+}}
+print(p.to_str());
+"""
+
+
+def parse(source):
+    parser = PlaygroundParser(input_str=source)
+    parser.testing = True
+    return parser.program()
+
+
+def point_interpreter():
+    """
+    Returns an interpreter with class Point, from examples/ex_module_Point.plgd,
+    defined, and the node of an expression instantiating it
+    """
+    with open(path.join(EXAMPLES_DIR, "ex_module_Point.plgd")) as module:
+        source = module.read()
+    interp = PlaygroundInterpreter()
+    interp._program(parse(source))
+    return interp, parse("p = Point(3, 4);").children[0].children[1]
+
+
+def bytes_per_instance():
+    interp, node = point_interpreter()
+    instances = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(N_INSTANCES):
+        instances.append(interp._exec(node))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / N_INSTANCES
+
+
+def run(root, backend):
+    interp = PlaygroundInterpreter(backend=backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interp._program(root)
+
+
+if __name__ == "__main__":
+    print(f"Point instance: {bytes_per_instance():.0f} bytes\n")
+
+    with open(path.join(EXAMPLES_DIR, "ex_module_Point.plgd")) as module:
+        root = parse(module.read() + LOOP)
+    rows = [(backend, best_of(lambda: run(root, backend))) for backend in BACKENDS]
+    report(f"Instantiating Point {N_INSTANCES * 2} times", rows)
@@ -0,0 +1,81 @@
+"""
+A program that imports a handful of large library modules, each of which
+does some work at its top level when it runs, but only uses one function
+from one of them.
+
+Importing everything runs every module; a selective import, from "..."
+import name;, binds fewer names but still runs the module it names. With
+lazy imports (PlaygroundInterpreter(lazy_imports=True)) a module is only
+parsed when it is imported, and runs when one of its names is first used,
+so the modules the program never touches never run.
+"""
+import os
+import tempfile
+
+from bench_util import generated_module, letters, best_of, report
+
+from playground_interpreter import PlaygroundInterpreter
+
+LIBRARIES = 8
+CLASSES_PER_LIBRARY = 25
+
+# Top level work each library does when it runs
+SETUP = """
+table = 0;
+i = 0;
+while (i < 500) {{ table = table + helper_{tag}(i, 2, 3); i = i + 1; }}
+"""
+
+
+def write_libraries(directory):
+    """
+    Writes the library modules to 'directory'; returns their paths
+    """
+    libraries = []
+    for n in range(LIBRARIES):
+        library = os.path.join(directory, f"lib{n}.plgd")
+        with open(library, "w") as f:
+            f.write(generated_module(CLASSES_PER_LIBRARY))
+            f.write(SETUP.format(tag=letters(0)))
+        libraries.append(library)
+    return libraries
+
+
+def write_program(directory, libraries, selective):
+    program = os.path.join(directory, f"main_{'from' if selective else 'all'}.plgd")
+    with open(program, "w") as f:
+        for library in libraries:
+            if selective:
+                f.write(f'from "{library}" import helper_{letters(1)};\n')
+            else:
+                f.write(f'import "{library}";\n')
+        f.write(f"x = helper_{letters(1)}(1, 2, 3);\n")
+    return program
+
+
+def run(program, lazy_imports=False):
+    pgp = PlaygroundInterpreter(lazy_imports=lazy_imports)
+    pgp.interp_file(program)
+    return pgp
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        libraries = write_libraries(tmp)
+        import_all = write_program(tmp, libraries, selective=False)
+        import_from = write_program(tmp, libraries, selective=True)
+        run(import_all)  # Fill the AST cache
+
+        report(
+            f"Import {LIBRARIES} libraries of {CLASSES_PER_LIBRARY} classes, use one function",
+            [
+                ("import, eager", best_of(lambda: run(import_all))),
+                ("from ... import, eager", best_of(lambda: run(import_from))),
+                ("import, lazy", best_of(lambda: run(import_all, lazy_imports=True))),
+                ("from ... import, lazy", best_of(lambda: run(import_from, lazy_imports=True))),
+            ],
+        )
+
+        stats = run(import_all, lazy_imports=True).import_stats()
+        ran = sum(1 for module in stats.values() if module["run"] > 0)
+        print(f"Lazy imports ran {ran} of {len(stats)} modules")
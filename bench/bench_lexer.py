@@ -0,0 +1,58 @@
+"""
+Lexer throughput: the regex driven PlaygroundLexer (one token at a time, and
+tokenize_all() into a PG_TokenBuffer) against the original char-at-a-time
+lexer (PlaygroundCharLexer), on a large generated module.
+
+Also reports the memory needed to hold the whole token stream.
+"""
+import tracemalloc
+
+from bench_util import generated_module, best_of, report
+
+from playground_lexer import PlaygroundLexer, PlaygroundCharLexer
+from playground_token import PG_Type as PGT
+
+
+def lex_all(lexer_class, source):
+    lexer = lexer_class(source)
+    tokens = [lexer.next_token()]
+    while tokens[-1].type != PGT.EOF:
+        tokens.append(lexer.next_token())
+    return tokens
+
+
+def tokenize_all(source):
+    return PlaygroundLexer(source).tokenize_all()
+
+
+def retained_memory(fn):
+    tracemalloc.start()
+    result = fn()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+if __name__ == "__main__":
+    source = generated_module()
+    n_tokens = len(lex_all(PlaygroundLexer, source))
+    assert n_tokens == len(lex_all(PlaygroundCharLexer, source))
+    assert n_tokens == len(tokenize_all(source))
+
+    rows = [
+        ("PlaygroundCharLexer", best_of(lambda: lex_all(PlaygroundCharLexer, source))),
+        ("PlaygroundLexer", best_of(lambda: lex_all(PlaygroundLexer, source))),
+        ("PlaygroundLexer.tokenize_all", best_of(lambda: tokenize_all(source))),
+    ]
+    report(f"Lexing {len(source)} chars, {n_tokens} tokens", rows)
+    for label, seconds in rows:
+        print(f"{label:<32} {n_tokens / seconds:12.0f} tokens/s")
+    print()
+
+    memory = [
+        ("list of PG_Token", retained_memory(lambda: lex_all(PlaygroundLexer, source))),
+        ("PG_TokenBuffer", retained_memory(lambda: tokenize_all(source))),
+    ]
+    for label, size in memory:
+        print(f"{label:<32} {size / 1024:10.1f} KiB for the token stream")
@@ -0,0 +1,53 @@
+"""
+Recursive functions that solve the same subproblems over and over: naive
+Fibonacci, and counting the paths through a grid. Defined with def, every
+call runs; defined with memo def, each subproblem runs once and the rest
+are memo table hits. A memo table too small to hold the subproblems still
+in use (memo_size=8, for a grid 10 wide) shows what eviction costs.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+FIB = """
+{def} fib(n){{
+    if (n < 2) {{ return n; }}
+    return fib(n - 1) + fib(n - 2);
+}}
+{def} paths(x, y){{
+    if (x == 0 or y == 0) {{ return 1; }}
+    return paths(x - 1, y) + paths(x, y - 1);
+}}
+print(fib(16), paths(10, 6));
+"""
+
+PROGRAMS = [
+    ("def", FIB.format(**{"def": "def"}), {}),
+    ("memo def", FIB.format(**{"def": "memo def"}), {}),
+    ("memo def, memo_size=8", FIB.format(**{"def": "memo def"}), {"memo_size": 8}),
+]
+
+
+def run(source, backend, **kwargs):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend, **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=source)
+    return out.getvalue(), interp
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        outputs = {run(source, backend, **kwargs)[0] for label, source, kwargs in PROGRAMS}
+        assert len(outputs) == 1, outputs
+        rows = [
+            (label, best_of(lambda: run(source, backend, **kwargs), repeat=3))
+            for label, source, kwargs in PROGRAMS
+        ]
+        report(f"{backend} backend", rows)
+
+    label, source, kwargs = PROGRAMS[2]
+    for name, stats in run(source, "vm", **kwargs)[1].memo_stats().items():
+        print(f"{label}: {name} {stats}")
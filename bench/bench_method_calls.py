@@ -0,0 +1,48 @@
+"""
+Method calls and field accesses on instances, each of which pushes a scope
+for the instance (a PG_InstanceScope) and one for the call, with and
+without PlaygroundInterpreter(track_scopes=True), which also keeps every
+scope in its parent's children list while it is pushed.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+PROGRAM = """
+Class Counter {
+    n = 0;
+    def Counter(){ }
+    def add(k){ this.n = n + k; return n; }
+    def get(){ return n; }
+}
+c = Counter(); d = Counter();
+i = 0;
+while (i < 5000) {
+    c.add(i % 3);
+    d.add(c.get() % 5);
+    i = i + 1;
+}
+print(c.n, d.get());
+"""
+
+
+def run(backend, track_scopes):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend, track_scopes=track_scopes)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=PROGRAM)
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        assert run(backend, False) == run(backend, True)
+        report(
+            f"{backend} backend",
+            [
+                ("track_scopes=True", best_of(lambda: run(backend, True), repeat=5)),
+                ("track_scopes=False", best_of(lambda: run(backend, False), repeat=5)),
+            ],
+        )
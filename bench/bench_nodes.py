@@ -0,0 +1,72 @@
+"""
+Memory per node, and time to build, of PG_AST trees and typed node trees.
+"""
+from sys import getsizeof
+
+from bench_util import generated_module, best_of, report
+
+from playground_parser import PlaygroundParser
+from playground_nodes import from_pg_ast
+
+
+def parse(source):
+    parser = PlaygroundParser(input_str=source)
+    parser.testing = True
+    return parser.program()
+
+
+def object_size(obj):
+    size = getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += getsizeof(obj.__dict__)
+    return size
+
+
+def pg_ast_size(t):
+    """
+    Returns the (node count, bytes) of the PG_AST tree rooted at 't';
+    nodes and their children lists, not the tokens they share
+    """
+    count, size = 1, object_size(t) + getsizeof(t.children)
+    for child in t.children:
+        child_count, child_size = pg_ast_size(child)
+        count, size = count + child_count, size + child_size
+    return count, size
+
+
+def typed_size(node):
+    count, size = 1, object_size(node)
+    for field in node.fields:
+        value = getattr(node, field)
+        if type(value) is list:
+            size += getsizeof(value)
+    for child in node.child_nodes():
+        child_count, child_size = typed_size(child)
+        count, size = count + child_count, size + child_size
+    return count, size
+
+
+if __name__ == "__main__":
+    source = generated_module(n_classes=400)
+    pg_ast = parse(source)
+    typed = from_pg_ast(pg_ast)
+
+    # The typed tree has fewer nodes: names, params and argument lists are
+    # folded into the nodes that own them
+    print(f"Trees of a {len(source) // 1024} KiB module, tokens not counted")
+    for label, (count, size) in [
+        ("PG_AST", pg_ast_size(pg_ast)),
+        ("typed nodes", typed_size(typed)),
+    ]:
+        print(
+            f"{label:<12} {count:7} nodes  {size / 1024:8.0f} KiB"
+            f"  {size / count:6.1f} bytes/node"
+        )
+    print()
+
+    rows = [
+        ("parse to PG_AST", best_of(lambda: parse(source))),
+        ("parse, convert to typed nodes", best_of(lambda: from_pg_ast(parse(source)))),
+        ("convert only", best_of(lambda: from_pg_ast(pg_ast))),
+    ]
+    report(f"Building trees for {len(source)} chars", rows)
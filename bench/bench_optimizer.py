@@ -0,0 +1,57 @@
+"""
+What each optimization pass contributes: a loop full of literals, constant
+expressions and constant tests, run with no passes, each pass on its own,
+and the default passes.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_parser import PlaygroundParser
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from playground_optimizer import PlaygroundOptimizer, DEFAULT_PASSES
+
+SOURCE = """
+i = 0; total = 0;
+while (i < 5000) {
+    total = total + i * (60 * 60) % (24 * 7) + 1.5 * 2;
+    if (1 > 2 or 3 == 4) { total = total - 100; }
+    elif (True) { total = total + 2 - 1; }
+    i = i + 1;
+}
+print(total);
+"""
+
+PASS_SETS = [("no passes", ())] + [(name, (name,)) for name in DEFAULT_PASSES]
+PASS_SETS.append(("default passes", DEFAULT_PASSES))
+
+
+def parse(source):
+    parser = PlaygroundParser(input_str=source)
+    parser.testing = True
+    return parser.program()
+
+
+def run(root, backend):
+    interp = PlaygroundInterpreter(backend=backend)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp._program(root)
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        rows = []
+        outputs = set()
+        for label, passes in PASS_SETS:
+            optimizer = PlaygroundOptimizer(passes)
+            root = optimizer.optimize(parse(SOURCE))
+            outputs.add(run(root, backend))
+            rows.append((label, best_of(lambda: run(root, backend))))
+        assert len(outputs) == 1, outputs
+        report(f"{backend} backend", rows)
+
+    optimizer = PlaygroundOptimizer(DEFAULT_PASSES)
+    optimizer.optimize(parse(SOURCE))
+    print("Changes made by each pass:", optimizer.stats)
@@ -0,0 +1,78 @@
+"""
+What error reporting costs a successful parse.
+
+PlaygroundParser raises errors through AbstractParser.error(), which builds
+the rule stack only once an error is raised. WrappedParser puts back the
+old approach for comparison: every grammar rule wrapped in a try/except
+that re-raises with the rule name added.
+"""
+import io
+from contextlib import redirect_stdout
+from functools import wraps
+
+from bench_util import generated_module, best_of, report
+
+from playground_parser import PlaygroundParser, ParsingError
+
+RULES = [
+    "statements", "statement", "pg_import", "pg_print", "arg_list", "assign",
+    "block_stat", "if_stat", "elif_stat", "else_stat", "while_stat",
+    "func_def", "func_call", "return_stat", "class_def", "dotted_expr",
+    "bool_expr", "atom",
+]
+
+
+def _reraise_with_rule_name(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            msg = getattr(e, "message", str(e))
+            raise ParsingError(f"\nrule `{fn.__name__}`: {msg}")
+
+    return wrapper
+
+
+class WrappedParser(PlaygroundParser):
+    pass
+
+
+for rule in RULES:
+    setattr(WrappedParser, rule, _reraise_with_rule_name(getattr(PlaygroundParser, rule)))
+
+
+def parse(parser_class, source):
+    parser = parser_class(input_str=source)
+    parser.testing = True
+    return parser.program()
+
+
+def parse_error(parser_class, source):
+    try:
+        # program() prints the error before re-raising it
+        with redirect_stdout(io.StringIO()):
+            parse(parser_class, source)
+    except ParsingError as pe:
+        return pe
+
+
+if __name__ == "__main__":
+    source = generated_module()
+    rows = [
+        ("per-rule try/except wrappers", best_of(lambda: parse(WrappedParser, source))),
+        ("error() on failure only", best_of(lambda: parse(PlaygroundParser, source))),
+    ]
+    report(f"Parsing {len(source)} chars without errors", rows)
+
+    broken = source + "\nClass Broken { def broken(a){ a = (1 + ; } }\n"
+    rows = [
+        ("per-rule try/except wrappers", best_of(lambda: parse_error(WrappedParser, broken))),
+        ("error() on failure only", best_of(lambda: parse_error(PlaygroundParser, broken))),
+    ]
+    report("Same module, with an error at the end", rows)
+    print("Wrapped parser error:")
+    print(parse_error(WrappedParser, broken))
+    print()
+    print("PlaygroundParser error:")
+    print(parse_error(PlaygroundParser, broken))
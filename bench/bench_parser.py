@@ -0,0 +1,38 @@
+"""
+Parsing a large generated module, with the k=4 circular lookahead buffer fed
+one PG_Token at a time, and in tokenize-all mode (array backed PG_TokenBuffer).
+
+Also reports the peak memory tracemalloc sees while parsing.
+"""
+import tracemalloc
+
+from bench_util import generated_module, best_of, report
+
+from playground_parser import PlaygroundParser
+
+
+def parse(source, **kwargs):
+    return PlaygroundParser(input_str=source, **kwargs).program()
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == "__main__":
+    source = generated_module()
+    modes = [
+        ("circular lookahead", {"tokenize_all": False}),
+        ("tokenize-all", {"tokenize_all": True}),
+    ]
+
+    rows = [(label, best_of(lambda: parse(source, **kw))) for label, kw in modes]
+    report(f"Parsing {len(source)} chars", rows)
+
+    for label, kw in modes:
+        peak = peak_memory(lambda: parse(source, **kw))
+        print(f"{label:<32} peak {peak / 1024:10.1f} KiB")
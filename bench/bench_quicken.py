@@ -0,0 +1,58 @@
+"""
+Tight arithmetic loops on the tree-walker, with and without adaptive mode
+(PlaygroundInterpreter(adaptive=True)), in which arithmetic and comparison
+nodes specialize for the operand types they see. One loop works on ints,
+one on floats, and one on values that switch between ints and floats every
+ten iterations, so the sites they reach deoptimize, until they stay generic.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter
+
+PROGRAMS = [
+    ("ints", """
+a = 20000; t = 0;
+while (a > 0) { t = t + a % 7 * 2; a = a - 1; }
+print(t);
+"""),
+    ("floats", """
+a = 20000.0; t = 0.5;
+while (a > 0.0) { t = t + a / 3.5 - 1.0; a = a - 1.0; }
+print(t);
+"""),
+    ("changing types", """
+a = 20000; t = 0; y = 0;
+while (a > 0) {
+    if (a % 20 < 10) { y = a; } else { y = a * 0.5; }
+    t = y + y - t;
+    a = a - 1;
+}
+print(t);
+"""),
+]
+
+
+def run(source, adaptive):
+    interp = PlaygroundInterpreter(use_cache=False, adaptive=adaptive)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=source)
+    return out.getvalue(), interp
+
+
+if __name__ == "__main__":
+    for label, source in PROGRAMS:
+        generic_out, _ = run(source, adaptive=False)
+        adaptive_out, interp = run(source, adaptive=True)
+        assert generic_out == adaptive_out, (generic_out, adaptive_out)
+        report(
+            f"{label} loop, tree backend",
+            [
+                ("generic", best_of(lambda: run(source, adaptive=False), repeat=3)),
+                ("adaptive", best_of(lambda: run(source, adaptive=True), repeat=3)),
+            ],
+        )
+        print(interp.quicken_stats())
+        print()
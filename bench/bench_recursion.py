@@ -0,0 +1,79 @@
+"""
+Recursive programs with each interpreter backend, and how deep each one
+can recurse. The VM runs calls of compiled functions on its own frame list,
+rather than Python's stack, and returned calls may reuse the caller's frame
+(see TAIL_CALL in playground_bytecode.py).
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+PROGRAMS = {
+    "fib": """
+        def fib(n){ if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+        print(fib(18));
+    """,
+    "tail recursive sum": """
+        def sum(n, acc){ if (n == 0) { return acc; } return sum(n - 1, acc + n); }
+        i = 0; total = 0;
+        while (i < 300) { total = total + sum(50, 0); i = i + 1; }
+        print(total);
+    """,
+    "mutual recursion": """
+        def even(n){ if (n == 0) { return True; } return odd(n - 1); }
+        def odd(n){ if (n == 0) { return False; } return even(n - 1); }
+        i = 0; count = 0;
+        while (i < 300) { if (even(i % 60)) { count = count + 1; } i = i + 1; }
+        print(count);
+    """,
+}
+
+DEPTH = """
+def depth(n){ if (n == 0) { return 0; } return 1 + depth(n - 1); }
+def tail(n){ if (n == 0) { return 0; } return tail(n - 1); }
+"""
+DEPTHS = (50, 500, 2000, 100000)
+
+
+def run(source, backend):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=source)
+    return out.getvalue()
+
+
+def deepest(function, backend):
+    """
+    Returns the deepest of DEPTHS 'function' can recurse to with 'backend'
+    """
+    reached = 0
+    for n in DEPTHS:
+        if function == "depth" and n > 2000:
+            # Not a tail call; every level looks 'depth' up through all the
+            # scopes below it, which takes minutes at this depth
+            break
+        try:
+            run(DEPTH + f"print({function}({n}));", backend)
+        except RecursionError:
+            break
+        reached = n
+    return reached
+
+
+if __name__ == "__main__":
+    for title, source in PROGRAMS.items():
+        outputs = {backend: run(source, backend) for backend in BACKENDS}
+        assert len(set(outputs.values())) == 1, outputs
+
+        rows = [
+            (backend, best_of(lambda: run(source, backend), repeat=3))
+            for backend in BACKENDS
+        ]
+        report(title, rows)
+
+    print("Deepest recursion reached, of", DEPTHS)
+    for backend in BACKENDS:
+        print(f"{backend:<10} depth(n): {deepest('depth', backend):>6}   tail(n): {deepest('tail', backend):>6}")
@@ -0,0 +1,61 @@
+"""
+Functions that return early out of a loop: a linear search that finds what
+it's after near the start of a long range. Before return ended a function,
+the search ran the loop to its end every call. It is timed against the same
+search written without a return, stopping its loop with a flag, which is
+the least work the search can do.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+CALLS = """
+calls = 0; total = 0;
+while (calls < 200) {
+    total = total + find(2000, calls % 25);
+    calls = calls + 1;
+}
+print(total);
+"""
+
+EARLY_RETURN = """
+def find(limit, target){
+    i = 0;
+    while (i < limit) {
+        if (i == target) { return i; }
+        i = i + 1;
+    }
+    return 0 - 1;
+}
+""" + CALLS
+
+FLAG = """
+def find(limit, target){
+    i = 0; found = 0 - 1;
+    while (i < limit and found < 0) {
+        if (i == target) { found = i; }
+        i = i + 1;
+    }
+    found;
+}
+""" + CALLS
+
+PROGRAMS = [("loop stopped by a flag", FLAG), ("return out of the loop", EARLY_RETURN)]
+
+
+def run(source, backend):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend)
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=source)
+    return out.getvalue()
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        outputs = {run(source, backend) for label, source in PROGRAMS}
+        assert len(outputs) == 1, outputs
+        rows = [(label, best_of(lambda: run(source, backend))) for label, source in PROGRAMS]
+        report(f"{backend} backend", rows)
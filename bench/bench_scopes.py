@@ -0,0 +1,78 @@
+"""
+Loops whose bodies, and the if arms in them, push a scope on every
+iteration, run with and without the elide_scopes optimization pass. With
+it, blocks that bind nothing run in the enclosing scope, and loop bodies
+that do bind names run in one scope for the whole loop. Each row also
+counts the scopes the run pushed, which is how many PG_Scope objects were
+allocated for blocks and function calls.
+"""
+import contextlib
+import io
+
+from bench_util import best_of, report
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from playground_optimizer import DEFAULT_PASSES
+
+PROGRAM = """
+def collatz(n){
+    steps = 0;
+    while (n > 1) {
+        if (n % 2 == 0) { n = n / 2; } else { n = 3 * n + 1; }
+        steps = steps + 1;
+    }
+    return steps;
+}
+def weighted(n){
+    t = 0;
+    while (n > 0) {
+        w = n % 5;
+        if (w > 2) { t = t + w * n; }
+        n = n - 1;
+    }
+    return t;
+}
+i = 1; total = 0;
+while (i < 300) {
+    total = total + collatz(i) + weighted(20);
+    i = i + 1;
+}
+print(total);
+"""
+
+WITHOUT = tuple(name for name in DEFAULT_PASSES if name != "elide_scopes")
+
+
+def run(backend, passes):
+    interp = PlaygroundInterpreter(use_cache=False, backend=backend, passes=passes)
+    push_scope = interp._push_scope
+    pushed = [0]
+
+    def counting_push_scope(*args, **kwargs):
+        pushed[0] += 1
+        push_scope(*args, **kwargs)
+
+    interp._push_scope = counting_push_scope
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        interp.interp(input_str=PROGRAM)
+    return out.getvalue(), pushed[0]
+
+
+if __name__ == "__main__":
+    for backend in BACKENDS:
+        out_without, pushed_without = run(backend, WITHOUT)
+        out_with, pushed_with = run(backend, DEFAULT_PASSES)
+        assert out_without == out_with, (out_without, out_with)
+        report(
+            f"{backend} backend",
+            [
+                (
+                    f"a scope per block ({pushed_without} scopes)",
+                    best_of(lambda: run(backend, WITHOUT), repeat=3),
+                ),
+                (
+                    f"elide_scopes ({pushed_with} scopes)",
+                    best_of(lambda: run(backend, DEFAULT_PASSES), repeat=3),
+                ),
+            ],
+        )
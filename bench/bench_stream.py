@@ -0,0 +1,67 @@
+"""
+Lexing a large generated module from disk: reading it into a string first,
+against PlaygroundStreamLexer reading the file (and an mmap of it) in chunks.
+
+The interesting number is the peak memory while lexing; with the stream
+lexer it stays flat as the module grows.
+"""
+import mmap
+import os
+import tempfile
+import tracemalloc
+
+from bench_util import generated_module, best_of, report
+
+from playground_lexer import PlaygroundLexer, PlaygroundStreamLexer
+from playground_token import PG_Type as PGT
+
+
+def drain(lexer):
+    while lexer.next_token().type != PGT.EOF:
+        pass
+
+
+def lex_string(file_path):
+    with open(file_path) as f:
+        drain(PlaygroundLexer(f.read()))
+
+
+def lex_file(file_path):
+    with open(file_path) as f:
+        drain(PlaygroundStreamLexer(f))
+
+
+def lex_mmap(file_path):
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            drain(PlaygroundStreamLexer(source))
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == "__main__":
+    modes = [
+        ("read() into a string", lex_string),
+        ("stream from file", lex_file),
+        ("stream from mmap", lex_mmap),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_classes in [200, 2000]:
+            file_path = os.path.join(tmp, f"generated_{n_classes}.plgd")
+            with open(file_path, "w") as f:
+                f.write(generated_module(n_classes))
+            size = os.path.getsize(file_path)
+
+            rows = [(label, best_of(lambda: fn(file_path), 3)) for label, fn in modes]
+            report(f"Lexing a {size / 1024:.0f} KiB module", rows)
+            for label, fn in modes:
+                peak = peak_memory(lambda: fn(file_path))
+                print(f"{label:<32} peak {peak / 1024:10.1f} KiB")
+            print()
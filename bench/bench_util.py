@@ -0,0 +1,97 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Each benchmark is a plain script, run from anywhere:
+    python bench/bench_lexer.py
+"""
+import sys
+from os import path
+from time import perf_counter
+
+PLAYGROUND_DIR = path.join(path.dirname(path.abspath(__file__)), "..", "playground")
+EXAMPLES_DIR = path.join(path.dirname(path.abspath(__file__)), "..", "examples")
+sys.path.append(PLAYGROUND_DIR)
+
+CLASS_TEMPLATE = """
+# Generated class number {n}
+Class Gen{tag} {{
+    x; y;
+    label = "generated class {n}";
+
+    def Gen{tag}(){{
+        x = 0;
+        y = 0;
+    }}
+
+    def Gen{tag}(x, y){{
+        this.x = x;
+        this.y = y;
+    }}
+
+    def scaled(k){{
+        return Gen{tag}(x * k + {n}, (y - {n}) * k / 2.5);
+    }}
+
+    def in_range(lo, hi){{
+        return (x >= lo and x <= hi) or (y >= lo and y <= hi);
+    }}
+}}
+
+def helper_{tag}(a, b, c){{
+    total = a + b * c - {n} % 7;
+    if (total > 100) {{ total = total - 100; }}
+    elif (total == 0) {{ total = 1; }}
+    else {{ total = total + 1; }}
+    while (total > 10) {{ total = total / 2; }}
+    return total;
+}}
+"""
+
+
+def letters(n):
+    """
+    Spells 'n' with letters (0 -> 'a', 25 -> 'z', 26 -> 'ba', ...), since
+    Playground names can't contain digits.
+    """
+    tag = ""
+    while True:
+        tag = chr(ord("a") + n % 26) + tag
+        n //= 26
+        if n == 0:
+            return tag
+
+
+def generated_module(n_classes=200):
+    """
+    Returns the source of a large generated .plgd module, made up of
+    'n_classes' copies of CLASS_TEMPLATE.
+    """
+    return "".join(
+        CLASS_TEMPLATE.format(n=n, tag=letters(n)) for n in range(n_classes)
+    )
+
+
+def best_of(fn, repeat=5):
+    """
+    Calls 'fn' 'repeat' times and returns the fastest run time, in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(title, rows):
+    """
+    Prints a small table; 'rows' is a list of (label, seconds) pairs.
+    The first row is the baseline the others are compared against.
+    """
+    print(title)
+    print("=" * len(title))
+    baseline = rows[0][1]
+    for label, seconds in rows:
+        print(f"{label:<32} {seconds * 1000:10.2f} ms   x{baseline / seconds:5.2f}")
+    print()
@@ -1,4 +1,6 @@
 class AST:
+    __slots__ = ("name", "token", "children", "artificial")
+
     def __init__(self, token=None, artificial=False, name=None):
         self.name = (
             name  # Artificial nodes won't have any "token_text", so give them a name
@@ -7,6 +9,13 @@ class AST:
         self.children = []  # normalized list of AST nodes
         self.artificial = artificial
 
+    # Pickled as a plain tuple; keeps AST cache entries small
+    def __getstate__(self):
+        return (self.token, self.children, self.artificial, self.name)
+
+    def __setstate__(self, state):
+        self.token, self.children, self.artificial, self.name = state
+
     def is_none(self):
         return self.token is None
 
@@ -0,0 +1,19 @@
+class ParsingError(Exception):
+    def __init__(self, message="", line=None, column=None, expected=None, rule_stack=None):
+        self.message = message
+        self.line = line
+        self.column = column
+        # Token types that would have been accepted where parsing failed
+        self.expected = expected if expected is not None else set()
+        # Grammar rules being parsed when parsing failed, outermost first
+        self.rule_stack = rule_stack if rule_stack is not None else []
+        super().__init__(self.message)
+
+    def __str__(self):
+        lines = [self.message]
+        if len(self.expected) > 0:
+            names = sorted(getattr(t, "name", str(t)) for t in self.expected)
+            lines.append("expected one of: " + ", ".join(names))
+        if len(self.rule_stack) > 0:
+            lines.append("while parsing: " + " > ".join(self.rule_stack))
+        return "\n".join(lines)
@@ -1,3 +1,13 @@
+from abstract.abs_errors import ParsingError
+
+
+class LexingError(ParsingError):
+    """
+    Raised by lexers for input they can't make a token out of.
+    A ParsingError, so parser callers only need to handle the one error.
+    """
+
+
 class AbstractLexer:
     def __init__(self, input_str):
         self.EOF = chr(0)
@@ -5,7 +15,7 @@ class AbstractLexer:
 
         self.input = input_str
         self.p = 0
-        self.c = self.input[self.p]
+        self.c = self.input[self.p] if len(self.input) > 0 else self.EOF
 
         self.line_number = 0
 
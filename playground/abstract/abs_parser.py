@@ -1,16 +1,33 @@
-class ParsingError(Exception):
-    def __init__(self, message=""):
-        self.message = message
-        super().__init__(self.message)
+import sys
+
+from abstract.abs_errors import ParsingError
+
+
+# AbstractParser methods that are not grammar rules
+_NOT_RULES = {"error", "match", "consume", "LT", "LA"}
 
 
 class AbstractParser:
-    def __init__(self, input_lexer, k=1, AST_Class=None):
+    def __init__(self, input_lexer, k=1, AST_Class=None, tokenize_all=False):
         self.input = input_lexer  # A lexer with method nextToken() defined
         self.k = k  # How many lookahead tokens
         self.AST_Class = AST_Class
         self.p = 0  # Circular index of next token positon to fill
         self.lookahead = []  # Circular lookahead buffer
+        self.tokens = None
+
+        # Tokenize-all mode: the lexer (which must also define tokenize_all())
+        # lexes the whole input up front into a token buffer, and the parser
+        # indexes that buffer directly. self.p is then the index of LT(1).
+        if tokenize_all:
+            self.tokens = self.input.tokenize_all(eof_padding=k)
+            self.type_table = self.tokens.type_table
+            self.types = self.tokens.types
+            self.consume = self._consume_buffered
+            self.LT = self._LT_buffered
+            self.LA = self._LA_buffered
+            return
+
         for _ in range(k):  # Prime buffer
             self.lookahead.append(self.input.next_token())
 
@@ -35,6 +52,18 @@ class AbstractParser:
         """
         return self.LT(i).type
 
+    def _consume_buffered(self):
+        self.p += 1
+        # Stay on the trailing EOF token(s) once the end is reached
+        if self.p > len(self.types) - self.k:
+            self.p = len(self.types) - self.k
+
+    def _LT_buffered(self, i):
+        return self.tokens.token(self.p + i - 1)
+
+    def _LA_buffered(self, i):
+        return self.type_table[self.types[self.p + i - 1]]
+
     def match(self, x):
         """
         Accepts token type as a Tokens enum attribute
@@ -49,6 +78,36 @@ class AbstractParser:
             self.consume()
             return node
         else:
-            raise ParsingError(
-                f"Expecting {x}; found {self.LT(1)} on line {self.input.line_number}"
-            )
+            self.error(f"Expecting {x}", expected={x})
+
+    def error(self, description, expected=None):
+        """
+        Raises a ParsingError for the current token, LT(1).
+
+        'expected' is the set of token types that would have been accepted.
+        The rule stack is read off the Python call stack when the error is
+        raised, so tracking it costs nothing while parsing succeeds: every
+        method of this parser on the stack, other than the token handling
+        methods, is a grammar rule.
+        """
+        token = self.LT(1)
+        rule_stack = []
+        frame = sys._getframe(1)
+        while frame is not None:
+            name = frame.f_code.co_name
+            if (
+                frame.f_locals.get("self") is self
+                and not name.startswith("_")
+                and name not in _NOT_RULES
+            ):
+                rule_stack.append(name)
+            frame = frame.f_back
+        rule_stack.reverse()
+
+        raise ParsingError(
+            f"{description}; found {token} on line {token.line}, column {token.column}",
+            line=token.line,
+            column=token.column,
+            expected=expected,
+            rule_stack=rule_stack,
+        )
@@ -1,24 +1,48 @@
+class LazySymbol:
+    """
+    Bound in place of a symbol whose value isn't worked out until the symbol
+    is first resolved. AbstractScope.resolve() returns what 'loader'
+    returns instead, and 'loader' is expected to bind the symbol to that
+    value, so it is only called once.
+    """
+
+    __slots__ = ("loader",)
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __repr__(self):
+        return "<LazySymbol>"
+
+
 class AbstractScope:
+    __slots__ = ("name", "depth", "symbols", "parent", "children")
+
     def __init__(self, name=None):
         self.name = name
         self.depth = 0
         self.symbols: dict = {}
         self.parent: AbstractScope = None
-        self.children: list[AbstractScope, ...] = []
+        # The scopes pushed on this one; only kept when scopes are tracked,
+        # for debugging
+        self.children: list[AbstractScope, ...] = None
 
     def __repr__(self):
-        return f"<Scope: {self.name}, depth: {self.depth}, parent: {self.parent.name}, num_children {len(self.children)}>"
+        return f"<Scope: {self.name}, depth: {self.depth}, parent: {self.parent.name}, num_children {len(self.children or ())}>"
 
     def resolve(self, symbol: str):
         """
         Attempts to locate and return whatever value was assigned to
         'symbol' if 'symbol' exists in the current scope, or any
-        parent scope.
+        parent scope. A LazySymbol is loaded first.
         """
         cur_scope = self
         while cur_scope != None:
             if symbol in cur_scope.symbols:
-                return cur_scope.symbols[symbol]
+                value = cur_scope.symbols[symbol]
+                if type(value) is LazySymbol:
+                    value = value.loader()
+                return value
             cur_scope = cur_scope.parent
         raise NameError(f"Symbol {symbol} could not be found!")
 
@@ -1,8 +1,19 @@
 class AbstractToken:
-    def __init__(self, token_type=None, token_text=""):
+    __slots__ = ("type", "text", "line", "column")
+
+    def __init__(self, token_type=None, token_text="", line=None, column=None):
 
         self.type = token_type
         self.text = token_text
+        self.line = line  # Source line (1 based) the token starts on
+        self.column = column  # Column (1 based) on that line the token starts at
+
+    # Pickled as a plain tuple; keeps AST cache entries small
+    def __getstate__(self):
+        return (self.type, self.text, self.line, self.column)
+
+    def __setstate__(self, state):
+        self.type, self.text, self.line, self.column = state
 
     def __repr__(self):
         return f"<{self.type}: '{self.text}'>"
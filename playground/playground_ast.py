@@ -2,5 +2,77 @@ from abstract.abs_ast import AST
 
 
 class PG_AST(AST):
+    __slots__ = ()
+
     def __init__(self, token=None, artificial=False, name=None):
         super().__init__(token=token, artificial=artificial, name=name)
+
+
+class PG_Literal(PG_AST):
+    """
+    An INT, FLOAT, STRING, True or False node whose Python value has been
+    worked out ahead of time (see playground_optimizer.py); 'token' is
+    still the literal's token.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, token, value):
+        super().__init__(token=token)
+        self.value = value
+
+    def __getstate__(self):
+        return super().__getstate__() + (self.value,)
+
+    def __setstate__(self, state):
+        super().__setstate__(state[:-1])
+        self.value = state[-1]
+
+
+class PG_QuickOp(PG_AST):
+    """
+    An arithmetic or comparison node the tree-walker runs through 'site',
+    a PG_OpSite (see playground_quicken.py); 'token' and 'children' are
+    still those of the node it replaced.
+    """
+
+    __slots__ = ("site",)
+
+    def __init__(self, t: PG_AST, site):
+        super().__init__(token=t.token)
+        self.children = t.children
+        self.site = site
+
+    def __getstate__(self):
+        return super().__getstate__() + (self.site,)
+
+    def __setstate__(self, state):
+        super().__setstate__(state[:-1])
+        self.site = state[-1]
+
+
+# How a PG_Block runs (see the elide_scopes pass in playground_optimizer.py)
+SCOPE_ELIDED = "elided"  # In the enclosing scope, since it binds nothing
+SCOPE_REUSED = "reused"  # A loop body: in one scope for every iteration, emptied between them
+
+
+class PG_Block(PG_AST):
+    """
+    A block ($STATEMENTS node) whose scope the optimizer has worked out:
+    'scope' is SCOPE_ELIDED or SCOPE_REUSED; 'children' are still those of
+    the block it replaced.
+    """
+
+    __slots__ = ("scope",)
+
+    def __init__(self, t: PG_AST, scope):
+        super().__init__(artificial=True, name="$STATEMENTS")
+        self.children = t.children
+        self.scope = scope
+
+    def __getstate__(self):
+        return super().__getstate__() + (self.scope,)
+
+    def __setstate__(self, state):
+        super().__setstate__(state[:-1])
+        self.scope = state[-1]
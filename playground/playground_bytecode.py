@@ -0,0 +1,746 @@
+"""
+The bytecode backend's compiler: compiles a PG_AST to PG_Code objects, for
+the stack based virtual machine in playground_vm.py to run.
+
+A PG_Code is a flat array of instructions, each an (opcode, argument) pair
+of ints, plus the tables the arguments index into:
+
+    consts  Literal values, nested PG_Code objects (function and class
+            bodies), and the PG_AST nodes some instructions need at run time
+    names   Symbol names, for the instructions that load and store them
+    params  For a function body, its parameters, in slot order; names
+            with a lexical address (see playground_resolver.py) are loaded
+            and stored by slot
+
+Every instruction takes an argument, 0 when it has no use for one, so the
+instruction at offset i is always ops[i], ops[i + 1].
+
+Print out the instructions of a program with disassemble().
+"""
+from array import array
+
+from playground_ast import PG_AST, PG_Block, SCOPE_ELIDED, SCOPE_REUSED
+from playground_token import PG_Type as PGT
+from playground_resolver import resolve_function, binds_only_params
+from playground_inline_cache import PG_InlineCache, PG_GlobalCache
+
+# Opcodes. 'arg' below is the instruction's argument.
+OPNAMES = (
+    "LOAD_CONST",          # Push consts[arg]
+    "LOAD_NAME",           # Push the value of names[arg], from the current scope, through global_caches[arg]
+    "STORE_NAME",          # Pop a value, assign it to names[arg]
+    "LOAD_LOCAL",          # Push the value of parameter slot arg of the function being run
+    "STORE_LOCAL",         # Pop a value, assign it to parameter slot arg of the function being run
+    "STORE_DOTTED",        # Pop a value, assign it to the dotted name of assign node consts[arg]
+    "POP",                 # Discard the top of the stack
+    "BINARY_ADD",          # Pop b, pop a, push a + b
+    "BINARY_SUB",
+    "BINARY_MUL",
+    "BINARY_DIV",
+    "BINARY_MOD",
+    "COMPARE_EQ",          # Pop b, pop a, push a == b
+    "COMPARE_LT",
+    "COMPARE_LE",
+    "COMPARE_GT",
+    "COMPARE_GE",
+    "AND_JUMP",            # If the top of the stack == False: replace it with False and jump to arg, else pop it
+    "OR_JUMP",             # If the top of the stack == True: replace it with True and jump to arg, else pop it
+    "EQ_TRUE",             # Replace the top of the stack with whether it == True
+    "JUMP",                # Jump to arg
+    "POP_JUMP_IF_FALSE",   # Pop a value, jump to arg if it is falsy
+    "PUSH_SCOPE",          # Push a new, empty scope
+    "PUSH_INSTANCE_SCOPE", # Pop an instance, push a scope for it (see PG_InstanceScope)
+    "POP_SCOPE",           # Pop the current scope
+    "CLEAR_SCOPE",         # Empty the current scope, for the next iteration of a loop run in it
+    "CALL",                # Call, with the arguments on the stack, the call node consts[arg]
+    "CALL_METHOD",         # Call a method of the current scope's instance; consts[arg] is (call node, inline cache)
+    "TAIL_CALL",           # A returned call; consts[arg] is (call node, scopes to pop). See _return()
+    "LOAD_FIELD",          # Pop an instance, push its field; consts[arg] is (dot node, field node, inline cache)
+    "LOAD_MEMBERS",        # Pop an instance, push its 'attrs' or 'methods'; names[arg] says which
+    "MAKE_FUNCTION",       # Define the function consts[arg] in the current scope
+    "MAKE_METHOD",         # Add the method consts[arg] to the class being defined
+    "STORE_CLASS_ATTR",    # Pop a value, set attribute names[arg] of the class being defined
+    "CLASS_DEF",           # Define the class whose body is consts[arg]
+    "PRINT_ITEM",          # Pop a value and print it, without a new line
+    "PRINT_NEWLINE",
+    "IMPORT",              # Run the import node consts[arg]
+    "EXEC_NODE",           # Run the node consts[arg] with the tree-walker, push what it returns
+    "RETURN_VALUE",        # Pop a value, and return it from the current frame
+    "RETURN_EARLY",        # Pop arg scopes, then pop a value and return it from the current frame
+)
+(
+    LOAD_CONST,
+    LOAD_NAME,
+    STORE_NAME,
+    LOAD_LOCAL,
+    STORE_LOCAL,
+    STORE_DOTTED,
+    POP,
+    BINARY_ADD,
+    BINARY_SUB,
+    BINARY_MUL,
+    BINARY_DIV,
+    BINARY_MOD,
+    COMPARE_EQ,
+    COMPARE_LT,
+    COMPARE_LE,
+    COMPARE_GT,
+    COMPARE_GE,
+    AND_JUMP,
+    OR_JUMP,
+    EQ_TRUE,
+    JUMP,
+    POP_JUMP_IF_FALSE,
+    PUSH_SCOPE,
+    PUSH_INSTANCE_SCOPE,
+    POP_SCOPE,
+    CLEAR_SCOPE,
+    CALL,
+    CALL_METHOD,
+    TAIL_CALL,
+    LOAD_FIELD,
+    LOAD_MEMBERS,
+    MAKE_FUNCTION,
+    MAKE_METHOD,
+    STORE_CLASS_ATTR,
+    CLASS_DEF,
+    PRINT_ITEM,
+    PRINT_NEWLINE,
+    IMPORT,
+    EXEC_NODE,
+    RETURN_VALUE,
+    RETURN_EARLY,
+) = range(len(OPNAMES))
+
+# Instructions whose argument is a jump target
+JUMPS = {AND_JUMP, OR_JUMP, JUMP, POP_JUMP_IF_FALSE}
+
+# Instructions whose argument indexes 'names'
+NAME_ARGS = {LOAD_NAME, STORE_NAME, LOAD_MEMBERS, STORE_CLASS_ATTR}
+
+# Instructions whose argument indexes 'params'
+SLOT_ARGS = {LOAD_LOCAL, STORE_LOCAL}
+
+# Instructions whose argument indexes 'consts'
+_CONST_ARGS = {
+    LOAD_CONST,
+    STORE_DOTTED,
+    CALL,
+    CALL_METHOD,
+    TAIL_CALL,
+    LOAD_FIELD,
+    MAKE_FUNCTION,
+    MAKE_METHOD,
+    CLASS_DEF,
+    IMPORT,
+    EXEC_NODE,
+}
+
+_ARITHMETIC = {
+    PGT.PLUS: BINARY_ADD,
+    PGT.MINUS: BINARY_SUB,
+    PGT.STAR: BINARY_MUL,
+    PGT.FSLASH: BINARY_DIV,
+    PGT.PERCENT: BINARY_MOD,
+}
+_COMPARISONS = {
+    PGT.EQ: COMPARE_EQ,
+    PGT.LT: COMPARE_LT,
+    PGT.LE: COMPARE_LE,
+    PGT.GT: COMPARE_GT,
+    PGT.GE: COMPARE_GE,
+}
+_CONDITIONALS = {PGT.IF, PGT.ELIF}
+_BOOLEANS = {PGT.TRUE, PGT.FALSE}
+
+# Nodes that _exec() gives no value; as statements they compile to nothing
+# on the stack
+_VALUELESS = {
+    PGT.IMPORT,
+    PGT.FROM,
+    PGT.CLASS,
+    PGT.PRINT,
+    PGT.DEF,
+    PGT.ASSIGN,
+    PGT.IF,
+    PGT.ELIF,
+    PGT.WHILE,
+}
+
+# Types of the constants a code object shares by value (see _const())
+_LITERAL_TYPES = {int, float, str, bool, type(None)}
+
+
+class PG_Code:
+    """
+    A compiled program, function body, or class body.
+    """
+
+    __slots__ = ("name", "ops", "consts", "names", "global_caches", "params")
+
+    def __init__(self, name: str, params: list = None):
+        self.name = name
+        self.ops = array("i")
+        self.consts = []
+        self.names = []
+        # The global cache LOAD_NAME uses for each of 'names'; None for
+        # names that are never loaded
+        self.global_caches = []
+        self.params = [] if params is None else params
+
+    def __repr__(self):
+        return f"<PG_Code: {self.name}, {len(self.ops) // 2} instructions>"
+
+
+class PG_FunctionCode:
+    """
+    What MAKE_FUNCTION and MAKE_METHOD need to create a PG_Function
+    """
+
+    __slots__ = ("name", "params", "code", "body", "memo")
+
+    def __init__(self, name: str, params: list, code: PG_AST, body: PG_Code, memo=False):
+        self.name = name
+        self.params = params
+        self.code = code  # The function's PG_AST, kept on the PG_Function
+        self.body = body
+        self.memo = memo  # Whether it was defined with memo def
+
+    def __repr__(self):
+        return f"<{'memo ' if self.memo else ''}function {self.body.name}>"
+
+
+class BytecodeCompiler:
+    def __init__(self, is_function_call, inline_cache=None, global_cache=None):
+        # PlaygroundInterpreter.is_function_call
+        self.is_function_call = is_function_call
+
+        # Returns the inline cache of a dotted expression's rhs node;
+        # PlaygroundInterpreter._inline_cache, or a new cache per node
+        self.inline_cache = inline_cache
+
+        # Returns the global cache of a NAME node; PlaygroundInterpreter.
+        # _global_cache, or a new cache per name per code object
+        self.global_cache = global_cache
+        self.code = None
+        self._const_index = {}
+        self._name_index = {}
+
+        # Lexical addresses of the names in the function being compiled
+        self.addresses = {}
+
+        # How many scopes the code being compiled has pushed at this point;
+        # what a return has to pop before leaving the frame
+        self.scope_depth = 0
+
+        # Whether returned calls in the function being compiled may reuse
+        # its frame
+        self.tail_calls = False
+
+    def compile_program(self, t: PG_AST) -> PG_Code:
+        """
+        Compiles the program rooted at 't'. Its statements run in the
+        current scope; no scope is pushed for them.
+        """
+        with self._new_code("<program>"):
+            for statement in t.children:
+                self._statement(statement, keep_value=False)
+            self._emit(LOAD_CONST, self._const(None))
+            self._emit(RETURN_VALUE)
+            return self.code
+
+    # Code object helpers
+
+    def _new_code(self, name: str, params: list = None):
+        return _CodeContext(self, name, params)
+
+    def _emit(self, op: int, arg: int = 0) -> int:
+        """
+        Appends an instruction; returns its offset
+        """
+        ops = self.code.ops
+        ops.append(op)
+        ops.append(arg)
+        return len(ops) - 2
+
+    def _here(self) -> int:
+        return len(self.code.ops)
+
+    def _patch(self, offset: int, target: int):
+        """
+        Points the jump at 'offset' at 'target'
+        """
+        self.code.ops[offset + 1] = target
+
+    def _const(self, value) -> int:
+        # Literal values are shared within a code object; True == 1 and
+        # 1 == 1.0, so they're told apart by type as well
+        key = (type(value), value) if type(value) in _LITERAL_TYPES else id(value)
+        index = self._const_index.get(key)
+        if index is None:
+            index = len(self.code.consts)
+            self.code.consts.append(value)
+            self._const_index[key] = index
+        return index
+
+    def _name(self, name: str) -> int:
+        index = self._name_index.get(name)
+        if index is None:
+            index = len(self.code.names)
+            self.code.names.append(name)
+            self.code.global_caches.append(None)
+            self._name_index[name] = index
+        return index
+
+    # Statements
+
+    def _statement(self, t: PG_AST, keep_value: bool):
+        """
+        Compiles statement 't'. If 'keep_value', the statement leaves the
+        value _exec() would have returned for it on the stack.
+        """
+        if t.token is not None and t.token.type is PGT.RETURN:
+            self._return(t, keep_value)
+        elif self._is_valueless(t):
+            self._valueless(t)
+            if keep_value:
+                self._emit(LOAD_CONST, self._const(None))
+        else:
+            self._expr(t)
+            if not keep_value:
+                self._emit(POP)
+
+    def _return(self, t: PG_AST, keep_value: bool):
+        """
+        The last statement of a function body is returned anyway; any other
+        return leaves the frame, through the scopes it's in.
+
+        A returned call of a function, in a function that binds nothing but
+        its parameters (see binds_only_params()), is a TAIL_CALL: the VM
+        pops the caller's scopes and runs the callee in the caller's frame,
+        when the callee is a compiled function whose parameters include all
+        of the caller's. Nothing the callee looks up by name could have been
+        found in the caller's scopes then. Otherwise it is an ordinary call.
+        """
+        expr = t.children[0]
+        if (
+            self.tail_calls
+            and expr.token is not None
+            and expr.token.type is PGT.NAME
+            and self.is_function_call(expr)
+        ):
+            args = expr.children[0].children if len(expr.children) > 0 else []
+            for arg in args:
+                self._expr(arg)
+            self._emit(TAIL_CALL, self._const((expr, self.scope_depth)))
+        else:
+            self._expr(expr)
+
+        if not keep_value:
+            self._emit(RETURN_EARLY, self.scope_depth)
+
+    def _is_valueless(self, t: PG_AST) -> bool:
+        if t.token is None:
+            return t.artificial == True and t.name == "$STATEMENTS"
+        return t.token.type in _VALUELESS and not self.is_function_call(t)
+
+    def _valueless(self, t: PG_AST):
+        token_type = t.token.type if t.token != None else None
+
+        if token_type is None:
+            self._block(t)
+
+        elif token_type is PGT.IMPORT or token_type is PGT.FROM:
+            self._emit(IMPORT, self._const(t))
+
+        elif token_type is PGT.CLASS:
+            self._class_def(t)
+
+        elif token_type is PGT.PRINT:
+            if len(t.children) > 0:
+                for arg in t.children[0].children:
+                    self._expr(arg)
+                    self._emit(PRINT_ITEM)
+            self._emit(PRINT_NEWLINE)
+
+        elif token_type is PGT.DEF:
+            self._emit(MAKE_FUNCTION, self._const(self._function(t)))
+
+        elif token_type is PGT.ASSIGN:
+            self._assign(t)
+
+        elif token_type in _CONDITIONALS:
+            self._conditional(t)
+
+        elif token_type is PGT.WHILE:
+            self._while(t)
+
+    def _block(self, t: PG_AST):
+        """
+        A block statement runs in a scope of its own, unless it was elided
+        """
+        if type(t) is PG_Block and t.scope is SCOPE_ELIDED:
+            for statement in t.children:
+                self._statement(statement, keep_value=False)
+            return
+
+        self._emit(PUSH_SCOPE)
+        self.scope_depth += 1
+        for statement in t.children:
+            self._statement(statement, keep_value=False)
+        self._emit(POP_SCOPE)
+        self.scope_depth -= 1
+
+    def _function(self, t: PG_AST, class_name: str = None) -> PG_FunctionCode:
+        """
+        Compiles the function, or method of class 'class_name', defined by
+        't'. Like PlaygroundInterpreter._statements(), the body runs in a
+        scope of its own, unless it was elided, and returns the value of
+        its last statement.
+        """
+        name = t.children[0].token.text
+        params = [param.token.text for param in t.children[1].children]
+        code = t.children[2]
+
+        with self._new_code(f"{name}({', '.join(params)})", params):
+            self.addresses = resolve_function(t, class_name)
+            self.tail_calls = binds_only_params(t, class_name)
+            elided = type(code) is PG_Block and code.scope is SCOPE_ELIDED
+            if not elided:
+                self._emit(PUSH_SCOPE)
+                self.scope_depth = 1
+            statements = code.children
+            for i, statement in enumerate(statements):
+                self._statement(statement, keep_value=i == len(statements) - 1)
+            if len(statements) == 0:
+                self._emit(LOAD_CONST, self._const(None))
+            if not elided:
+                self._emit(POP_SCOPE)
+            self._emit(RETURN_VALUE)
+            body = self.code
+
+        return PG_FunctionCode(name, params, code, body, memo=len(t.children) == 4)
+
+    def _class_def(self, t: PG_AST):
+        """
+        See PlaygroundInterpreter._class_def(). The class body is compiled
+        to a code object of its own, which CLASS_DEF runs in a frame of its
+        own, in the current scope.
+        """
+        name = t.children[0].token.text
+        with self._new_code(name):
+            for statement in t.children[1].children:
+                stmnt_tk_type = statement.token.type
+                if stmnt_tk_type == PGT.ASSIGN:
+                    self._expr(statement.children[1])
+                    attr_name = statement.children[0].token.text
+                    self._emit(STORE_CLASS_ATTR, self._name(attr_name))
+
+                elif stmnt_tk_type == PGT.NAME:
+                    self._emit(LOAD_CONST, self._const(None))
+                    self._emit(STORE_CLASS_ATTR, self._name(statement.token.text))
+
+                elif stmnt_tk_type is PGT.DEF:
+                    self._emit(MAKE_METHOD, self._const(self._function(statement, name)))
+
+                else:
+                    self._statement(statement, keep_value=False)
+
+            self._emit(LOAD_CONST, self._const(None))
+            self._emit(RETURN_VALUE)
+            body = self.code
+
+        self._emit(CLASS_DEF, self._const(body))
+
+    def _assign(self, t: PG_AST):
+        lhs = t.children[0]
+        if lhs.token.type is PGT.DOT:
+            self._expr(t.children[1])
+            self._emit(STORE_DOTTED, self._const(t))
+        else:
+            self._expr(t.children[1])
+            address = self.addresses.get(lhs)
+            if address is not None:
+                self._emit(STORE_LOCAL, address[1])
+            else:
+                self._emit(STORE_NAME, self._name(lhs.token.text))
+
+    def _conditional(self, t: PG_AST):
+        self._expr(t.children[0])
+        to_else = self._emit(POP_JUMP_IF_FALSE)
+        self._statement(t.children[1], keep_value=False)
+
+        # elif or else clause present
+        if len(t.children) == 3:
+            to_end = self._emit(JUMP)
+            self._patch(to_else, self._here())
+            self._statement(t.children[2], keep_value=False)
+            self._patch(to_end, self._here())
+        else:
+            self._patch(to_else, self._here())
+
+    def _while(self, t: PG_AST):
+        body = t.children[1]
+        if type(body) is PG_Block and body.scope is SCOPE_REUSED:
+            # Every iteration runs in the same scope, emptied after it
+            self._emit(PUSH_SCOPE)
+            self.scope_depth += 1
+            top = self._here()
+            self._expr(t.children[0])
+            to_end = self._emit(POP_JUMP_IF_FALSE)
+            for statement in body.children:
+                self._statement(statement, keep_value=False)
+            self._emit(CLEAR_SCOPE)
+            self._emit(JUMP, top)
+            self._patch(to_end, self._here())
+            self._emit(POP_SCOPE)
+            self.scope_depth -= 1
+            return
+
+        top = self._here()
+        self._expr(t.children[0])
+        to_end = self._emit(POP_JUMP_IF_FALSE)
+        self._statement(t.children[1], keep_value=False)
+        self._emit(JUMP, top)
+        self._patch(to_end, self._here())
+
+    # Expressions
+
+    def _expr(self, t: PG_AST):
+        """
+        Compiles 't' to leave the value _exec() would have returned for it on
+        the stack, checking what 't' is in the same order _exec() does.
+        """
+        token_type = t.token.type if t.token != None else None
+
+        if token_type is PGT.DOT:
+            self._dotted_expr(t, t)
+
+        elif self.is_function_call(t):
+            self._func_call(t)
+
+        elif token_type in _ARITHMETIC:
+            self._expr(t.children[0])
+            self._expr(t.children[1])
+            self._emit(_ARITHMETIC[token_type])
+
+        elif token_type is PGT.AND or token_type is PGT.OR:
+            # Short circuit; either way the result is a bool
+            self._expr(t.children[0])
+            jump = self._emit(AND_JUMP if token_type is PGT.AND else OR_JUMP)
+            self._expr(t.children[1])
+            self._emit(EQ_TRUE)
+            self._patch(jump, self._here())
+
+        elif token_type in _COMPARISONS:
+            self._expr(t.children[0])
+            self._expr(t.children[1])
+            self._emit(_COMPARISONS[token_type])
+
+        elif token_type in _BOOLEANS:
+            self._emit(LOAD_CONST, self._const(t.token.text == "True"))
+
+        elif token_type is PGT.NAME:
+            self._load_name(t)
+        elif token_type is PGT.INT:
+            self._emit(LOAD_CONST, self._const(int(t.token.text)))
+        elif token_type is PGT.FLOAT:
+            self._emit(LOAD_CONST, self._const(float(t.token.text)))
+        elif token_type is PGT.STRING:
+            self._emit(LOAD_CONST, self._const(str(t.token.text)))
+
+        else:
+            # Let the tree-walker report nodes it doesn't handle either
+            self._emit(EXEC_NODE, self._const(t))
+
+    def _load_name(self, t: PG_AST):
+        """
+        Loads NAME node 't'; by slot, if it has a lexical address. The VM's
+        frame for a function call keeps the call's PG_FunctionScope, so the
+        address' depth is not needed to find it.
+        """
+        address = self.addresses.get(t)
+        if address is not None:
+            self._emit(LOAD_LOCAL, address[1])
+        else:
+            index = self._name(t.token.text)
+            # A code object loads each name through one cache, that of the
+            # first node that loads it
+            global_caches = self.code.global_caches
+            if global_caches[index] is None:
+                global_caches[index] = (
+                    PG_GlobalCache(t.token.text)
+                    if self.global_cache is None
+                    else self.global_cache(t)
+                )
+            self._emit(LOAD_NAME, index)
+
+    def _func_call(self, t: PG_AST, method=False):
+        args = t.children[0].children if len(t.children) > 0 else []
+        for arg in args:
+            self._expr(arg)
+        if method:
+            self._emit(CALL_METHOD, self._const((t, self._cache(t))))
+        else:
+            self._emit(CALL, self._const(t))
+
+    def _cache(self, t: PG_AST) -> PG_InlineCache:
+        if self.inline_cache is None:
+            return PG_InlineCache(t.token.text)
+        return self.inline_cache(t)
+
+    def _dotted_expr(self, t: PG_AST, outer: PG_AST):
+        """
+        See PlaygroundInterpreter._dotted_expr(). 'outer' is the first dot
+        of a chain of dotted expressions; errors are reported against it.
+        """
+        lhs = t.children[0]
+        rhs = t.children[1]
+
+        if lhs.token.text != "this":
+            self._load_name(lhs)
+        else:
+            self._emit(LOAD_CONST, self._const(None))
+
+        # Chained dotted expressions; the instance is still loaded first
+        if rhs.token.type is PGT.DOT:
+            self._emit(POP)
+            self._dotted_expr(rhs, outer)
+
+        # Dotted function call
+        elif self.is_function_call(rhs):
+            self._emit(PUSH_INSTANCE_SCOPE)
+            self._func_call(rhs, method=lhs.token.text != "this")
+            self._emit(POP_SCOPE)
+
+        # Dotted field access
+        elif rhs.token.type is PGT.NAME:
+            field = rhs.token.text
+            if field == "attrs" or field == "methods":
+                self._emit(LOAD_MEMBERS, self._name(field))
+            else:
+                self._emit(LOAD_FIELD, self._const((outer, rhs, self._cache(rhs))))
+
+        else:
+            self._emit(POP)
+            self._emit(LOAD_CONST, self._const(None))
+
+
+class _CodeContext:
+    """
+    Makes the compiler emit into a new PG_Code for the duration of a with
+    block, then returns it to the code object it was compiling before.
+    """
+
+    def __init__(self, compiler: BytecodeCompiler, name: str, params: list):
+        self.compiler = compiler
+        self.name = name
+        self.params = params
+
+    def __enter__(self):
+        compiler = self.compiler
+        self.saved = (
+            compiler.code,
+            compiler._const_index,
+            compiler._name_index,
+            compiler.addresses,
+            compiler.scope_depth,
+            compiler.tail_calls,
+        )
+        compiler.code = PG_Code(self.name, self.params)
+        compiler._const_index = {}
+        compiler._name_index = {}
+        compiler.addresses = {}
+        compiler.scope_depth = 0
+        compiler.tail_calls = False
+
+    def __exit__(self, *exc_info):
+        compiler = self.compiler
+        (
+            compiler.code,
+            compiler._const_index,
+            compiler._name_index,
+            compiler.addresses,
+            compiler.scope_depth,
+            compiler.tail_calls,
+        ) = self.saved
+
+
+def disassemble(code: PG_Code) -> str:
+    """
+    Returns a listing of the instructions in 'code', followed by those of
+    the function and class bodies it contains.
+    """
+    lines = [f"Disassembly of {code.name}:"]
+    nested = []
+    ops = code.ops
+    for offset in range(0, len(ops), 2):
+        op, arg = ops[offset], ops[offset + 1]
+        opname = OPNAMES[op]
+        if op in JUMPS:
+            detail = f"to {arg}"
+        elif op in NAME_ARGS:
+            detail = f"({code.names[arg]})"
+        elif op in SLOT_ARGS:
+            detail = f"({code.params[arg]})"
+        elif op == RETURN_EARLY:
+            detail = f"({arg} scopes)"
+        elif op in _CONST_ARGS:
+            value = code.consts[arg]
+            detail = f"({_describe(value)})"
+            if type(value) is PG_Code:
+                nested.append(value)
+            elif type(value) is PG_FunctionCode:
+                nested.append(value.body)
+        else:
+            detail = ""
+
+        arg_text = str(arg) if detail else ""
+        lines.append(f"{offset:6}  {opname:<20} {arg_text:>4} {detail}".rstrip())
+
+    for nested_code in nested:
+        lines.append("")
+        lines.append(disassemble(nested_code))
+    return "\n".join(lines)
+
+
+def _describe(value) -> str:
+    if isinstance(value, PG_AST):
+        return _source_of(value)
+    if type(value) is tuple:
+        return _source_of(value[0])
+    if type(value) is PG_Code:
+        return f"class {value.name}"
+    return repr(value)
+
+
+def _source_of(t: PG_AST) -> str:
+    """
+    A short description of node 't', for the disassembly
+    """
+    if t.token is None:
+        return t.name
+    text = t.token.text
+    if t.token.type is PGT.DOT and len(t.children) == 2:
+        text = f"{_source_of(t.children[0])}.{_source_of(t.children[1])}"
+    elif t.token.type is PGT.ASSIGN:
+        text = f"{_source_of(t.children[0])} = ..."
+    elif len(t.children) > 0 and t.children[0].name == "$ARG_LIST":
+        text += f"/{len(t.children[0].children)}"
+    return text
+
+
+if __name__ == "__main__":
+    import sys
+    from playground_parser import PlaygroundParser
+    from playground_interpreter import PlaygroundInterpreter
+
+    if len(sys.argv) != 2:
+        print("usage: python playground_bytecode.py <module>")
+        sys.exit(1)
+
+    with open(sys.argv[1], mode="r") as source:
+        root = PlaygroundParser(source=source).program()
+    if root != None:
+        compiler = BytecodeCompiler(PlaygroundInterpreter().is_function_call)
+        print(disassemble(compiler.compile_program(root)))
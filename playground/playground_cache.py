@@ -0,0 +1,215 @@
+"""
+An on-disk cache of parsed Playground modules; a __pycache__ for .plgd files.
+
+The parsed PG_AST of 'dir/module.plgd' is pickled to
+'dir/__plgdcache__/module.plgd.plgdc', together with the path, mtime, size
+and SHA-256 hash of the source it was parsed from. A cache entry is fresh if
+the source's mtime and size are unchanged, or, failing that, if its content
+hash is unchanged.
+
+The cache is only used with PlaygroundInterpreter(use_cache=True).
+
+Inspect or clear the cache from the command line:
+    python playground_cache.py info  <module or directory> ...
+    python playground_cache.py clear <module or directory> ...
+"""
+import gc
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+CACHE_DIR_NAME = "__plgdcache__"
+CACHE_SUFFIX = ".plgdc"
+
+# Bump whenever PG_AST, PG_Token, or anything else that ends up in a cached
+# tree changes shape; entries written by another version are ignored.
+CACHE_VERSION = 2
+
+
+def cache_path(source_path: str) -> str:
+    """
+    Returns the path of the cache entry for the module at 'source_path'
+    """
+    directory, file_name = os.path.split(os.path.abspath(source_path))
+    return os.path.join(directory, CACHE_DIR_NAME, file_name + CACHE_SUFFIX)
+
+
+def source_hash(source_path: str) -> str:
+    """
+    Returns the SHA-256 hash of the module at 'source_path', as hex
+    """
+    digest = hashlib.sha256()
+    with open(source_path, mode="rb") as source:
+        for chunk in iter(lambda: source.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot(source_path: str):
+    """
+    Returns the (stat, content hash) of the module at 'source_path'; take
+    one before parsing a module, and pass it on to store() after.
+    """
+    return os.stat(source_path), source_hash(source_path)
+
+
+class _NoGC:
+    """
+    Turns the cyclic garbage collector off for the duration of a with block.
+
+    (Un)pickling a tree allocates a lot of objects, none of them garbage,
+    and collections triggered along the way otherwise take most of the time.
+    """
+
+    def __enter__(self):
+        self.was_enabled = gc.isenabled()
+        gc.disable()
+
+    def __exit__(self, *exc_info):
+        if self.was_enabled:
+            gc.enable()
+
+
+def _read_entry(entry_path: str):
+    try:
+        with open(entry_path, mode="rb") as entry_file, _NoGC():
+            entry = pickle.load(entry_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if type(entry) is not dict or entry.get("version") != CACHE_VERSION:
+        return None
+    return entry
+
+
+def load(source_path: str):
+    """
+    Returns the cached PG_AST for the module at 'source_path', or None if
+    there is no fresh cache entry for it.
+    """
+    entry = _read_entry(cache_path(source_path))
+    if entry is None:
+        return None
+
+    stat = os.stat(source_path)
+    if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        return entry["root"]
+
+    # Touched, but maybe not changed. If so, remember the new mtime.
+    if entry["hash"] == source_hash(source_path):
+        store(source_path, entry["root"], stat=stat, content_hash=entry["hash"])
+        return entry["root"]
+
+    return None
+
+
+def store(source_path: str, root, stat=None, content_hash=None) -> bool:
+    """
+    Writes 'root', the PG_AST parsed from the module at 'source_path', to
+    the cache. Pass the source's 'stat' and 'content_hash' as they were
+    before it was parsed, so a module edited while being parsed is not
+    cached as fresh.
+
+    The entry is written to a temporary file that is then renamed over the
+    old entry, so readers never see a partly written entry.
+
+    Returns True if the entry was written.
+    """
+    stat = os.stat(source_path) if stat is None else stat
+    content_hash = source_hash(source_path) if content_hash is None else content_hash
+    entry = {
+        "version": CACHE_VERSION,
+        "source_path": os.path.abspath(source_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": content_hash,
+        "root": root,
+    }
+
+    entry_path = cache_path(source_path)
+    temp_path = None
+    try:
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(entry_path), suffix=".tmp"
+        )
+        with os.fdopen(fd, mode="wb") as temp_file, _NoGC():
+            pickle.dump(entry, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, entry_path)
+        return True
+
+    # A read-only directory, or a tree too deep to pickle, just isn't cached
+    except (OSError, RecursionError, pickle.PicklingError):
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+
+def _entry_paths(target: str):
+    """
+    Yields the cache entry paths for 'target': a module, or a directory
+    whose modules' entries are all returned.
+    """
+    if os.path.isdir(target):
+        cache_dir = os.path.join(target, CACHE_DIR_NAME)
+        if os.path.isdir(cache_dir):
+            for file_name in sorted(os.listdir(cache_dir)):
+                if file_name.endswith(CACHE_SUFFIX):
+                    yield os.path.join(cache_dir, file_name)
+    elif os.path.exists(cache_path(target)):
+        yield cache_path(target)
+
+
+def info(target: str) -> list:
+    """
+    Describes the cache entries for 'target', a module or a directory.
+
+    Returns a list of dicts, one per entry, with the entry's path, the
+    source it was parsed from, its size on disk, and whether it is fresh.
+    """
+    entries = []
+    for entry_path in _entry_paths(target):
+        entry = _read_entry(entry_path)
+        description = {
+            "entry_path": entry_path,
+            "entry_size": os.path.getsize(entry_path),
+            "source_path": None if entry is None else entry["source_path"],
+            "fresh": False,
+        }
+        if entry is not None and os.path.exists(entry["source_path"]):
+            description["fresh"] = load(entry["source_path"]) is not None
+        entries.append(description)
+    return entries
+
+
+def clear(target: str) -> int:
+    """
+    Removes the cache entries for 'target', a module or a directory.
+    Returns the number of entries removed.
+    """
+    removed = 0
+    for entry_path in list(_entry_paths(target)):
+        os.remove(entry_path)
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in {"info", "clear"}:
+        print("usage: python playground_cache.py info|clear <module or directory> ...")
+        sys.exit(1)
+
+    command, targets = sys.argv[1], sys.argv[2:]
+    for target in targets:
+        if command == "clear":
+            print(f"{target}: removed {clear(target)} cache entries")
+            continue
+
+        for entry in info(target):
+            state = "fresh" if entry["fresh"] else "stale"
+            print(
+                f"{entry['entry_path']}: {state}, {entry['entry_size']} bytes, "
+                f"from {entry['source_path']}"
+            )
@@ -0,0 +1,655 @@
+"""
+The closure backend: compiles a PG_AST, once, into a tree of Python closures.
+
+Each node becomes one closure, specialized for what the node is, with its
+operands' closures and any literal value bound in advance. Running a program
+is calling the closure of its root; none of the work _exec() does on every
+visit of a node (working out what kind of node it is, converting literal
+token text to a value) is left to run time.
+
+Closures run against a PlaygroundInterpreter, and share its scopes and
+runtime objects (PG_Scope, PG_Class, PG_Function); calls, instantiation and
+assignments to dotted names go through the same interpreter methods the
+tree-walker uses, so both backends behave the same.
+"""
+from playground_ast import PG_AST, PG_Block, SCOPE_ELIDED, SCOPE_REUSED
+from playground_token import PG_Type as PGT
+from playground_scope import PG_Function, PG_Class
+from playground_resolver import resolve_function
+from playground_inline_cache import MISS
+
+_CONDITIONALS = {PGT.IF, PGT.ELIF}
+_BOOLEANS = {PGT.TRUE, PGT.FALSE}
+
+_dict_setitem = dict.__setitem__
+
+
+class ClosureCompiler:
+    def __init__(self, interp):
+        self.interp = interp
+
+        # Lexical addresses of the names in the function being compiled
+        self.addresses = {}
+
+    def compile_program(self, t: PG_AST):
+        """
+        Compiles the program rooted at 't'. Its statements run in the
+        current scope; no scope is pushed for them.
+
+        Returns the closure to call to run the program
+        """
+        interp = self.interp
+        statements = [self.compile(statement) for statement in t.children]
+
+        def program():
+            for statement in statements:
+                statement()
+                if interp.returning:
+                    break
+
+        return program
+
+    def compile(self, t: PG_AST):
+        """
+        Compiles node 't', checking what it is in the same order _exec() does.
+
+        Returns a closure, which takes no arguments, and returns what _exec()
+        would have returned for 't'
+        """
+        interp = self.interp
+        token_type = t.token.type if t.token != None else None
+
+        if t.artificial == True and t.name == "$STATEMENTS":
+            return self._block(t)
+
+        elif token_type is PGT.IMPORT or token_type is PGT.FROM:
+            return self._import(t)
+
+        elif token_type is PGT.CLASS:
+            return self._class_def(t)
+
+        elif token_type is PGT.PRINT:
+            return self._print(t)
+
+        elif token_type is PGT.DOT:
+            return self._reporting(t, self._dotted_expr(t))
+
+        elif interp.is_function_call(t):
+            return self._func_call(t)
+
+        elif token_type is PGT.DEF:
+            return self._func_def(t)
+
+        elif token_type is PGT.RETURN:
+            return self._return(t)
+
+        elif token_type is PGT.ASSIGN:
+            return self._assign(t)
+
+        elif token_type in _CONDITIONALS:
+            return self._conditional(t)
+
+        elif token_type is PGT.WHILE:
+            return self._while(t)
+
+        elif token_type in interp.operators:
+            return self._op(t)
+
+        elif token_type is PGT.AND:
+            return self._and(t)
+
+        elif token_type is PGT.OR:
+            return self._or(t)
+
+        elif token_type in interp.comparisons:
+            return self._cmp(t)
+
+        elif token_type in _BOOLEANS:
+            return self._constant(t.token.text == "True")
+
+        elif token_type is PGT.NAME:    return self._load(t)
+        elif token_type is PGT.INT:     return self._constant(int(t.token.text))
+        elif token_type is PGT.FLOAT:   return self._constant(float(t.token.text))
+        elif token_type is PGT.STRING:  return self._constant(str(t.token.text))
+
+        # Let the tree-walker report nodes it doesn't handle either
+        return lambda: interp._exec(t)
+
+    def _reporting(self, t: PG_AST, run):
+        interp = self.interp
+
+        def reporting():
+            return interp._exec_reporting(t, run)
+
+        return reporting
+
+    def _constant(self, value):
+        def constant():
+            return value
+
+        return constant
+
+    def _block(self, t: PG_AST):
+        """
+        A block statement; run in a scope of its own, unless it was elided,
+        and valued None
+        """
+        interp = self.interp
+        statements = [self.compile(statement) for statement in t.children]
+
+        if type(t) is PG_Block and t.scope is SCOPE_ELIDED:
+
+            def elided_block():
+                for statement in statements:
+                    statement()
+                    if interp.returning:
+                        break
+
+            return elided_block
+
+        def block():
+            interp._push_scope()
+            for statement in statements:
+                statement()
+                if interp.returning:
+                    break
+            interp._pop_scope()
+
+        return block
+
+    def _body(self, t: PG_AST, class_name: str = None):
+        """
+        The body of the function defined by DEF node 't'; like a block, but
+        valued the value of the last statement run. Names that have a
+        lexical address are compiled to read and write their slot directly.
+        """
+        interp = self.interp
+        saved_addresses = self.addresses
+        self.addresses = resolve_function(t, class_name)
+        statements = [self.compile(statement) for statement in t.children[2].children]
+        self.addresses = saved_addresses
+
+        if type(t.children[2]) is PG_Block and t.children[2].scope is SCOPE_ELIDED:
+
+            def elided_body():
+                ret_val = None
+                for statement in statements:
+                    ret_val = statement()
+                    if interp.returning:
+                        break
+                return ret_val
+
+            return elided_body
+
+        def body():
+            interp._push_scope()
+            ret_val = None
+            for statement in statements:
+                ret_val = statement()
+                if interp.returning:
+                    break
+            interp._pop_scope()
+            return ret_val
+
+        return body
+
+    def _return(self, t: PG_AST):
+        """
+        See PlaygroundInterpreter._return()
+        """
+        interp = self.interp
+        expr = self.compile(t.children[0])
+
+        def return_value():
+            ret_val = expr()
+            interp.return_value = ret_val
+            interp.returning = True
+            return ret_val
+
+        return return_value
+
+    def _import(self, t: PG_AST):
+        interp = self.interp
+
+        # The module is parsed, and compiled, when the import runs
+        def import_module():
+            interp._import(t)
+
+        return import_module
+
+    def _print(self, t: PG_AST):
+        args = []
+        if len(t.children) > 0:
+            args = [self.compile(arg) for arg in t.children[0].children]
+
+        def print_args():
+            for arg in args:
+                print(arg(), end="")
+            print()
+
+        return print_args
+
+    def _dotted_expr(self, t: PG_AST):
+        interp = self.interp
+        lhs = t.children[0]
+        rhs = t.children[1]
+
+        # 'this' is never loaded; the instance is None then
+        this = lhs.token.text == "this"
+        load_instance = self._load(lhs) if not this else lambda: None
+
+        # Chained dotted expressions; the instance is still loaded first
+        if rhs.token.type is PGT.DOT:
+            chained = self._dotted_expr(rhs)
+
+            def dotted_chain():
+                load_instance()
+                return chained()
+
+            return dotted_chain
+
+        # Dotted function call; methods of instances are found by the site's
+        # inline cache
+        if interp.is_function_call(rhs) and not this:
+            args = self._args(rhs)
+            cache = interp._inline_cache(rhs)
+
+            def dotted_method_call():
+                instance = load_instance()
+                interp._push_instance(instance)
+                args_list = [arg() for arg in args]
+                method = cache.find_method(instance, len(args_list))
+                if method is None:
+                    result = interp._call(rhs, args_list)
+                else:
+                    result = interp._call_function(method, args_list)
+                interp._pop_scope()
+                return result
+
+            return dotted_method_call
+
+        if interp.is_function_call(rhs):
+            call = self._func_call(rhs)
+
+            def dotted_call():
+                instance = load_instance()
+                interp._push_instance(instance)
+                result = call()
+                interp._pop_scope()
+                return result
+
+            return dotted_call
+
+        # Dotted field access
+        elif rhs.token.type is PGT.NAME:
+            field = rhs.token.text
+
+            if field == "attrs" or field == "methods":
+
+                def dotted_members():
+                    instance = load_instance()
+                    return getattr(instance, field)
+
+                return dotted_members
+
+            def load_field(instance):
+                interp._push_instance(instance)
+                if instance != None:
+                    result = interp.current_space.resolve(field)
+                else:
+                    result = interp._load(rhs, this=True)
+                interp._pop_scope()
+                return result
+
+            if this:
+                return lambda: load_field(None)
+
+            cache = interp._inline_cache(rhs)
+
+            def dotted_field():
+                instance = load_instance()
+                result = cache.load_field(instance)
+                if result is MISS:
+                    result = load_field(instance)
+                return result
+
+            return dotted_field
+
+        def dotted_other():
+            load_instance()
+            return None
+
+        return dotted_other
+
+    def _args(self, t: PG_AST):
+        if len(t.children) > 0:
+            return [self.compile(arg) for arg in t.children[0].children]
+        return []
+
+    def _func_call(self, t: PG_AST):
+        interp = self.interp
+        args = self._args(t)
+
+        def func_call():
+            return interp._call(t, [arg() for arg in args])
+
+        return func_call
+
+    def _params(self, t: PG_AST):
+        return [param.token.text for param in t.children[1].children]
+
+    def _func_def(self, t: PG_AST):
+        interp = self.interp
+        name = t.children[0].token.text
+        params = self._params(t)
+        code = t.children[2]
+        body = self._body(t)
+
+        if len(t.children) == 4:
+            # Each definition of a memoized function has a memo table of its own
+
+            def memo_func_def():
+                interp._define_function(
+                    PG_Function(
+                        name=name,
+                        params=params,
+                        code=code,
+                        body=body,
+                        memo=interp._memo_table(name, params),
+                    )
+                )
+
+            return memo_func_def
+
+        # Made once; running the def again only binds it
+        function = PG_Function(name=name, params=params, code=code, body=body)
+
+        def func_def():
+            interp._define_function(function)
+
+        return func_def
+
+    def _class_def(self, t: PG_AST):
+        """
+        See PlaygroundInterpreter._class_def(); the statements of the class
+        body are sorted into attributes, methods and other statements here,
+        at compile time.
+        """
+        interp = self.interp
+        name = t.children[0].token.text
+
+        # (attr name, value closure or None), the PG_Function of a method,
+        # made once for every time the class body runs, or (None, closure)
+        # for statements that are simply run
+        members = []
+        for statement in t.children[1].children:
+            stmnt_tk_type = statement.token.type
+            if stmnt_tk_type == PGT.ASSIGN:
+                attr_name = statement.children[0].token.text
+                members.append((attr_name, self.compile(statement.children[1])))
+
+            elif stmnt_tk_type == PGT.NAME:
+                members.append((statement.token.text, None))
+
+            elif stmnt_tk_type is PGT.DEF:
+                members.append(
+                    PG_Function(
+                        name=statement.children[0].token.text,
+                        params=self._params(statement),
+                        code=statement.children[2],
+                        body=self._body(statement, name),
+                    )
+                )
+            else:
+                members.append((None, self.compile(statement)))
+
+        def class_def():
+            new_class = PG_Class(name=name, is_class_def=True)
+            symbols = new_class.symbols
+            for member in members:
+                if type(member) is PG_Function:
+                    new_class.add_method(member)
+                elif member[0] is None:
+                    member[1]()
+                    if interp.returning:
+                        # A return in a class body ends the class body
+                        interp.returning = False
+                        interp.return_value = None
+                        break
+                else:
+                    attr_name, value = member
+                    symbols[attr_name] = None if value is None else value()
+
+            # Place class object into current scope/symbol table
+            interp.current_space.symbols[name] = new_class
+            interp._bound(interp.current_space, name)
+
+        return class_def
+
+    def _assign(self, t: PG_AST):
+        interp = self.interp
+        lhs = t.children[0]
+        value = self.compile(t.children[1])
+
+        # Dotted assignments can fail on 'this'; leave them to the interpreter
+        if lhs.token.type is PGT.DOT:
+
+            def assign_dotted():
+                interp._store(lhs, value())
+
+            return self._reporting(t, assign_dotted)
+
+        name = lhs.token.text
+        address = self.addresses.get(lhs)
+        if address is not None:
+            return self._assign_local(name, address, value)
+
+        cached_names = interp.cached_names
+
+        def assign():
+            result = value()
+            symbol_scope = interp.current_space.resolve_scope(name)
+            if symbol_scope is None:
+                symbol_scope = interp.current_space
+            symbol_scope.symbols[name] = result
+            if name in cached_names:
+                interp._bound(symbol_scope, name)
+
+        return assign
+
+    def _assign_local(self, name: str, address: tuple, value):
+        find_scope = self._function_scope(address[0])
+        slot = address[1]
+        interp = self.interp
+        cached_names = interp.cached_names
+
+        def assign_local():
+            result = value()
+            scope = find_scope()
+            scope.slots[slot] = result
+            _dict_setitem(scope.symbols, name, result)
+            if name in cached_names:
+                interp._bound(scope, name)
+
+        return assign_local
+
+    def _load(self, t: PG_AST):
+        interp = self.interp
+        name = t.token.text
+
+        address = self.addresses.get(t)
+        if address is not None:
+            return self._load_local(address)
+
+        cache = interp._global_cache(t)
+
+        def load():
+            return interp._load_name(cache)
+
+        return load
+
+    def _load_local(self, address: tuple):
+        interp = self.interp
+        depth, slot = address
+
+        # The common depths get closures of their own
+        if depth == 0:
+
+            def load_local():
+                return interp.current_space.slots[slot]
+
+        elif depth == 1:
+
+            def load_local():
+                return interp.current_space.parent.slots[slot]
+
+        elif depth == 2:
+
+            def load_local():
+                return interp.current_space.parent.parent.slots[slot]
+
+        else:
+            find_scope = self._function_scope(depth)
+
+            def load_local():
+                return find_scope().slots[slot]
+
+        return load_local
+
+    def _function_scope(self, depth: int):
+        """
+        Returns a closure that finds the PG_FunctionScope 'depth' scopes up
+        from the current scope
+        """
+        interp = self.interp
+
+        def function_scope():
+            scope = interp.current_space
+            for _ in range(depth):
+                scope = scope.parent
+            return scope
+
+        return function_scope
+
+    def _conditional(self, t: PG_AST):
+        test = self.compile(t.children[0])
+        block = self.compile(t.children[1])
+
+        # elif or else clause present
+        if len(t.children) == 3:
+            orelse = self.compile(t.children[2])
+
+            def if_else():
+                if test():
+                    block()
+                else:
+                    orelse()
+
+            return if_else
+
+        def if_only():
+            if test():
+                block()
+
+        return if_only
+
+    def _while(self, t: PG_AST):
+        interp = self.interp
+        test = self.compile(t.children[0])
+        body = t.children[1]
+
+        if type(body) is PG_Block and body.scope is SCOPE_REUSED:
+            # Every iteration runs in the same scope, emptied after it
+            statements = [self.compile(statement) for statement in body.children]
+
+            def reused_while_loop():
+                interp._push_scope()
+                while test():
+                    for statement in statements:
+                        statement()
+                        if interp.returning:
+                            break
+                    if interp.returning:
+                        break
+                    interp._clear_scope()
+                interp._pop_scope()
+
+            return reused_while_loop
+
+        block = self.compile(body)
+
+        def while_loop():
+            while test():
+                block()
+                if interp.returning:
+                    break
+
+        return while_loop
+
+    def _op(self, t: PG_AST):
+        token_type = t.token.type
+        a = self.compile(t.children[0])
+        b = self.compile(t.children[1])
+
+        if token_type is PGT.PLUS:
+            def op():
+                return a() + b()
+        elif token_type is PGT.MINUS:
+            def op():
+                return a() - b()
+        elif token_type is PGT.STAR:
+            def op():
+                return a() * b()
+        elif token_type is PGT.FSLASH:
+            def op():
+                return a() / b()
+        else:
+            def op():
+                return a() % b()
+        return op
+
+    def _and(self, t: PG_AST):
+        a = self.compile(t.children[0])
+        b = self.compile(t.children[1])
+
+        # Short circuit the AND
+        def and_op():
+            if a() == False:
+                return False
+            return b() == True
+
+        return and_op
+
+    def _or(self, t: PG_AST):
+        a = self.compile(t.children[0])
+        b = self.compile(t.children[1])
+
+        # Short Circuit 'or' statement
+        def or_op():
+            if a() == True:
+                return True
+            return b() == True
+
+        return or_op
+
+    def _cmp(self, t: PG_AST):
+        token_type = t.token.type
+        a = self.compile(t.children[0])
+        b = self.compile(t.children[1])
+
+        if token_type is PGT.EQ:
+            def cmp():
+                return a() == b()
+        elif token_type is PGT.LT:
+            def cmp():
+                return a() < b()
+        elif token_type is PGT.LE:
+            def cmp():
+                return a() <= b()
+        elif token_type is PGT.GT:
+            def cmp():
+                return a() > b()
+        else:
+            def cmp():
+                return a() >= b()
+        return cmp
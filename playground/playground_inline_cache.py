@@ -0,0 +1,167 @@
+"""
+Inline caches for dotted expressions: obj.field and obj.method(...)
+
+Looking up a field, or a method, by name means pushing the instance as a
+scope and resolving the name up through the scopes from there. An inline
+cache belongs to one such site in the code, and remembers what the lookup
+found for the shapes (see PG_Shape) of the instances it has seen there:
+
+    field sites   the slot of the field in the instance's values
+    method sites  the PG_Function called, for the site's number of arguments
+
+A shape fixes both: where each attribute is kept, and, since shapes are
+never shared across class definitions, which methods the instance has. So
+an instance of a shape the cache has seen is looked up with a single dict
+lookup, and nothing is pushed. A site that sees more than MAX_SHAPES
+shapes keeps working, through the shape's own tables, without remembering
+any more of them.
+
+Anything a cache can't answer (class definitions, names found outside the
+instance, constructors, the 'attrs' and 'methods' members) is a miss, and
+left to the ordinary lookup.
+
+Plain calls, f(...), have caches too (PG_CallCache): what the call's name
+resolved to, for the site's number of arguments; a function, a class to
+instantiate, or str(). Scoping is dynamic, so what a name resolves to can
+change with any binding of it, and with any scope that binds it being
+pushed or popped. The interpreter counts those changes in its binding
+version, and a call cache is only used while the version is the one it was
+filled at.
+
+Loads of names that aren't bound in the current scope have global caches
+(PG_GlobalCache), which remember that the name was found in the globals,
+at the root of every scope chain, and nowhere on the way there. While the
+binding version is the one the cache was filled at, the load reads the
+globals' symbol table directly, instead of looking the name up in each of
+the scopes in between. The value itself isn't kept, so rebinding a global
+leaves its caches valid.
+"""
+
+# Returned by PG_InlineCache.load_field() when the ordinary lookup is needed
+MISS = object()
+
+# Names dotted expressions treat specially, which are never cached
+_UNCACHED = {"attrs", "methods", "str"}
+
+
+class PG_InlineCache:
+    __slots__ = ("name", "entries", "hits", "misses", "cacheable")
+
+    # How many shapes a site remembers; sites that see more are megamorphic
+    MAX_SHAPES = 4
+
+    def __init__(self, name: str):
+        self.name = name  # The field, or method, name at the site
+        self.entries = {}  # Shape -> field slot, or method
+        self.hits = 0
+        self.misses = 0
+        self.cacheable = name not in _UNCACHED
+
+    @property
+    def megamorphic(self):
+        return len(self.entries) >= self.MAX_SHAPES
+
+    def load_field(self, instance):
+        """
+        Returns the value of the site's field of 'instance', or MISS if it
+        isn't one of the instance's attributes
+        """
+        try:
+            symbols = instance.symbols
+            slot = self.entries.get(symbols.shape)
+        except AttributeError:
+            self.misses += 1
+            return MISS
+
+        if slot is not None:
+            self.hits += 1
+            return symbols.values[slot]
+
+        self.misses += 1
+        if not self.cacheable:
+            return MISS
+        shape = symbols.shape
+        slot = shape.index.get(self.name)
+        if slot is None:
+            return MISS
+        if len(self.entries) < self.MAX_SHAPES:
+            self.entries[shape] = slot
+        return symbols.values[slot]
+
+    def find_method(self, instance, args_len: int):
+        """
+        Returns the method of 'instance' the site calls with 'args_len'
+        arguments, or None if the call has to be looked up by name
+        """
+        try:
+            symbols = instance.symbols
+            method = self.entries.get(symbols.shape)
+        except AttributeError:
+            self.misses += 1
+            return None
+
+        if method is not None:
+            self.hits += 1
+            return method
+
+        self.misses += 1
+        name = self.name
+        shape = symbols.shape
+
+        # Attributes shadow methods; calling a constructor instantiates
+        if not self.cacheable or name in shape.index or name == instance.name:
+            return None
+        methods = symbols.methods.get(name)
+        if methods is None:
+            return None
+        method = methods.get(args_len)
+        if method is not None and len(self.entries) < self.MAX_SHAPES:
+            self.entries[shape] = method
+        return method
+
+    def __repr__(self):
+        return (
+            f"<InlineCache: {self.name}, shapes: {len(self.entries)},"
+            f" hits: {self.hits}, misses: {self.misses}>"
+        )
+
+
+class PG_CallCache:
+    """
+    The cache of a call site, f(...), that isn't a dotted method call: what
+    the call resolved to (see PlaygroundInterpreter._call_target()), valid
+    for as long as the interpreter's binding version is the one it was
+    resolved at.
+    """
+
+    __slots__ = ("name", "target", "version", "hits", "misses")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.target = None  # A PG_Function, the PG_Class instantiated, or None for str()
+        self.version = -1  # Never a binding version
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"<CallCache: {self.name}, hits: {self.hits}, misses: {self.misses}>"
+
+
+class PG_GlobalCache:
+    """
+    The cache of a name load site: whether the name was found in the
+    globals (see PlaygroundInterpreter._load_global()), valid for as long as
+    the interpreter's binding version is the one it was found at.
+    """
+
+    __slots__ = ("name", "version", "hits", "misses", "depth_avoided")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = -1  # Never a binding version
+        self.hits = 0
+        self.misses = 0
+        self.depth_avoided = 0  # The scopes the hits didn't look the name up in
+
+    def __repr__(self):
+        return f"<GlobalCache: {self.name}, hits: {self.hits}, misses: {self.misses}>"
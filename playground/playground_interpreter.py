@@ -1,11 +1,42 @@
+from functools import partial
 from os import path
-from copy import deepcopy
-from sys import path as sys_path
+from time import perf_counter
 
-from playground_ast import PG_AST
+import playground_cache
+from abstract.abs_scope import LazySymbol
+from playground_ast import PG_AST, PG_Literal, PG_QuickOp, PG_Block, SCOPE_ELIDED, SCOPE_REUSED
 from playground_token import PG_Type as PGT, PG_Token
 from playground_parser import PlaygroundParser
-from playground_scope import PG_Scope, PG_Function, PG_Class
+from playground_scope import (
+    PG_Scope,
+    PG_FunctionScope,
+    PG_InstanceScope,
+    PG_InstanceSymbols,
+    PG_Function,
+    PG_Class,
+)
+from playground_closures import ClosureCompiler
+from playground_bytecode import BytecodeCompiler
+from playground_vm import PlaygroundVM
+from playground_inline_cache import PG_InlineCache, PG_CallCache, PG_GlobalCache, MISS
+from playground_optimizer import PlaygroundOptimizer, DEFAULT_PASSES
+from playground_memo import PG_MemoTable, DEFAULT_MEMO_SIZE
+from playground_quicken import quicken
+from playground_modules import (
+    PG_ModuleRegistry,
+    PG_Module,
+    PG_LazyImport,
+    LOADED,
+    canonical,
+    import_names,
+    merged,
+)
+
+# Ways a program can be run:
+#   tree     Walk the PG_AST, dispatching on each node as it is reached
+#   closure  Compile the PG_AST to a tree of closures first, then call it
+#   vm       Compile the PG_AST to bytecode first, then run it on a stack VM
+BACKENDS = ("tree", "closure", "vm")
 
 
 class UnsupportedOperationException(Exception):
@@ -15,12 +46,95 @@ class UnsupportedOperationException(Exception):
 
 
 class PlaygroundInterpreter:
-    def __init__(self):
+    def __init__(
+        self,
+        use_cache=False,
+        backend="tree",
+        passes=DEFAULT_PASSES,
+        lazy_imports=False,
+        memo_size=DEFAULT_MEMO_SIZE,
+        adaptive=False,
+        track_scopes=False,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+
         self.globals = PG_Scope(name="globals")
         self.current_space = self.globals
+
+        # Keep the scopes pushed on each scope in its 'children', for debugging
+        self.track_scopes = track_scopes
         self.root = None
         self.parser = None
 
+        # Load the ASTs of modules from, and save them to, the AST cache;
+        # off unless asked for, since it writes a directory beside each module
+        self.use_cache = use_cache
+
+        # Runs the optimization passes named in 'passes' over every program,
+        # and module, before it is run
+        self.optimizer = PlaygroundOptimizer(passes)
+
+        # The inline cache of each dotted field access, and method call, site
+        self.inline_caches = {}
+
+        # The call cache of each other call site, and the names they call
+        self.call_caches = {}
+        self.call_names = set()
+
+        # The global cache of each name load site, and the names they found
+        # in the globals; see _load_global()
+        self.global_caches = {}
+        self.global_names = set()
+
+        # Call and global caches are valid while 'binding_version' is the
+        # one they were filled at; see _bound(). The names either cache
+        # depends on, and the shapes of the instances whose members shadow
+        # them, as far as they have been worked out
+        self.cached_names = set()
+        self.binding_version = 0
+        self.shadowing_shapes = {}
+
+        # The PG_InstanceScope of the instance whose method, or constructor,
+        # is running innermost; see _get_enclosing_class()
+        self.instance_scope = None
+
+        # Every module run, each only once; see playground_modules.py
+        self.modules = PG_ModuleRegistry()
+
+        # Only parse a module when it is imported; run it when one of the
+        # names it brings in is first resolved. See PG_LazyImport
+        self.lazy_imports = lazy_imports
+
+        # The PG_Function of each def node, made the first time it runs;
+        # running it again only binds it. See _func_def()
+        self.functions = {}
+
+        # The memo table of the latest function defined with memo def, per
+        # name and number of parameters; each holds up to 'memo_size' values
+        self.memo_size = memo_size
+        self.memo_tables = {}
+
+        # Have the tree-walker specialize arithmetic and comparisons for the
+        # operand types they see; the PG_OpSite of each. See playground_quicken.py
+        self.adaptive = adaptive
+        self.op_sites = []
+
+        # Set by a return statement, until the function it returns from has
+        # its value; the statements, blocks and loops it is nested in stop
+        # running as they see it. See _return()
+        self.returning = False
+        self.return_value = None
+
+        self.backend = backend
+        self.closure_compiler = ClosureCompiler(self)
+        self.bytecode_compiler = BytecodeCompiler(
+            self.is_function_call,
+            inline_cache=self._inline_cache,
+            global_cache=self._global_cache,
+        )
+        self.vm = PlaygroundVM(self)
+
         self.operators = {PGT.PLUS, PGT.MINUS, PGT.STAR, PGT.FSLASH, PGT.PERCENT}
 
         self.conditionals = {
@@ -41,29 +155,106 @@ class PlaygroundInterpreter:
     def _push_scope(self, name="", scope_to_use=None):
         """
         Creates a new scope (if one was not passed in via 'scope_to_use'),
-        places new scope in child list of the current scope, and then sets
-        the current scope to the new scope.
+        places new scope in child list of the current scope, if scopes are
+        tracked, and then sets the current scope to the new scope.
 
         Returns None
         """
         new_scope = PG_Scope(name=name) if scope_to_use is None else scope_to_use
-        new_scope.depth = self.current_space.depth + 1
-        new_scope.parent = self.current_space
-        self.current_space.children.append(new_scope)
+        current_space = self.current_space
+        new_scope.depth = current_space.depth + 1
+        new_scope.parent = current_space
+        if self.track_scopes:
+            if current_space.children is None:
+                current_space.children = []
+            current_space.children.append(new_scope)
+        if new_scope.binds_cached:
+            self.binding_version += 1
         self.current_space = new_scope
 
+    def _push_instance(self, instance):
+        """
+        Pushes a PG_InstanceScope for 'instance' as the current scope; or an
+        empty scope if 'instance' is None, as it is for 'this'.
+
+        Returns None
+        """
+        if instance is None:
+            self._push_scope()
+            return
+        instance_scope = PG_InstanceScope(instance)
+        instance_scope.binds_cached = self._shadows_cached(instance)
+        instance_scope.outer = self.instance_scope
+        self.instance_scope = instance_scope
+        self._push_scope(scope_to_use=instance_scope)
+
+    def _shadows_cached(self, instance) -> bool:
+        """
+        Returns whether any of the members of 'instance', or class definition,
+        are named as a call or global cache depends on; besides its
+        constructors, which are only called from inside it as such (see
+        _call_target())
+        """
+        symbols = instance.symbols
+        if type(symbols) is not PG_InstanceSymbols:
+            return bool(self.cached_names.intersection(symbols) - {instance.name})
+
+        shape = symbols.shape
+        shadows = self.shadowing_shapes.get(shape)
+        if shadows is None:
+            # The methods of an instance are fixed by its shape too
+            cached_names = self.cached_names
+            shadows = not cached_names.isdisjoint(shape.names) or bool(
+                cached_names.intersection(symbols.methods) - {instance.name}
+            )
+            self.shadowing_shapes[shape] = shadows
+        return shadows
+
     def _pop_scope(self):
         """
         Sets the current scope to the parent of the current scope.
 
         Returns None
         """
-        parent_scope = self.current_space.parent
+        scope = self.current_space
+        parent_scope = scope.parent
         # In some cases, like function defs, or class or struct defs,
         # We should not pop the scope. We want those symbols defined.
-        parent_scope.children.pop()
+        if self.track_scopes:
+            parent_scope.children.pop()
+        if scope.binds_cached:
+            self.binding_version += 1
+        if type(scope) is PG_InstanceScope:
+            self.instance_scope = scope.outer
         self.current_space = parent_scope
 
+    def _clear_scope(self):
+        """
+        Empties the current scope, for the next iteration of a loop whose
+        body runs in it; see SCOPE_REUSED.
+
+        Returns None
+        """
+        scope = self.current_space
+        scope.symbols.clear()
+        if scope.binds_cached:
+            scope.binds_cached = False
+            self.binding_version += 1
+
+    def _bound(self, scope, name: str):
+        """
+        Keeps the call and global caches valid once 'name' has been bound in
+        'scope'. If a cache depends on 'name', what it holds may be wrong
+        from now on, and again once 'scope' is popped, so it is marked to
+        bump the binding version then too. Global caches read the value from
+        the globals, so a name bound there only matters to call caches.
+
+        Returns None
+        """
+        if name in self.cached_names and (scope is not self.globals or name in self.call_names):
+            scope.binds_cached = True
+            self.binding_version += 1
+
     def interp(self, input_str):
         """
         Call this to run your program.
@@ -74,8 +265,58 @@ class PlaygroundInterpreter:
 
         self.root = self.parser.program()
         if self.root != None:
+            self.root = self.optimizer.optimize(self.root)
             self._program(self.root)
 
+    def interp_file(self, file_path):
+        """
+        Runs the Playground module at 'file_path', in the global scope;
+        its imports are relative to its directory.
+
+        Returns None
+        """
+        module = self.modules.add(canonical(file_path))
+        module.scope = self.globals
+        self.modules.begin(module)
+        loaded = False
+        try:
+            start = perf_counter()
+            self.root = self._parse_module(file_path)
+            module.parse_time = perf_counter() - start
+            if self.root != None:
+                start = perf_counter()
+                self._program(self.root)
+                module.run_time = perf_counter() - start
+            loaded = True
+        finally:
+            self.modules.end(module, loaded)
+
+    def _parse_module(self, file_path):
+        """
+        Returns the optimized PG_AST of the module at 'file_path'; from the AST cache
+        if it has a fresh entry for the module, otherwise by parsing the
+        module, and caching the result.
+
+        The module is lexed in chunks straight from the file, instead of
+        being read into a string first.
+        """
+        if self.use_cache:
+            root = playground_cache.load(file_path)
+            if root != None:
+                return self.optimizer.optimize(root)
+            snapshot = playground_cache.snapshot(file_path)
+
+        with open(file_path, mode="r") as source:
+            self.parser = PlaygroundParser(source=source)
+            root = self.parser.program()
+
+        # The cache keeps the tree as parsed, whichever passes run over it
+        if root != None and self.use_cache:
+            playground_cache.store(file_path, root, *snapshot)
+        if root != None:
+            root = self.optimizer.optimize(root)
+        return root
+
     def is_function_call(self, t: PG_AST):
         token_type = t.token.type if t.token != None else None
         return (
@@ -84,11 +325,57 @@ class PlaygroundInterpreter:
             and t.children[0].name == "$ARG_LIST"
         )
 
+    def _inline_cache(self, t: PG_AST) -> PG_InlineCache:
+        """
+        Returns the inline cache of the dotted field access, or method call,
+        whose rhs is 't'
+        """
+        cache = self.inline_caches.get(t)
+        if cache is None:
+            cache = self.inline_caches[t] = PG_InlineCache(t.token.text)
+        return cache
+
+    def inline_cache_stats(self) -> dict:
+        """
+        Returns the hits and misses of all the inline caches, in total, and
+        how many sites have them, and how many of those are megamorphic
+        """
+        caches = self.inline_caches.values()
+        return {
+            "sites": len(caches),
+            "hits": sum(cache.hits for cache in caches),
+            "misses": sum(cache.misses for cache in caches),
+            "megamorphic": sum(1 for cache in caches if cache.megamorphic),
+        }
+
+    def quicken_stats(self) -> dict:
+        """
+        Returns how many arithmetic and comparison sites adaptive mode has
+        quickened, how many of those are specialized now, and for which
+        operand types, how many have given up and stay generic, and how
+        many times sites have deoptimized
+        """
+        sites = self.op_sites
+        by_types = {}
+        for site in sites:
+            if site.left is not None:
+                types = f"{site.left.__name__}, {site.right.__name__}"
+                by_types[types] = by_types.get(types, 0) + 1
+        return {
+            "sites": len(sites),
+            "specialized": sum(by_types.values()),
+            "by_types": by_types,
+            "generic": sum(1 for site in sites if site.generic),
+            "deopts": sum(site.deopts for site in sites),
+        }
+
     def _get_enclosing_class(self):
-        scope = self.current_space 
-        while type(scope) != PG_Class and scope != None:
-            scope = scope.parent
-        return scope
+        """
+        Returns the PG_InstanceScope of the instance whose method, or
+        constructor, is running, or None. The innermost one on the scope
+        chain is the last one pushed, which _push_instance() keeps track of.
+        """
+        return self.instance_scope
 
     def _exec(self, t: PG_AST):
         """
@@ -96,13 +383,27 @@ class PlaygroundInterpreter:
 
         May return an INT, a FLOAT, or a BOOL
         """
+        # Literals the optimizer has already converted
+        node_type = type(t)
+        if node_type is PG_Literal:
+            return t.value
+
+        # Arithmetic and comparisons quickened in adaptive mode
+        if node_type is PG_QuickOp:
+            site = t.site
+            a = self._exec(t.children[0])
+            b = self._exec(t.children[1])
+            if type(a) is site.left and type(b) is site.right:
+                return site.fn(a, b)
+            return site.miss(a, b)
+
         try:
             token_type = t.token.type if t.token != None else None
 
             if t.artificial == True and t.name == "$STATEMENTS":
                 self._statements(t)
             
-            elif token_type is PGT.IMPORT:
+            elif token_type is PGT.IMPORT or token_type is PGT.FROM:
                 self._import(t)
 
             elif token_type is PGT.CLASS:
@@ -160,13 +461,35 @@ class PlaygroundInterpreter:
             print("Problem executing", t.to_string_tree(), e)
         return None
 
+    def _exec_reporting(self, t: PG_AST, run):
+        """
+        Calls 'run', which executes node 't' some other way than _exec(),
+        and reports an UnsupportedOperationException like _exec() does.
+        """
+        try:
+            return run()
+        except UnsupportedOperationException as e:
+            print("Problem executing", t.to_string_tree(), e)
+        return None
+
     def _program(self, t: PG_AST):
         """
-        Executes the program.
+        Executes the program, with the selected backend.
 
         returns None
         """
-        self._statements(t, push_scope=False)
+        if self.backend == "closure":
+            self.closure_compiler.compile_program(t)()
+        elif self.backend == "vm":
+            self.vm.run(self.bytecode_compiler.compile_program(t))
+        else:
+            if self.adaptive:
+                quicken(t, self.op_sites)
+            self._statements(t, push_scope=False)
+
+        # A return outside of any function only ends the module it is in
+        self.returning = False
+        self.return_value = None
 
     def _statements(self, t: PG_AST, push_scope=True):
         """
@@ -175,12 +498,16 @@ class PlaygroundInterpreter:
 
         Returns None
         """
+        if push_scope and type(t) is PG_Block and t.scope is SCOPE_ELIDED:
+            push_scope = False
         if push_scope:
             self._push_scope()
 
         ret_val = None
         for statement in t.children:
             ret_val = self._exec(statement)
+            if self.returning:
+                break
         
         if push_scope:
             self._pop_scope()
@@ -188,15 +515,127 @@ class PlaygroundInterpreter:
         return ret_val
 
     def _import(self, t: PG_AST):
-        cwd = sys_path[0]
+        """
+        Imports the module 't' names: runs it, if this is the first time it
+        is imported, then binds the names it defined, or just the names 't'
+        lists, in the current scope.
+
+        With lazy imports on, a module that hasn't run yet is only parsed;
+        the names are bound to LazySymbols, which run it when first
+        resolved.
+
+        Returns None
+        """
         module_name = t.children[0].token.text
-        cur_path = path.join(cwd, module_name)
-        module_text = open(cur_path, mode='r').read()
-        import_parser = PlaygroundParser(input_str=module_text)
+        module_path = self.modules.canonical_path(module_name)
+        module = self._module(module_path)
+        module.imports += 1
+        names = import_names(t)
+
+        if self.lazy_imports and module.state is not LOADED:
+            self.modules.check_cycles(module, self._module)
+            defined = self.modules.module_names(module, self._module)
+            selective = names is not None
+            if selective:
+                for name in names:
+                    if name not in defined:
+                        raise ImportError(f"Module {module_name} does not define {name}")
+            else:
+                names = defined
+            symbols = self.current_space.symbols
+            PG_LazyImport(
+                partial(self._load_module, module_path), module_name, selective, symbols, names
+            )
+            for name in names:
+                self._bound(self.current_space, name)
+            return
+
+        module_symbols = self._load_module(module_path).scope.symbols
+        if names is None:
+            names = module_symbols
+        symbols = self.current_space.symbols
+        for name in names:
+            if name not in module_symbols:
+                raise ImportError(f"Module {module_name} does not define {name}")
+            value = module_symbols[name]
+            if type(value) is LazySymbol:
+                # Brought in by a lazy import of the module's own
+                value = value.loader()
+            symbols[name] = merged(symbols.get(name), value)
+            self._bound(self.current_space, name)
+
+    def _module(self, module_path: str) -> PG_Module:
+        """
+        Returns the module at canonical path 'module_path'; parses, and
+        registers, it if it hasn't been imported before
+        """
+        module = self.modules.get(module_path)
+        if module is None:
+            start = perf_counter()
+            import_root = self._parse_module(module_path)
+            module = self.modules.add(module_path, import_root)
+            module.parse_time = perf_counter() - start
+        return module
+
+    def _load_module(self, module_path: str) -> PG_Module:
+        """
+        Runs the module at canonical path 'module_path' in a scope of its
+        own, unless it has run already.
 
-        import_root = import_parser.program()
-        if import_root != None:
-           self._program(import_root)
+        Returns the PG_Module
+        """
+        module = self._module(module_path)
+        if module.state is LOADED:
+            return module
+
+        self.modules.begin(module)
+        module.scope = PG_Scope(name=f"module_{path.basename(module_path)}")
+        loaded = False
+        try:
+            if module.root != None:
+                start = perf_counter()
+                self._run_isolated(module.scope, module.root)
+                module.run_time = perf_counter() - start
+            loaded = True
+        finally:
+            self.modules.end(module, loaded)
+        return module
+
+    def _run_isolated(self, scope: PG_Scope, root: PG_AST):
+        """
+        Runs program 'root' in 'scope', as the root of a scope chain of its
+        own: what it binds lands in 'scope', whatever scope it was run from,
+        and none of the importer's names are seen from it.
+
+        Returns None
+        """
+        saved_space = self.current_space
+        saved_instance = self.instance_scope
+        call_names = len(self.call_names)
+        self.current_space = scope
+        self.instance_scope = None
+        # The caches were filled on the importer's chain, and the module's
+        # own are of no use once it is left
+        self.binding_version += 1
+        try:
+            self._program(root)
+        finally:
+            self.current_space = saved_space
+            self.instance_scope = saved_instance
+            self.binding_version += 1
+            if len(self.call_names) != call_names:
+                # Names first called in the module; the importer's scopes
+                # didn't keep track of theirs (see _call_cache())
+                while saved_space is not None:
+                    saved_space.binds_cached = True
+                    saved_space = saved_space.parent
+
+    def import_stats(self) -> dict:
+        """
+        Returns, per module run, how long it took to parse and to run, and
+        how many times it was imported; see PG_ModuleRegistry.stats()
+        """
+        return self.modules.stats()
 
     def _print(self, t: PG_AST):
         """
@@ -233,21 +672,34 @@ class PlaygroundInterpreter:
 
         # Dotted function call
         if self.is_function_call(rhs):
-            self._push_scope(name="", scope_to_use=instance)
-            result = self._func_call(rhs)
+            self._push_instance(instance)
+            if instance != None:
+                args_list = self._args(rhs)
+                method = self._inline_cache(rhs).find_method(instance, len(args_list))
+                if method is None:
+                    result = self._call(rhs, args_list)
+                else:
+                    result = self._call_function(method, args_list)
+            else:
+                result = self._func_call(rhs)
             self._pop_scope()
             return result
 
         # Dotted field access
         elif rhs_tk_type is PGT.NAME:
-            
+
+            if instance != None:
+                result = self._inline_cache(rhs).load_field(instance)
+                if result is not MISS:
+                    return result
+
             if rhs.token.text == 'attrs':
                 return instance.attrs
             
             elif rhs.token.text == 'methods':
                 return instance.methods
 
-            self._push_scope(name="", scope_to_use=instance)
+            self._push_instance(instance)
             result = None 
             if instance != None:
                 result = self._load(rhs)
@@ -264,30 +716,72 @@ class PlaygroundInterpreter:
         Raises an exception if a function is already defined with that name in the current scope,
         or any parent scopes.
 
+        The PG_Function, and its list of params, is made the first time 't'
+        runs, and only bound again every other time; but for memoized
+        functions, each definition of which has a memo table of its own.
+
         Returns a PG_Function object
         """
-        name = t.children[0].token.text
-        params = []
-        if len(t.children[1].children) > 0:
-            param_list = t.children[1]
-            for param in param_list.children:
-                params.append(param.token.text)
-
-        code = t.children[2]
+        new_func = self.functions.get(t)
+        if new_func is None:
+            params = [param.token.text for param in t.children[1].children]
+            new_func = self.functions[t] = PG_Function(
+                name=t.children[0].token.text, params=params, code=t.children[2]
+            )
 
-        new_func = PG_Function(name=name, params=params, code=code)
+        if len(t.children) == 4:
+            new_func = PG_Function(
+                name=new_func.name,
+                params=new_func.params,
+                code=new_func.code,
+                memo=self._memo_table(new_func.name, new_func.params),
+            )
         if add_to_current_scope:
-            cur_space = self.current_space.symbols
-            if name not in cur_space or (
-                # Check if the current NAME is used to reference another data
-                # type, e.g. Int or bool. If yes, reassign it an empty dict
-                name in cur_space 
-                and type(cur_space[name]) != dict
-            ):
-                cur_space[name] = {}
-            cur_space[name][len(params)] = new_func
+            self._define_function(new_func)
         return new_func
 
+    def _memo_table(self, name: str, params: list) -> PG_MemoTable:
+        """
+        Returns a new memo table for a function defined with memo def
+        """
+        memo = PG_MemoTable(self.memo_size)
+        self.memo_tables[f"{name}/{len(params)}"] = memo
+        return memo
+
+    def memo_stats(self) -> dict:
+        """
+        Returns the hits, misses, evictions and size of the memo table of
+        each function defined with memo def, keyed name/number of params
+        """
+        return {name: memo.stats() for name, memo in self.memo_tables.items()}
+
+    def _define_function(self, new_func: PG_Function):
+        """
+        Adds 'new_func' to the current scope, next to any functions of the
+        same name but a different number of parameters.
+
+        Returns None
+        """
+        name = new_func.name
+        cur_space = self.current_space.symbols
+        functions = cur_space.get(name)
+        if type(functions) is LazySymbol:
+            # Brought in by a lazy import: the module runs first, so the
+            # functions it defines of that name are kept, as they would be
+            # had it run at the import
+            try:
+                functions = functions.loader()
+            except NameError:
+                if type(cur_space.get(name)) is LazySymbol:
+                    raise  # The module failed
+                # The module didn't define it after all
+                functions = cur_space.get(name)
+        if type(functions) is not dict:
+            # Not bound, or bound to another data type, e.g. Int or bool
+            functions = cur_space[name] = {}
+        functions[len(new_func.params)] = new_func
+        self._bound(self.current_space, name)
+
     def _py_str(self, obj):
         return str(obj)
 
@@ -302,27 +796,95 @@ class PlaygroundInterpreter:
 
         May return a value or a class instance, by default returns None 
         """
-        name = t.token.text
+        return self._call(t, self._args(t))
+
+    def _args(self, t: PG_AST):
+        """
+        Returns the values of the arguments of call node 't'
+        """
         args_list = []
         if len(t.children) > 0:
             for arg in t.children[0].children:
                 args_list.append(self._exec(arg))
-        args_len = len(args_list)
+        return args_list
 
-        if name == 'str':
+    def _call(self, t: PG_AST, args_list):
+        """
+        Calls the function, or constructor, named by 't' with the already
+        evaluated arguments in 'args_list'.
+
+        May return a value or a class instance, by default returns None 
+        """
+        return self._invoke(self._call_target(t, len(args_list)), args_list)
+
+    def _invoke(self, target, args_list):
+        """
+        Calls 'target', as returned by _call_target(), with 'args_list'
+        """
+        if type(target) is PG_Function:
+            return self._call_function(target, args_list)
+
+        if target is None:
             if len(args_list) != 1:
                 raise TypeError("built in str() only takes 1 argument")
             return self._py_str(args_list[0])
 
+        return self._instantiate(target, args_list)
+
+    def _call_target(self, t: PG_AST, args_len: int):
+        """
+        Returns what call node 't', with 'args_len' arguments, calls: a
+        PG_Function, the PG_Class to instantiate, or None for str(). From
+        the site's call cache, if no binding has changed since it was filled.
+        """
+        cache = self.call_caches.get(t)
+        if cache is None:
+            cache = self._call_cache(t)
+
+        # A call of the class of an instance whose method is running
+        # resolves to its constructors in there; it is resolved apart
+        interior = self.instance_scope is not None and self._interior_call(cache.name)
+
+        if cache.version == self.binding_version and not interior:
+            cache.hits += 1
+            return cache.target
+
+        cache.misses += 1
+        target = self._resolve_call(t, args_len)
+        if not interior:
+            cache.target = target
+            cache.version = self.binding_version
+        return target
+
+    def _interior_call(self, name: str) -> bool:
+        """
+        Whether a call of 'name' is made inside an instance of class 'name';
+        see _call_target()
+        """
+        instance_scope = self.instance_scope
+        while instance_scope is not None:
+            if instance_scope.name == name:
+                return True
+            instance_scope = instance_scope.outer
+        return False
+
+    def _resolve_call(self, t: PG_AST, args_len: int):
+        """
+        See _call_target(); looks what 't' calls up, by name.
+        """
+        name = t.token.text
+        if name == 'str':
+            return None
+
         # Because class instantiation looks like a function call, handle that here
         # Well, it IS a function call, but it's a special case of one, where we call a constructor
         # if it is defined
-        obj = self._load(t)
+        obj = self.current_space.resolve(name)
         enclosing_class = self._get_enclosing_class()
-        if type(obj) == PG_Class or (
-            enclosing_class != None 
-            and enclosing_class.name == name 
-        ):
+        if type(obj) == PG_Class:
+            return obj
+
+        if enclosing_class != None and enclosing_class.name == name:
             # Check if a constructor is being called from inside a class:
             # The type of obj will be a dict if this is an interior 
             # constructor call. This is beacuse:
@@ -333,18 +895,10 @@ class PlaygroundInterpreter:
 
             # Thus, if an enclosing scope is an class scope, the 
             # constructor func name will resolve to a dict of funcs 
-            # instead of the class definition object.
-            interior_call = (
-                type(obj) != PG_Class       
-                and enclosing_class.name == name
-            )
+            # instead of the class definition object, so get that instead
+            class_name = obj[args_len].name
+            return self.globals.resolve(class_name)
 
-            return self._class_instantiation(
-                t, 
-                args_list=args_list,
-                interior_call=interior_call
-            )
-        
         # Maybe, check here, if enclosing scope is a class?
         # Then, use it's methods dict to get the func object
         # Yeah. Make sure to delete the comment in _load
@@ -356,20 +910,137 @@ class PlaygroundInterpreter:
             raise TypeError(
                 f"No function with name {name} and param length {args_len} found!"
             )
+        return func
+
+    def _call_cache(self, t: PG_AST) -> PG_CallCache:
+        """
+        Makes the call cache of call node 't'. The first site to call a name
+        makes bindings of that name matter to call caches; the scopes already
+        pushed didn't keep track of theirs, so are taken to bind it.
+        """
+        name = t.token.text
+        cache = self.call_caches[t] = PG_CallCache(name)
+        if name not in self.call_names:
+            self.call_names.add(name)
+            self.cached_names.add(name)
+            self.shadowing_shapes.clear()
+            scope = self.current_space
+            while scope is not None:
+                scope.binds_cached = True
+                scope = scope.parent
+        return cache
+
+    def call_cache_stats(self) -> dict:
+        """
+        Returns the hits and misses of all the call caches, in total, how
+        many sites have them, and the binding version: how many times
+        something that can change what calls resolve to has happened
+        """
+        caches = self.call_caches.values()
+        return {
+            "sites": len(caches),
+            "hits": sum(cache.hits for cache in caches),
+            "misses": sum(cache.misses for cache in caches),
+            "binding_version": self.binding_version,
+        }
+
+    def _global_cache(self, t: PG_AST) -> PG_GlobalCache:
+        """
+        Returns the global cache of NAME node 't'
+        """
+        cache = self.global_caches.get(t)
+        if cache is None:
+            cache = self.global_caches[t] = PG_GlobalCache(t.token.text)
+        return cache
+
+    def global_cache_stats(self) -> dict:
+        """
+        Returns the hits and misses of all the global caches, in total, how
+        many sites have them, the share of hits, and how many scopes a hit
+        didn't look the name up in, on average. Loads of names bound in the
+        current scope don't use the caches, so aren't counted.
+        """
+        caches = self.global_caches.values()
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        return {
+            "sites": len(caches),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits else 0.0,
+            "depth_avoided": sum(cache.depth_avoided for cache in caches) / hits if hits else 0.0,
+        }
+
+    def _function_scope(self, func: PG_Function, args_list) -> PG_FunctionScope:
+        """
+        Returns a new scope binding the parameters of 'func' to the values
+        in 'args_list'; marked as binding cached names (see _bound()) if any
+        of the parameters is one.
+        """
+        function_scope = PG_FunctionScope(
+            name=f"func_scope_{func.name}", params=func.params, args=args_list
+        )
+        if not self.cached_names.isdisjoint(func.params):
+            function_scope.binds_cached = True
+        return function_scope
 
-        self._push_scope(name=f"func_scope_{name}")
+    def _call_function(self, func: PG_Function, args_list):
+        """
+        Calls 'func', which is not a constructor, with the already evaluated
+        arguments in 'args_list'
+
+        Returns the value of the call; from the function's memo table, if
+        it has one and the call is in it
+        """
+        memo = func.memo
+        if memo is not None:
+            key = memo.key(args_list)
+            ret_val = memo.get(key)
+            if ret_val is not MISS:
+                return ret_val
 
-        for param, arg in zip(func.params, args_list):
-            self.current_space.symbols[param] = arg
+        self._push_scope(scope_to_use=self._function_scope(func, args_list))
 
-        ret_val = self._statements(func.code)
+        ret_val = self._run_function(func)
         self._pop_scope()
 
+        if memo is not None:
+            memo.store(key, ret_val)
+        return ret_val
+
+    def _run_function(self, func: PG_Function):
+        """
+        Runs the code of 'func', whose parameters have already been bound
+        in the current scope; using its compiled body if it has one.
+
+        Returns the value of the return statement run, if one was, or else
+        the value of the last statement run
+        """
+        if func.body is not None:
+            ret_val = func.body()
+        else:
+            ret_val = self._statements(func.code)
+
+        if self.returning:
+            ret_val = self.return_value
+            self.returning = False
+            self.return_value = None
         return ret_val
 
     def _return(self, t: PG_AST):
+        """
+        Evaluates the returned expression, then signals the statements
+        being run to stop, up to the function being returned from; see
+        _run_function(). No exception is raised, the enclosing loops and
+        blocks check self.returning after each statement.
+
+        Returns the returned value
+        """
         expr = t.children[0]
-        return self._exec(expr)
+        ret_val = self._exec(expr)
+        self.return_value = ret_val
+        self.returning = True
+        return ret_val
 
     def _class_def(self, t: PG_AST):
         # Create PG_Class object
@@ -391,71 +1062,56 @@ class PlaygroundInterpreter:
 
             # Create func objects to put in methods
             elif stmnt_tk_type is PGT.DEF:
-                func_name = statement.children[0].token.text
                 class_method = self._func_def(
                     statement,
                     add_to_current_scope=False,
                 )
-                params_len = len(class_method.params)
-                if func_name not in class_def.symbols:
-                    class_def.symbols[func_name] = {}
-                class_def.symbols[func_name][params_len] = class_method
+                class_def.add_method(class_method)
             else:
                 self._exec(statement)
+                if self.returning:
+                    # A return in a class body ends the class body
+                    self.returning = False
+                    self.return_value = None
+                    break
 
         # Place class object into current scope/symbol table
         self.current_space.symbols[name] = class_def
+        self._bound(self.current_space, name)
 
-    def _class_instantiation(self, t: PG_AST ,args_list, interior_call=False):
-        obj = self._load(t)
-        class_def = obj
-        args_len = len(args_list)
+    def _instantiate(self, class_def: PG_Class, args_list):
+        """
+        Creates an instance of 'class_def', and runs its constructor for the
+        already evaluated arguments in 'args_list', if it has one.
 
-        
-        # Check if we are being called from inside the same class
-        # If so, _load() can resolve t to a constructor, when we 
-        # need the class def object, so get that instead 
-        if interior_call:
-            class_name = obj[args_len].name
-            class_def = self.globals.resolve(class_name)
+        Returns the new instance
+        """
+        args_len = len(args_list)
 
-        # Create a new copy of the class, and mark it as a copy of the definition
-        # aka, an instance of said class
-        new_instance = deepcopy(class_def)
-        new_instance.is_class_def = False
+        # Create a new instance of the class; it shares the definition's
+        # methods, and starts with copies of its attribute values
+        new_instance = class_def.instantiate()
         
-        # Check that there is at least one constructor defined on the class
-        constructors = (
-            None if class_def.name not in class_def.methods 
-            else class_def.methods[class_def.name]
-        )
-        
-        # If there are no constructors, just return the new instance 
-        if constructors is None:
-            return new_instance
-
         # Lookup in the class def, a function that shares the name of the
         # class, and has the same number of parameters as the called constructor
         # That will be the correct constructor to call.
-        constructor = constructors.get(args_len)
+        constructor = class_def.constructor(args_len)
 
-        # If calling a constructor, push the new instance as a scope first
-        if constructor != None:
-            self._push_scope(
-                name=f"instance_of_{class_def.name}", 
-                scope_to_use=new_instance
-            )
+        # If there is no such constructor, just return the new instance
+        if constructor is None:
+            return new_instance
 
-        # Don't try to call a constructor if no constructor was selected 
-        if len(constructors) > 0 and constructor != None:
-            for param, arg in zip(constructor.params, args_list):
-                self.current_space.symbols[param] = arg
+        # Push the new instance as a scope, and bind the arguments in it
+        self._push_instance(new_instance)
+        instance_scope = self.current_space
+        for param, arg in zip(constructor.params, args_list):
+            instance_scope.symbols[param] = arg
+            self._bound(instance_scope, param)
 
-            self._statements(constructor.code)
+        self._run_function(constructor)
 
-        # If a constructor was called, remove the class scope from the tree
-        if constructor != None:
-            self._pop_scope()
+        # Remove the instance scope from the tree
+        self._pop_scope()
 
         return new_instance
 
@@ -473,8 +1129,14 @@ class PlaygroundInterpreter:
         """
         lhs = t.children[0]
         expr = t.children[1]
-        value = self._exec(expr)
+        self._store(lhs, self._exec(expr))
+
+    def _store(self, lhs: PG_AST, value):
+        """
+        Assigns 'value' to the symbol, or dotted symbol, 'lhs'
 
+        Returns None
+        """
         # Handle assigning a value to dotted expressions:
         name, instance_name = None, None
         if lhs.token.type is PGT.DOT:
@@ -506,6 +1168,7 @@ class PlaygroundInterpreter:
 
         # Assign symbol it's new value
         symbol_scope.symbols[name] = value
+        self._bound(symbol_scope, name)
     
     def _load_from_name(self, name):
         token = PG_Token(token_type=PGT.NAME, token_text=name)
@@ -528,7 +1191,59 @@ class PlaygroundInterpreter:
                 raise UnsupportedOperationException(
                     "Use of keyword 'this' only supported inside of class methods."
                 )
-        return symbol_scope.resolve(name)
+            return symbol_scope.resolve(name)
+
+        symbols = symbol_scope.symbols
+        if name not in symbols:
+            return self._load_global(self._global_cache(t))
+        value = symbols[name]
+        if type(value) is LazySymbol:
+            value = value.loader()
+        return value
+
+    def _load_name(self, cache: PG_GlobalCache):
+        """
+        Returns the value of the name 'cache' is the global cache of, from
+        the current scope, or any parent scope; see _load_global()
+        """
+        name = cache.name
+        symbols = self.current_space.symbols
+        if name not in symbols:
+            return self._load_global(cache)
+        value = symbols[name]
+        if type(value) is LazySymbol:
+            value = value.loader()
+        return value
+
+    def _load_global(self, cache: PG_GlobalCache):
+        """
+        Returns the value of the name 'cache' is the global cache of, which
+        the current scope doesn't bind, from its parent scopes. Straight
+        from the globals if the cache is valid; otherwise the name is looked
+        up, and the cache filled if it is found in the globals.
+        """
+        name = cache.name
+        if cache.version == self.binding_version:
+            cache.hits += 1
+            # The scopes between the current scope, which was looked in, and
+            # the globals
+            cache.depth_avoided += self.current_space.depth - self.globals.depth - 1
+            value = self.globals.symbols[name]
+        else:
+            cache.misses += 1
+            symbol_scope = self.current_space.resolve_scope(name)
+            if symbol_scope is None:
+                raise NameError(f"Symbol {name} could not be found!")
+            if symbol_scope is self.globals:
+                if name not in self.global_names:
+                    self.global_names.add(name)
+                    self.cached_names.add(name)
+                    self.shadowing_shapes.clear()
+                cache.version = self.binding_version
+            value = symbol_scope.symbols[name]
+        if type(value) is LazySymbol:
+            value = value.loader()
+        return value
 
     def _conditional(self, t: PG_AST):
         """
@@ -551,8 +1266,21 @@ class PlaygroundInterpreter:
         """
         test = t.children[0]
         block = t.children[1]
+        if type(block) is PG_Block and block.scope is SCOPE_REUSED:
+            # Every iteration runs in the same scope, emptied after it
+            self._push_scope()
+            while self._exec(test):
+                self._statements(block, push_scope=False)
+                if self.returning:
+                    break
+                self._clear_scope()
+            self._pop_scope()
+            return
+
         while self._exec(test):
             self._exec(block)
+            if self.returning:
+                break
 
     def _op(self, t: PG_AST):
         """
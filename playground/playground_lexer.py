@@ -1,26 +1,374 @@
+import codecs
+import re
+
 from playground_token import PG_Type as PGT, PG_Token
-from abstract.abs_lexer import AbstractLexer
+from playground_token_buffer import PG_TokenBuffer, TYPE_CODES, STRING_CODE, EOF_CODE
+from abstract.abs_lexer import AbstractLexer, LexingError
+
+RESERVED_NAMES = {
+    "def": PGT.DEF,
+    "memo": PGT.MEMO,
+    "print": PGT.PRINT,
+    "True": PGT.TRUE,
+    "False": PGT.FALSE,
+    "and": PGT.AND,
+    "or": PGT.OR,
+    "if": PGT.IF,
+    "elif": PGT.ELIF,
+    "else": PGT.ELSE,
+    "while": PGT.WHILE,
+    "Class": PGT.CLASS,
+    "return": PGT.RETURN,
+    "import": PGT.IMPORT,
+    "from": PGT.FROM,
+}
+
+PUNCTUATION = {
+    ".": PGT.DOT,
+    ";": PGT.SEMI_COLON,
+    ",": PGT.COMMA,
+    "=": PGT.ASSIGN,
+    "==": PGT.EQ,
+    ">": PGT.GT,
+    ">=": PGT.GE,
+    "<": PGT.LT,
+    "<=": PGT.LE,
+    "(": PGT.LPAREN,
+    ")": PGT.RPAREN,
+    "{": PGT.LCURBRACK,
+    "}": PGT.RCURBRACK,
+    "+": PGT.PLUS,
+    "-": PGT.MINUS,
+    "*": PGT.STAR,
+    "/": PGT.FSLASH,
+    "%": PGT.PERCENT,
+}
+
+# Enum attribute lookups are slow enough to show up in the lexer's profile,
+# so the token types it hands out by hand are looked up once, here.
+_NAME, _INT, _FLOAT, _STRING, _EOF = PGT.NAME, PGT.INT, PGT.FLOAT, PGT.STRING, PGT.EOF
+
+# The same tables, keyed to PG_TokenBuffer type codes, for tokenize_all()
+RESERVED_NAME_CODES = {name: TYPE_CODES[t] for name, t in RESERVED_NAMES.items()}
+PUNCTUATION_CODES = {text: TYPE_CODES[t] for text, t in PUNCTUATION.items()}
+_NAME_CODE, _INT_CODE, _FLOAT_CODE = TYPE_CODES[_NAME], TYPE_CODES[_INT], TYPE_CODES[_FLOAT]
+
+# One compiled pattern for the whole token set. Leading whitespace is skipped
+# as part of the same match, every alternative is a named group, and the name
+# of the group that matched (match.lastgroup) tells the lexer what kind of
+# token it is looking at.
+#
+# NOTE: Names are letters and underscores only, and a NUMBER may end in a bare
+# '.', which is rejected after matching, the same as the char lexer does.
+TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t\r\n]*
+    (?:
+      (?P<COMMENT>\#[^\n]*)
+    | (?P<PUNCT>==|>=|<=|[.;,=<>(){}+\-*/%])
+    | (?P<NAME>[A-Za-z_]+)
+    | (?P<NUMBER>[0-9]+(?:\.[0-9]*)?)
+    | (?P<STRING>"(?:[^"\\]|\\.)*")
+    | (?P<EOF>\Z)
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
 
 
 class PlaygroundLexer(AbstractLexer):
     def __init__(self, input_str):
         super().__init__(input_str)
+        self.reserved_names = RESERVED_NAMES
+        self.line_start = 0  # Offset in self.input of the current line
+
+    def next_token(self) -> PG_Token:
+        """
+        Returns the next token in the input string.
+        If there are no more tokens, returns <EOF> (End of File)
+
+        Tokens are recognized by matching TOKEN_PATTERN at the current
+        position, instead of consuming the input one char at a time.
+        """
+        while True:
+            input_str = self.input
+            p = self.p
+            match = TOKEN_PATTERN.match(input_str, p)
+            if match is None:
+                self._skip_whitespace()
+                # An unterminated string may just not be fully read in yet
+                if input_str[self.p] == '"' and self._refill():
+                    continue
+                self._invalid_character(input_str[self.p])
+
+            kind = match.lastgroup
+            text = match.group(kind)
+            end = match.end()
+            start = end - len(text)
+            self.p = end
+
+            if start != p:
+                new_lines = input_str.count("\n", p, start)
+                if new_lines > 0:
+                    self.line_number += new_lines
+                    self.line_start = input_str.rfind("\n", p, start) + 1
+
+            if kind == "PUNCT":
+                token_type = PUNCTUATION[text]
+
+            elif kind == "NAME":
+                token_type = RESERVED_NAMES.get(text, _NAME)
+
+            # Skip comments:
+            # ---------------------------------------
+            elif kind == "COMMENT":
+                continue
+
+            elif kind == "NUMBER":
+                token_type = _INT
+                if "." in text:
+                    token_type = _FLOAT
+                    if text[-1] == ".":
+                        self._bad_float(start, text)
+
+            elif kind == "STRING":
+                line = self.line_number + 1
+                column = start - self.line_start + 1
+                new_lines = text.count("\n")
+                if new_lines > 0:
+                    self.line_number += new_lines
+                    self.line_start = input_str.rfind("\n", start, end) + 1
+                return PG_Token(_STRING, self.string_text(text), line, column)
+
+            elif self._refill():
+                continue
 
-        self.reserved_names = {
-            "def": PGT.DEF,
-            "print": PGT.PRINT,
-            "True": PGT.TRUE,
-            "False": PGT.FALSE,
-            "and": PGT.AND,
-            "or": PGT.OR,
-            "if": PGT.IF,
-            "elif": PGT.ELIF,
-            "else": PGT.ELSE,
-            "while": PGT.WHILE,
-            "Class": PGT.CLASS,
-            "return": PGT.RETURN,
-            "import": PGT.IMPORT,
-        }
+            else:
+                return PG_Token(
+                    _EOF, "<EOF>", self.line_number + 1, end - self.line_start + 1
+                )
+
+            return PG_Token(
+                token_type, text, self.line_number + 1, start - self.line_start + 1
+            )
+
+    def tokenize_all(self, eof_padding=1) -> PG_TokenBuffer:
+        """
+        Lexes the rest of the input in one go, and returns it as a
+        PG_TokenBuffer. No PG_Token objects are created while doing so.
+
+        The buffer ends with 'eof_padding' EOF tokens, so a parser can look
+        past the end of the stream without bounds checks.
+        """
+        tokens = PG_TokenBuffer(self.input, self.line_number + 1, self.line_start)
+        types, starts, lengths, lines, line_starts = (
+            tokens.types,
+            tokens.starts,
+            tokens.lengths,
+            tokens.lines,
+            tokens.line_starts,
+        )
+
+        input_str = self.input
+        while True:
+            p = self.p
+            match = TOKEN_PATTERN.match(input_str, p)
+            if match is None:
+                self._skip_whitespace()
+                self._invalid_character(input_str[self.p])
+
+            kind = match.lastgroup
+            end = match.end()
+            start = match.start(kind)
+            self.p = end
+
+            if start != p:
+                new_line = input_str.find("\n", p, start)
+                while new_line != -1:
+                    self.line_number += 1
+                    line_starts.append(new_line + 1)
+                    new_line = input_str.find("\n", new_line + 1, start)
+
+            if kind == "PUNCT":
+                code = PUNCTUATION_CODES[input_str[start:end]]
+
+            elif kind == "NAME":
+                code = RESERVED_NAME_CODES.get(input_str[start:end], _NAME_CODE)
+
+            # Skip comments:
+            # ---------------------------------------
+            elif kind == "COMMENT":
+                continue
+
+            elif kind == "NUMBER":
+                code = _INT_CODE
+                if input_str.find(".", start, end) != -1:
+                    code = _FLOAT_CODE
+                    if input_str[end - 1] == ".":
+                        self._bad_float(start, input_str[start:end])
+
+            elif kind == "STRING":
+                # Only the text between the quotes goes into the buffer
+                types.append(STRING_CODE)
+                starts.append(start + 1)
+                lengths.append(end - start - 2)
+                lines.append(self.line_number + 1)
+                new_line = input_str.find("\n", start, end)
+                while new_line != -1:
+                    self.line_number += 1
+                    line_starts.append(new_line + 1)
+                    new_line = input_str.find("\n", new_line + 1, end)
+                continue
+
+            else:
+                self.line_start = line_starts[-1]
+                for _ in range(eof_padding):
+                    types.append(EOF_CODE)
+                    starts.append(end)
+                    lengths.append(0)
+                    lines.append(self.line_number + 1)
+                return tokens
+
+            types.append(code)
+            starts.append(start)
+            lengths.append(end - start)
+            lines.append(self.line_number + 1)
+
+    @staticmethod
+    def string_text(lexeme: str) -> str:
+        """
+        Strips the quotes off of a STRING lexeme and handles escapes.
+
+        The only escape is an escaped double quote (\\"), which is replaced by
+        a plain double quote. Any other backslash is kept as is, so Windows
+        style paths in import statements keep working.
+        """
+        text = lexeme[1:-1]
+        if '\\"' in text:
+            text = text.replace('\\"', '"')
+        return text
+
+    def _refill(self) -> bool:
+        """
+        Called when the lexer runs out of input. Lexers that read their
+        input in chunks read more input here and return True.
+        A string has no more input to read, so returns False.
+        """
+        return False
+
+    def _skip_whitespace(self):
+        while self.input[self.p] in " \t\r\n":
+            if self.input[self.p] == "\n":
+                self.line_number += 1
+            self.p += 1
+
+    def _column(self, pos):
+        new_line = self.input.rfind("\n", 0, pos)
+        if new_line == -1:
+            return pos - self.line_start + 1
+        return pos - new_line
+
+    def _lexing_error(self, message, pos):
+        line = self.line_number + 1
+        column = self._column(pos)
+        raise LexingError(
+            f"{message} on line {line}, column {column}", line=line, column=column
+        )
+
+    def _bad_float(self, start, text):
+        self._lexing_error(
+            f"A floating point number must have at least 1 digit after the dot: {text}",
+            start,
+        )
+
+    def _invalid_character(self, c):
+        if c == '"':
+            self._lexing_error("Unterminated string starting", self.p)
+        self._lexing_error(f"Invalid character: {c}", self.p)
+
+
+class PlaygroundStreamLexer(PlaygroundLexer):
+    """
+    A PlaygroundLexer that reads its input from a file object, or an mmap, in
+    chunks of 'chunk_size', as tokens are asked for. Only the current chunk
+    is held in memory, so memory use does not grow with the size of the
+    source. Sources that return bytes are decoded as UTF-8.
+
+    self.input is a window over the source, and self.offset is the offset of
+    the window in the source. The window always ends right after a new line
+    (or at the end of the source), so the only token that can run past the
+    end of it is a string with a new line in it. When TOKEN_PATTERN hits the
+    end of the window, or an unterminated string, _refill() moves the window
+    forward and the token is matched again.
+    """
+
+    def __init__(self, source, chunk_size=64 * 1024):
+        super().__init__("")
+        self.source = source
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self._partial_line = ""  # Read in, but not yet put in the window
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._exhausted = False
+
+    def _refill(self) -> bool:
+        if self._exhausted:
+            return False
+
+        pieces = [self._partial_line]
+        while True:
+            chunk = self.source.read(self.chunk_size)
+            at_end = len(chunk) == 0
+            if isinstance(chunk, bytes):
+                # May hold back the first bytes of a multi-byte char
+                chunk = self._decoder.decode(chunk, final=at_end)
+
+            if at_end:
+                pieces.append(chunk)
+                self._exhausted = True
+                self._partial_line = ""
+                break
+
+            new_line = chunk.rfind("\n")
+            if new_line != -1:
+                pieces.append(chunk[: new_line + 1])
+                self._partial_line = chunk[new_line + 1 :]
+                break
+            pieces.append(chunk)
+
+        # Drop what has been lexed already
+        self.offset += self.p
+        self.line_start -= self.p
+        self.input = self.input[self.p :] + "".join(pieces)
+        self.p = 0
+        return True
+
+    def tokenize_all(self, eof_padding=1):
+        """
+        A PG_TokenBuffer slices token text out of the whole source, which a
+        stream lexer never holds, so this always raises TypeError. Parse a
+        stream token by token instead (PlaygroundParser(source=...) does),
+        or read it into a string and use PlaygroundLexer.
+        """
+        raise TypeError(
+            "PlaygroundStreamLexer can't tokenize all of its input into a PG_TokenBuffer,"
+            " which needs the whole source: read the source into a string and use"
+            " PlaygroundLexer, or lex it token by token with next_token()"
+        )
+
+
+class PlaygroundCharLexer(AbstractLexer):
+    """
+    The original char-at-a-time lexer.
+
+    Kept as the reference implementation PlaygroundLexer is checked against,
+    and as the baseline for bench/bench_lexer.py.
+    """
+
+    def __init__(self, input_str):
+        super().__init__(input_str)
+        self.reserved_names = RESERVED_NAMES
+        self.line_start = 0  # Offset in self.input of the current line
 
     def next_token(self) -> PG_Token:
         """
@@ -0,0 +1,96 @@
+"""
+Memo tables for functions defined with memo def:
+
+    memo def fib(n){
+        if (n < 2) { return n; }
+        return fib(n - 1) + fib(n - 2);
+    }
+
+Each PG_Function defined with memo def gets a PG_MemoTable of its own, so
+the overloads of a name, one function per number of parameters, are cached
+independently. A call of the function looks its arguments up first, and
+only runs the function on a miss, then stores the value it returned. A
+table holds at most 'maxsize' values; storing one more evicts the least
+recently used one.
+
+Arguments are keyed along with their types, so f(1), f(1.0) and f(True)
+are cached apart. Instances are keyed by identity. A call with an argument
+that can't be hashed (a table of functions) isn't cached, and counts as a
+miss.
+
+Memoizing a function is only correct if it is pure: its value depends on
+nothing but its arguments, and calling it has no other effect. With dynamic
+scoping, that means it also mustn't read names its callers bind.
+"""
+from collections import OrderedDict
+
+from playground_inline_cache import MISS
+
+# How many values a memo table holds, unless the interpreter is told otherwise
+DEFAULT_MEMO_SIZE = 1024
+
+
+class PG_MemoTable:
+    __slots__ = ("values", "maxsize", "hits", "misses", "evictions")
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        self.values = OrderedDict()  # Key -> value, least recently used first
+        self.maxsize = maxsize  # None for no bound
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, args_list: list):
+        """
+        Returns the key a call with 'args_list' is cached under, or None if
+        it can't be cached
+        """
+        key = (*args_list, *map(type, args_list))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        """
+        Returns the value cached under 'key', or MISS
+        """
+        if key is None:
+            self.misses += 1
+            return MISS
+        values = self.values
+        value = values.get(key, MISS)
+        if value is MISS:
+            self.misses += 1
+        else:
+            self.hits += 1
+            values.move_to_end(key)
+        return value
+
+    def store(self, key, value):
+        """
+        Caches 'value' under 'key', evicting the least recently used value
+        if the table is full
+        """
+        if key is None or self.maxsize == 0:
+            return
+        values = self.values
+        values[key] = value
+        if self.maxsize is not None and len(values) > self.maxsize:
+            values.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.values),
+        }
+
+    def __repr__(self):
+        return (
+            f"<MemoTable: {len(self.values)}/{self.maxsize}, hits: {self.hits},"
+            f" misses: {self.misses}, evictions: {self.evictions}>"
+        )
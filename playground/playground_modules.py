@@ -0,0 +1,310 @@
+"""
+The module registry: every module a program imports, keyed by its canonical
+absolute path.
+
+A module is run once, the first time it is imported, in a scope of its own
+(PG_Module.scope); the names it defines are kept there. That scope has no
+parent: the module sees none of the names of the scope that imported it
+first, and its assignments never rebind them. Every import of the
+module, including that first one, binds those names in the importing scope;
+a selective import, from "module.plgd" import name, ...; binds only the
+names it lists. So a module imported by several others, along the arms of a
+diamond say, is still only run once.
+
+With lazy imports switched on (PlaygroundInterpreter(lazy_imports=True)),
+an import only parses the module, and binds a LazySymbol for each name it
+brings in (see PG_ModuleRegistry.module_names()). The module runs the first
+time one of those names is resolved, or a function is defined over one,
+in its scope just the same; a module none of whose names are used never
+runs. The import still fails as an eager one would: if it names a name the
+module doesn't bind (see PG_LazyImport) or the module's imports make a
+cycle (see PG_ModuleRegistry.check_cycles()).
+
+Relative import paths are relative to the directory of the module the import
+is in; for a program run from a string, to sys.path[0]. Paths may use '\\'
+or '/' as a separator, whatever the platform.
+
+A module that imports itself, directly or through the modules it imports,
+is an import cycle, and raises an ImportError naming the modules on it.
+
+Each PG_Module records how long it took to parse and run; see
+PG_ModuleRegistry.stats().
+"""
+import os
+from functools import partial
+from sys import path as sys_path
+
+from abstract.abs_scope import LazySymbol
+from playground_ast import PG_AST
+from playground_token import PG_Type as PGT
+
+# PG_Module states
+PARSED = "parsed"  # Parsed, but not run yet
+RUNNING = "running"
+LOADED = "loaded"
+
+
+def canonical(module_path: str) -> str:
+    """
+    Returns the canonical absolute path of 'module_path', the registry's key
+    for the module there
+    """
+    return os.path.normcase(os.path.realpath(module_path))
+
+
+def import_names(t: PG_AST):
+    """
+    Returns the names import node 't' lists, or None if it brings in all
+    of the names the module defines
+    """
+    if t.token.type is PGT.FROM:
+        return [name.token.text for name in t.children[1].children]
+    return None
+
+
+def merged(bound, value):
+    """
+    Returns what to bind a name an import brings in to, if it is bound to
+    'bound' already: 'value', unless both are tables of functions.
+    Functions of the same name, but a different number of parameters, are
+    overloads of each other; both are kept.
+    """
+    if type(value) is dict:
+        # A table of its own, so defining an overload in the importing
+        # scope doesn't add it to the module's
+        if type(bound) is dict:
+            return {**bound, **value}
+        return dict(value)
+    return value
+
+
+def _raise_cycle(loading: list, module_path: str):
+    """
+    Raises the ImportError for running the module at 'module_path' again,
+    while the modules at the paths in 'loading' are being run
+    """
+    cycle = loading[loading.index(module_path):] + [module_path]
+    raise ImportError("Import cycle: " + " -> ".join(os.path.basename(p) for p in cycle))
+
+
+class PG_Module:
+    __slots__ = ("path", "root", "scope", "state", "parse_time", "run_time", "imports")
+
+    def __init__(self, path: str, root: PG_AST = None):
+        self.path = path  # Canonical absolute path of the module's source
+        self.root = root  # The module's PG_AST, until it has run
+        self.scope = None  # The scope the module ran in, holding what it defined
+        self.state = PARSED
+        self.parse_time = 0.0  # Seconds spent parsing, or loading it from the AST cache
+        self.run_time = 0.0  # Seconds spent running it, and the modules it imported first
+        self.imports = 0  # How many times it has been imported
+
+    def __repr__(self):
+        return (
+            f"<Module: {self.path}, {self.state}, parse: {self.parse_time * 1000:.2f} ms,"
+            f" run: {self.run_time * 1000:.2f} ms, imports: {self.imports}>"
+        )
+
+
+class PG_LazyImport:
+    """
+    The names one lazy import bound in 'symbols', each to a LazySymbol.
+    Resolving any of them calls 'load', which runs the module if it hasn't
+    run yet, then binds each name still bound to its LazySymbol to what the
+    module defined; or back to what it was bound to before the import, if
+    the module turned out not to define it. For a selective import, which
+    lists the names it brings in, that raises an ImportError instead, as it
+    would have had the module run at the import.
+    """
+
+    __slots__ = ("load", "module_name", "selective", "symbols", "placeholders", "shadowed")
+
+    def __init__(self, load, module_name: str, selective: bool, symbols: dict, names: list):
+        self.load = load  # Returns the PG_Module, once it has run
+        self.module_name = module_name  # As the import named it
+        self.selective = selective
+        self.symbols = symbols
+        self.placeholders = {}  # Name -> the LazySymbol bound to it
+        self.shadowed = {}  # Name -> what it was bound to before the import
+
+        for name in names:
+            if name in symbols:
+                self.shadowed[name] = symbols[name]
+            placeholder = LazySymbol(partial(self.resolve, name))
+            self.placeholders[name] = placeholder
+            symbols[name] = placeholder
+
+    def resolve(self, name: str):
+        """
+        Runs the module, and binds the names; returns the value of 'name'
+        """
+        module_symbols = self.load().scope.symbols
+        symbols = self.symbols
+        missing = None
+        for bound_name, placeholder in self.placeholders.items():
+            if symbols.get(bound_name) is not placeholder:
+                # Bound again since the import; that binding stands
+                continue
+            if bound_name in module_symbols:
+                value = module_symbols[bound_name]
+                if type(value) is LazySymbol:
+                    # Brought in by a lazy import of the module's own
+                    value = value.loader()
+                symbols[bound_name] = merged(self.shadowed.get(bound_name), value)
+                continue
+            if missing is None:
+                missing = bound_name
+            if bound_name in self.shadowed:
+                symbols[bound_name] = self.shadowed[bound_name]
+            else:
+                del symbols[bound_name]
+
+        if self.selective and missing is not None:
+            raise ImportError(f"Module {self.module_name} does not define {missing}")
+        if name not in symbols:
+            raise NameError(f"Symbol {name} could not be found!")
+        return symbols[name]
+
+
+class PG_ModuleRegistry:
+    def __init__(self):
+        self.modules = {}  # Canonical path -> PG_Module
+        self.loading = []  # The modules being run, innermost last
+
+    def canonical_path(self, module_name: str, importer: PG_Module = None) -> str:
+        """
+        Returns the canonical absolute path of the module imported as
+        'module_name' from 'importer'; by default, from the module being run
+        """
+        if os.sep != "\\":
+            module_name = module_name.replace("\\", os.sep)
+        if importer is None and self.loading:
+            importer = self.loading[-1]
+        if importer is not None:
+            importer_dir = os.path.dirname(importer.path)
+        else:
+            importer_dir = sys_path[0]
+        return canonical(os.path.join(importer_dir, module_name))
+
+    def get(self, module_path: str) -> PG_Module:
+        """
+        Returns the module at canonical path 'module_path', or None if it
+        hasn't been imported yet
+        """
+        return self.modules.get(module_path)
+
+    def add(self, module_path: str, root: PG_AST = None) -> PG_Module:
+        """
+        Registers the module at canonical path 'module_path', parsed to
+        'root'.
+
+        Returns its PG_Module
+        """
+        module = PG_Module(module_path, root)
+        self.modules[module_path] = module
+        return module
+
+    def begin(self, module: PG_Module):
+        """
+        Marks 'module' as being run; call end() once it has been, whether
+        it ran or raised.
+
+        Raises ImportError if the module is being run already: running it
+        again would be an import cycle.
+        """
+        if module.state is RUNNING:
+            _raise_cycle([loading.path for loading in self.loading], module.path)
+        module.state = RUNNING
+        self.loading.append(module)
+
+    def end(self, module: PG_Module, loaded: bool):
+        """
+        Marks 'module' as no longer being run. A module that did not finish
+        running is forgotten, so importing it again runs it again.
+        """
+        self.loading.pop()
+        if loaded:
+            module.state = LOADED
+            module.root = None
+        else:
+            module.state = PARSED
+            del self.modules[module.path]
+
+    def check_cycles(self, module: PG_Module, parsed):
+        """
+        Raises ImportError if running 'module' now would be an import cycle:
+        if it is being run already, or one of the modules it imports at its
+        top level, or one of theirs, imports a module being run. So a lazy
+        import fails where an eager one would, without running anything.
+        'parsed' returns the PG_Module at a canonical path, parsing the
+        module if need be.
+        """
+        loading = [loading.path for loading in self.loading]
+        self._check_cycles(module, parsed, loading, set())
+
+    def _check_cycles(self, module: PG_Module, parsed, loading: list, checked: set):
+        if module.path in loading:
+            _raise_cycle(loading, module.path)
+        if module.root is None or module.path in checked:
+            return
+
+        loading.append(module.path)
+        for statement in module.root.children:
+            token = statement.token
+            if token is not None and (token.type is PGT.IMPORT or token.type is PGT.FROM):
+                import_path = self.canonical_path(statement.children[0].token.text, module)
+                self._check_cycles(parsed(import_path), parsed, loading, checked)
+        loading.pop()
+        checked.add(module.path)
+
+    def module_names(self, module: PG_Module, parsed) -> list:
+        """
+        Returns the names 'module' binds, at its top level, when it runs:
+        those of the functions and classes it defines, the names it assigns,
+        and the names its imports bring in. 'parsed' returns the PG_Module
+        at a canonical path, parsing the module if need be.
+
+        Which of them the module actually binds isn't known until it runs;
+        an assignment in a branch that isn't taken binds nothing.
+        """
+        names = {}
+        self._module_names(module, parsed, names, set())
+        return list(names)
+
+    def _module_names(self, module: PG_Module, parsed, names: dict, seen: set):
+        seen.add(module.path)
+        if module.root is None:
+            if module.scope is not None:
+                names.update(dict.fromkeys(module.scope.symbols))
+            return
+
+        for statement in module.root.children:
+            token = statement.token
+            if token is None:
+                continue
+            if token.type is PGT.DEF or token.type is PGT.CLASS:
+                names[statement.children[0].token.text] = None
+            elif token.type is PGT.ASSIGN:
+                lhs = statement.children[0]
+                if lhs.token.type is PGT.NAME and len(lhs.children) == 0:
+                    names[lhs.token.text] = None
+            elif token.type is PGT.FROM:
+                names.update(dict.fromkeys(import_names(statement)))
+            elif token.type is PGT.IMPORT:
+                import_path = self.canonical_path(statement.children[0].token.text, module)
+                if import_path not in seen:
+                    self._module_names(parsed(import_path), parsed, names, seen)
+
+    def stats(self) -> dict:
+        """
+        Returns, per module path, how long the module took to parse and to
+        run, in seconds, and how many times it has been imported
+        """
+        return {
+            module.path: {
+                "parse": module.parse_time,
+                "run": module.run_time,
+                "imports": module.imports,
+            }
+            for module in self.modules.values()
+        }
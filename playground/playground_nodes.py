@@ -0,0 +1,496 @@
+"""
+Compact, typed AST nodes: one __slots__ class per Playground construct.
+
+A PG_AST node is the same class whatever it stands for; what it is has to be
+worked out from its token type, or its artificial name, and its operands are
+found by position in its children list. Every node carries a __dict__ and a
+children list, leaves included.
+
+The nodes here name their parts instead: an If has a test, a body and an
+orelse; a Literal has its Python value, already converted from the token
+text; leaves have no children at all. Each node keeps the token it was
+built from, so errors can still point at a line and column.
+
+Convert a tree the parser built with from_pg_ast(), and back again with
+to_pg_ast() to hand it to code that works on PG_AST trees. The optimizer
+runs its folding and pruning passes over typed nodes (see
+playground_optimizer.py); the backends run PG_AST trees.
+"""
+from playground_ast import PG_AST, PG_Literal
+from playground_token import PG_Type as PGT, PG_Token
+
+# Token types of binary operator nodes, for BinOp.op
+ARITHMETIC_OPS = {PGT.PLUS, PGT.MINUS, PGT.STAR, PGT.FSLASH, PGT.PERCENT}
+COMPARISON_OPS = {PGT.EQ, PGT.LT, PGT.LE, PGT.GT, PGT.GE}
+BOOLEAN_OPS = {PGT.AND, PGT.OR}
+BINARY_OPS = ARITHMETIC_OPS | COMPARISON_OPS | BOOLEAN_OPS
+
+
+class PG_Node:
+    """
+    Base of the typed nodes. 'fields' lists, in order, the slots of a node
+    class that hold sub trees: a node, a list of nodes, or None.
+    """
+
+    __slots__ = ("token",)
+    fields = ()
+
+    def __init__(self, token=None):
+        self.token = token  # From which token was the node created?
+
+    def child_nodes(self):
+        """
+        Yields the node's sub trees, in source order
+        """
+        for field in self.fields:
+            value = getattr(self, field)
+            if type(value) is list:
+                yield from value
+            elif value is not None:
+                yield value
+
+    def __repr__(self):
+        parts = ", ".join(
+            f"{slot}={getattr(self, slot)!r}"
+            for slot in self.__slots__
+            if slot not in self.fields
+        )
+        return f"<{type(self).__name__}: {parts}>"
+
+
+class Block(PG_Node):
+    """A list of statements: the whole program, or a { } block"""
+
+    __slots__ = ("statements",)
+    fields = ("statements",)
+
+    def __init__(self, statements, token=None):
+        super().__init__(token)
+        self.statements = statements
+
+
+class Literal(PG_Node):
+    """An INT, FLOAT, STRING, True or False; 'value' is the Python value"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value, token=None):
+        super().__init__(token)
+        self.value = value
+
+
+class Name(PG_Node):
+    __slots__ = ("name",)
+
+    def __init__(self, name, token=None):
+        super().__init__(token)
+        self.name = name
+
+
+class BinOp(PG_Node):
+    """
+    A binary operator: arithmetic, a comparison, 'and' or 'or'.
+    'op' is the operator's token type.
+    """
+
+    __slots__ = ("op", "left", "right")
+    fields = ("left", "right")
+
+    def __init__(self, op, left, right, token=None):
+        super().__init__(token)
+        self.op = op
+        self.left = left
+        self.right = right
+
+
+class Dot(PG_Node):
+    """
+    lhs.rhs; 'lhs' is a Name, 'rhs' a Name, a Call, or another Dot when
+    dotted expressions are chained; None if the parser found no rhs.
+    """
+
+    __slots__ = ("lhs", "rhs")
+    fields = ("lhs", "rhs")
+
+    def __init__(self, lhs, rhs, token=None):
+        super().__init__(token)
+        self.lhs = lhs
+        self.rhs = rhs
+
+
+class Call(PG_Node):
+    """A call of the function, constructor or method named 'name'"""
+
+    __slots__ = ("name", "args")
+    fields = ("args",)
+
+    def __init__(self, name, args, token=None):
+        super().__init__(token)
+        self.name = name
+        self.args = args
+
+
+class Assign(PG_Node):
+    """target = value; 'target' is a Name, or a Dot of two Names"""
+
+    __slots__ = ("target", "value")
+    fields = ("target", "value")
+
+    def __init__(self, target, value, token=None):
+        super().__init__(token)
+        self.target = target
+        self.value = value
+
+
+class If(PG_Node):
+    """
+    An if, or elif, statement. 'orelse' is None, the Block of an else, or
+    the If of an elif.
+    """
+
+    __slots__ = ("test", "body", "orelse")
+    fields = ("test", "body", "orelse")
+
+    def __init__(self, test, body, orelse=None, token=None):
+        super().__init__(token)
+        self.test = test
+        self.body = body
+        self.orelse = orelse
+
+
+class While(PG_Node):
+    __slots__ = ("test", "body")
+    fields = ("test", "body")
+
+    def __init__(self, test, body, token=None):
+        super().__init__(token)
+        self.test = test
+        self.body = body
+
+
+class FuncDef(PG_Node):
+    """
+    A function or method definition; 'params' is a tuple of names, 'memo'
+    the token of the memo keyword of a memo def, or None
+    """
+
+    __slots__ = ("name", "params", "body", "memo")
+    fields = ("body",)
+
+    def __init__(self, name, params, body, token=None, memo=None):
+        super().__init__(token)
+        self.name = name
+        self.params = params
+        self.body = body
+        self.memo = memo
+
+
+class ClassDef(PG_Node):
+    __slots__ = ("name", "body")
+    fields = ("body",)
+
+    def __init__(self, name, body, token=None):
+        super().__init__(token)
+        self.name = name
+        self.body = body
+
+
+class Return(PG_Node):
+    __slots__ = ("value",)
+    fields = ("value",)
+
+    def __init__(self, value, token=None):
+        super().__init__(token)
+        self.value = value
+
+
+class Print(PG_Node):
+    __slots__ = ("args",)
+    fields = ("args",)
+
+    def __init__(self, args, token=None):
+        super().__init__(token)
+        self.args = args
+
+
+class Import(PG_Node):
+    """An import statement; 'path' is the module path as written"""
+
+    __slots__ = ("path",)
+
+    def __init__(self, path, token=None):
+        super().__init__(token)
+        self.path = path
+
+
+class FromImport(PG_Node):
+    """A selective import; 'names' is a tuple of the names imported"""
+
+    __slots__ = ("path", "names")
+
+    def __init__(self, path, names, token=None):
+        super().__init__(token)
+        self.path = path
+        self.names = names
+
+
+def from_pg_ast(t: PG_AST) -> PG_Node:
+    """
+    Converts the PG_AST tree rooted at 't' to typed nodes.
+
+    Raises ValueError for a node that does not fit the grammar.
+    """
+    token = t.token
+    if token is None:
+        if t.artificial and t.name == "$STATEMENTS":
+            return Block([from_pg_ast(child) for child in t.children])
+        raise ValueError(f"Can't convert {t!r}")
+
+    convert = _FROM_PG_AST.get(token.type)
+    if convert is None:
+        raise ValueError(f"Can't convert {t!r}")
+    return convert(t, token)
+
+
+def _from_int(t, token):
+    return Literal(int(token.text), token)
+
+
+def _from_float(t, token):
+    return Literal(float(token.text), token)
+
+
+def _from_string(t, token):
+    return Literal(token.text, token)
+
+
+def _from_bool(t, token):
+    return Literal(token.text == "True", token)
+
+
+def _from_name(t, token):
+    children = t.children
+    # A name followed by an argument list is a call
+    if len(children) > 0 and children[0].name == "$ARG_LIST":
+        return Call(token.text, [from_pg_ast(arg) for arg in children[0].children], token)
+    return Name(token.text, token)
+
+
+def _from_binary(t, token):
+    left, right = t.children
+    return BinOp(token.type, from_pg_ast(left), from_pg_ast(right), token)
+
+
+def _from_dot(t, token):
+    lhs, rhs = t.children
+    return Dot(from_pg_ast(lhs), None if rhs is None else from_pg_ast(rhs), token)
+
+
+def _from_assign(t, token):
+    target, value = t.children
+    return Assign(from_pg_ast(target), from_pg_ast(value), token)
+
+
+def _from_if(t, token):
+    children = t.children
+    orelse = from_pg_ast(children[2]) if len(children) == 3 else None
+    return If(from_pg_ast(children[0]), from_pg_ast(children[1]), orelse, token)
+
+
+def _from_while(t, token):
+    test, body = t.children
+    return While(from_pg_ast(test), from_pg_ast(body), token)
+
+
+def _from_def(t, token):
+    children = t.children
+    name, param_list, body = children[:3]
+    params = tuple(param.token.text for param in param_list.children)
+    memo = children[3].token if len(children) == 4 else None
+    return FuncDef(name.token.text, params, from_pg_ast(body), token, memo)
+
+
+def _from_class(t, token):
+    name, body = t.children
+    return ClassDef(name.token.text, from_pg_ast(body), token)
+
+
+def _from_return(t, token):
+    return Return(from_pg_ast(t.children[0]), token)
+
+
+def _from_print(t, token):
+    args = t.children[0].children if len(t.children) > 0 else []
+    return Print([from_pg_ast(arg) for arg in args], token)
+
+
+def _from_import(t, token):
+    return Import(t.children[0].token.text, token)
+
+
+def _from_from_import(t, token):
+    path, name_list = t.children
+    names = tuple(name.token.text for name in name_list.children)
+    return FromImport(path.token.text, names, token)
+
+
+# Token type -> what converts a PG_AST node of that type
+_FROM_PG_AST = {
+    PGT.INT: _from_int,
+    PGT.FLOAT: _from_float,
+    PGT.STRING: _from_string,
+    PGT.TRUE: _from_bool,
+    PGT.FALSE: _from_bool,
+    PGT.NAME: _from_name,
+    **dict.fromkeys(BINARY_OPS, _from_binary),
+    PGT.DOT: _from_dot,
+    PGT.ASSIGN: _from_assign,
+    PGT.IF: _from_if,
+    PGT.ELIF: _from_if,
+    PGT.WHILE: _from_while,
+    PGT.DEF: _from_def,
+    PGT.CLASS: _from_class,
+    PGT.RETURN: _from_return,
+    PGT.PRINT: _from_print,
+    PGT.IMPORT: _from_import,
+    PGT.FROM: _from_from_import,
+}
+
+
+def to_pg_ast(node: PG_Node, literals=False) -> PG_AST:
+    """
+    Converts the typed tree rooted at 'node' back to the PG_AST tree the
+    parser would have built for it. With 'literals', Literals become
+    PG_Literal nodes, which keep their value, instead of plain PG_AST.
+
+    Every node but Block must have the token it was built from.
+    """
+    return _to_pg_ast(node, literals)
+
+
+def _to_pg_ast(node: PG_Node, literals: bool) -> PG_AST:
+    convert = _TO_PG_AST.get(type(node))
+    if convert is None:
+        raise ValueError(f"Can't convert {node!r}")
+    return convert(node, literals)
+
+
+def _pg_ast(token, children=None):
+    t = PG_AST(token=token)
+    if children is not None:
+        t.children = children
+    return t
+
+
+def _artificial(name, children):
+    t = PG_AST(artificial=True, name=name)
+    t.children = children
+    return t
+
+
+def _to_block(node, literals):
+    return _artificial("$STATEMENTS", [_to_pg_ast(s, literals) for s in node.statements])
+
+
+def _to_literal(node, literals):
+    if literals:
+        return PG_Literal(node.token, node.value)
+    return PG_AST(token=node.token)
+
+
+def _to_name(node, literals):
+    return PG_AST(token=node.token)
+
+
+def _to_call(node, literals):
+    args = _artificial("$ARG_LIST", [_to_pg_ast(arg, literals) for arg in node.args])
+    return _pg_ast(node.token, [args])
+
+
+def _to_binary(node, literals):
+    left = _to_pg_ast(node.left, literals)
+    return _pg_ast(node.token, [left, _to_pg_ast(node.right, literals)])
+
+
+def _to_dot(node, literals):
+    rhs = None if node.rhs is None else _to_pg_ast(node.rhs, literals)
+    return _pg_ast(node.token, [_to_pg_ast(node.lhs, literals), rhs])
+
+
+def _to_assign(node, literals):
+    target = _to_pg_ast(node.target, literals)
+    return _pg_ast(node.token, [target, _to_pg_ast(node.value, literals)])
+
+
+def _to_if(node, literals):
+    children = [_to_pg_ast(node.test, literals), _to_pg_ast(node.body, literals)]
+    if node.orelse is not None:
+        children.append(_to_pg_ast(node.orelse, literals))
+    return _pg_ast(node.token, children)
+
+
+def _to_while(node, literals):
+    test = _to_pg_ast(node.test, literals)
+    return _pg_ast(node.token, [test, _to_pg_ast(node.body, literals)])
+
+
+def _to_def(node, literals):
+    name = _pg_ast(_name_token(node.name, node.token))
+    params = _artificial("$ID_LIST", [_pg_ast(_name_token(p, node.token)) for p in node.params])
+    children = [name, params, _to_pg_ast(node.body, literals)]
+    if node.memo is not None:
+        children.append(_pg_ast(node.memo))
+    return _pg_ast(node.token, children)
+
+
+def _to_class(node, literals):
+    name = _pg_ast(_name_token(node.name, node.token))
+    return _pg_ast(node.token, [name, _to_pg_ast(node.body, literals)])
+
+
+def _to_return(node, literals):
+    return _pg_ast(node.token, [_to_pg_ast(node.value, literals)])
+
+
+def _to_print(node, literals):
+    args = _artificial("$ARG_LIST", [_to_pg_ast(arg, literals) for arg in node.args])
+    return _pg_ast(node.token, [args])
+
+
+def _to_import(node, literals):
+    return _pg_ast(node.token, [_pg_ast(_string_token(node.path, node.token))])
+
+
+def _to_from_import(node, literals):
+    names = _artificial("$ID_LIST", [_pg_ast(_name_token(n, node.token)) for n in node.names])
+    path = _pg_ast(_string_token(node.path, node.token))
+    return _pg_ast(node.token, [path, names])
+
+
+# Typed node class -> what converts it back to PG_AST
+_TO_PG_AST = {
+    Block: _to_block,
+    Literal: _to_literal,
+    Name: _to_name,
+    Call: _to_call,
+    BinOp: _to_binary,
+    Dot: _to_dot,
+    Assign: _to_assign,
+    If: _to_if,
+    While: _to_while,
+    FuncDef: _to_def,
+    ClassDef: _to_class,
+    Return: _to_return,
+    Print: _to_print,
+    Import: _to_import,
+    FromImport: _to_from_import,
+}
+
+
+def _name_token(name, at):
+    # Names in a def or Class aren't kept as nodes; place them on the keyword
+    return PG_Token(PGT.NAME, name, at.line, at.column)
+
+
+def _string_token(text, at):
+    return PG_Token(PGT.STRING, text, at.line, at.column)
@@ -0,0 +1,411 @@
+"""
+Optimization passes over a PG_AST, run between parsing a program and
+running it, whichever backend runs it.
+
+    fold_constants        Replaces arithmetic, comparisons, 'and' and 'or'
+                          whose operands are literals with the literal they
+                          evaluate to, with Python semantics: 5 * (3 + 2)
+                          becomes 25. Anything that would raise is left to
+                          raise when it runs.
+    materialize_literals  Replaces INT, FLOAT, STRING, True and False nodes
+                          with PG_Literal nodes, which carry their Python
+                          value; the tree-walker no longer converts the
+                          token text every time it reaches one.
+    prune_branches        Replaces an if, or elif, whose test is a literal
+                          with the arm that runs, or removes it if none does.
+    drop_after_return     Removes the statements after a return, in the
+                          blocks of a function body.
+    elide_scopes          Marks the blocks (if and else arms, loop and
+                          function bodies included) that bind no name to
+                          run in the enclosing scope, pushing none of their
+                          own; and loop bodies that do bind names to run in
+                          one scope for the whole loop, emptied between
+                          iterations, instead of a new one each time. See
+                          PG_Block. Runs after the other passes.
+
+All but elide_scopes run over the program converted to typed nodes (see
+playground_nodes.py), whose kind is their class and whose parts have names,
+then convert it back to a new PG_AST tree; elide_scopes marks that tree.
+
+Passes are switched on by name; PlaygroundOptimizer.stats counts how many
+times each one changed the tree, so a pass's contribution can be measured
+by running with and without it.
+"""
+from playground_ast import PG_AST, PG_Block, SCOPE_ELIDED, SCOPE_REUSED
+from playground_nodes import (
+    from_pg_ast,
+    to_pg_ast,
+    PG_Node,
+    Block,
+    Literal,
+    BinOp,
+    If,
+    FuncDef,
+    ClassDef,
+    Return,
+)
+from playground_token import PG_Type as PGT, PG_Token
+
+PASSES = (
+    "fold_constants",
+    "materialize_literals",
+    "prune_branches",
+    "drop_after_return",
+    "elide_scopes",
+)
+
+DEFAULT_PASSES = PASSES
+
+# The passes that run over typed nodes (see playground_nodes.py)
+_TYPED_PASSES = frozenset(PASSES) - {"elide_scopes"}
+
+_CONDITIONAL_TYPES = {PGT.IF, PGT.ELIF}
+
+# The same operations PlaygroundInterpreter._op() and _cmp() perform
+_BINARY_OPS = {
+    PGT.PLUS: lambda a, b: a + b,
+    PGT.MINUS: lambda a, b: a - b,
+    PGT.STAR: lambda a, b: a * b,
+    PGT.FSLASH: lambda a, b: a / b,
+    PGT.PERCENT: lambda a, b: a % b,
+    PGT.EQ: lambda a, b: a == b,
+    PGT.LT: lambda a, b: a < b,
+    PGT.LE: lambda a, b: a <= b,
+    PGT.GT: lambda a, b: a > b,
+    PGT.GE: lambda a, b: a >= b,
+}
+
+# Longest string a fold may produce; "a" * 1000000 is left to run time
+_MAX_FOLDED_STRING = 4096
+
+# Returned by _value() for nodes that aren't literals
+_NOT_CONSTANT = object()
+
+
+def _value(node: PG_Node):
+    """
+    Returns the Python value of literal node 'node', or _NOT_CONSTANT
+    """
+    if type(node) is Literal:
+        return node.value
+    return _NOT_CONSTANT
+
+
+def _is_block(t: PG_AST) -> bool:
+    return t.artificial == True and t.name == "$STATEMENTS"
+
+
+class PlaygroundOptimizer:
+    def __init__(self, passes=DEFAULT_PASSES):
+        unknown = set(passes) - set(PASSES)
+        if unknown:
+            raise ValueError(f"Unknown optimization passes {sorted(unknown)}, expected some of {PASSES}")
+        self.passes = frozenset(passes)
+
+        # How many times each pass has changed a tree
+        self.stats = dict.fromkeys(PASSES, 0)
+
+    def optimize(self, root: PG_AST) -> PG_AST:
+        """
+        Optimizes the program rooted at 'root'. The passes but elide_scopes
+        run over the program converted to typed nodes, and build a new
+        PG_AST tree; elide_scopes marks the tree it is given.
+
+        Returns the root of the optimized program
+        """
+        if not self.passes.isdisjoint(_TYPED_PASSES):
+            program = from_pg_ast(root)
+            self._statements(program, in_function=False, function_body=False)
+            root = to_pg_ast(program, literals="materialize_literals" in self.passes)
+        if "elide_scopes" in self.passes:
+            _ScopeElider(self.stats).statements(root, known=set())
+        return root
+
+    def _statements(self, block: Block, in_function: bool, function_body: bool, class_body=False):
+        """
+        Optimizes the statements of 'block'. 'function_body' is whether
+        'block' is the body of a function, whose last statement gives the
+        function its value.
+        """
+        statements = []
+        for position, statement in enumerate(block.statements):
+            if class_body and type(statement) is If:
+                # The statements of a class body are sorted by what they are
+                # when the class is defined; they stay what they are
+                optimized = self._conditional(statement, in_function, prune=False)
+            else:
+                optimized = self._visit(statement, in_function)
+
+            if optimized is None:
+                # An if none of whose arms runs. It was valued None, which
+                # only matters if it was the last statement of a function
+                if function_body and statement is block.statements[-1]:
+                    optimized = Block([])
+                else:
+                    continue
+            statements.append(optimized)
+
+            if (
+                "drop_after_return" in self.passes
+                and in_function
+                and type(optimized) is Return
+            ):
+                self.stats["drop_after_return"] += len(block.statements) - 1 - position
+                break
+
+        block.statements = statements
+
+    def _visit(self, node: PG_Node, in_function: bool):
+        """
+        Optimizes the sub tree rooted at 'node'.
+
+        Returns the node to replace 'node' with; None if 'node' is a
+        statement that can be removed
+        """
+        node_type = type(node)
+
+        if node_type is Block:
+            self._statements(node, in_function, function_body=False)
+            return node
+
+        if node_type is FuncDef:
+            self._statements(node.body, in_function=True, function_body=True)
+            return node
+
+        if node_type is ClassDef:
+            self._statements(node.body, in_function, function_body=False, class_body=True)
+            return node
+
+        if node_type is If:
+            return self._conditional(node, in_function)
+
+        if node_type is Literal:
+            if "materialize_literals" in self.passes:
+                self.stats["materialize_literals"] += 1
+            return node
+
+        for field in node.fields:
+            value = getattr(node, field)
+            if type(value) is list:
+                setattr(node, field, [self._visit(child, in_function) for child in value])
+            elif value is not None:
+                setattr(node, field, self._visit(value, in_function))
+
+        if node_type is BinOp:
+            if node.op is PGT.AND or node.op is PGT.OR:
+                return self._fold_boolean(node)
+            return self._fold_binary(node)
+
+        return node
+
+    def _make_literal(self, value, at: PG_Token):
+        """
+        Returns a Literal for 'value', placed where token 'at' is, or None
+        if 'value' can't be written as a literal
+        """
+        value_type = type(value)
+        if value_type is bool:
+            token = PG_Token(PGT.TRUE if value else PGT.FALSE, str(value), at.line, at.column)
+        elif value_type is int:
+            token = PG_Token(PGT.INT, str(value), at.line, at.column)
+        elif value_type is float:
+            token = PG_Token(PGT.FLOAT, repr(value), at.line, at.column)
+        elif value_type is str and len(value) <= _MAX_FOLDED_STRING:
+            token = PG_Token(PGT.STRING, value, at.line, at.column)
+        else:
+            return None
+        return Literal(value, token)
+
+    def _fold(self, node: BinOp, value):
+        literal = self._make_literal(value, node.token)
+        if literal is None:
+            return node
+        self.stats["fold_constants"] += 1
+        return literal
+
+    def _fold_binary(self, node: BinOp):
+        if "fold_constants" not in self.passes:
+            return node
+        a = _value(node.left)
+        b = _value(node.right)
+        if a is _NOT_CONSTANT or b is _NOT_CONSTANT:
+            return node
+        try:
+            value = _BINARY_OPS[node.op](a, b)
+        except Exception:
+            return node
+        return self._fold(node, value)
+
+    def _fold_boolean(self, node: BinOp):
+        """
+        See PlaygroundInterpreter._and() and _or(); the right operand is
+        only dropped when it would never be evaluated
+        """
+        if "fold_constants" not in self.passes:
+            return node
+        a = _value(node.left)
+        if a is _NOT_CONSTANT:
+            return node
+
+        if node.op is PGT.AND and a == False:
+            return self._fold(node, False)
+        if node.op is PGT.OR and a == True:
+            return self._fold(node, True)
+
+        b = _value(node.right)
+        if b is _NOT_CONSTANT:
+            return node
+        return self._fold(node, b == True)
+
+    def _conditional(self, node: If, in_function: bool, prune=True):
+        """
+        Optimizes if, or elif, node 'node'. Its arms are optimized first,
+        so an elif chain is pruned from its end; 'node' itself is only
+        pruned if 'prune' is set.
+        """
+        node.test = self._visit(node.test, in_function)
+        node.body = self._visit(node.body, in_function)
+        if node.orelse is not None:
+            node.orelse = self._visit(node.orelse, in_function)
+
+        if "prune_branches" not in self.passes or not prune:
+            return node
+        test = _value(node.test)
+        if test is _NOT_CONSTANT:
+            return node
+
+        self.stats["prune_branches"] += 1
+        if test:
+            return node.body
+        return node.orelse
+
+
+def _reads(t: PG_AST, names: set):
+    """
+    Adds the names evaluating expression 't' is certain to look up, in
+    the current scope, to 'names': not those of the right operand of 'and'
+    and 'or', or those looked up with an instance pushed as the scope.
+    """
+    if t is None or t.token is None:
+        return
+    token_type = t.token.type
+    children = t.children
+
+    if token_type is PGT.NAME:
+        if len(children) > 0 and children[0].name == "$ARG_LIST":
+            # A call; its arguments are evaluated first
+            for arg in children[0].children:
+                _reads(arg, names)
+        else:
+            names.add(t.token.text)
+
+    elif token_type is PGT.DOT:
+        if children[0].token.text != "this":
+            names.add(children[0].token.text)
+
+    elif token_type is PGT.AND or token_type is PGT.OR:
+        _reads(children[0], names)
+
+    else:
+        for child in children:
+            _reads(child, names)
+
+
+class _ScopeElider:
+    """
+    The elide_scopes pass. A block needs a scope of its own only if one of
+    its statements can bind a name in it: defines a function or class,
+    imports, or assigns a name that might not be bound yet. Assigning a
+    name is certain to rebind it, where it is, if the name was assigned, or
+    defined, earlier in the block or an enclosing one, is a parameter of
+    the function the block is in, or is read by the assigned expression
+    itself (which raises if it isn't bound).
+
+    Playground scoping is dynamic, so names bound outside the function, or
+    module, are never counted on being there.
+    """
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def statements(self, t: PG_AST, known: set) -> tuple:
+        """
+        Visits the statements of block 't'; the names in 'known' are
+        certain to be bound in the scopes it runs in.
+
+        Returns (whether the block binds names, whether it imports)
+        """
+        known = set(known)
+        binds = imports = False
+        for i, statement in enumerate(t.children):
+            t.children[i] = statement = self.statement(statement, known)
+            if statement.token is None:
+                continue
+
+            token_type = statement.token.type
+            if token_type is PGT.IMPORT or token_type is PGT.FROM:
+                binds = imports = True
+
+            elif token_type is PGT.DEF or token_type is PGT.CLASS:
+                binds = True
+                known.add(statement.children[0].token.text)
+
+            elif token_type is PGT.ASSIGN:
+                lhs = statement.children[0]
+                if lhs.token.type is PGT.NAME:
+                    name = lhs.token.text
+                    if name not in known:
+                        read = set()
+                        _reads(statement.children[1], read)
+                        if name not in read:
+                            binds = True
+                        known.add(name)
+        return binds, imports
+
+    def statement(self, t: PG_AST, known: set) -> PG_AST:
+        """
+        Marks the blocks nested in statement 't'.
+
+        Returns the node to replace 't' with
+        """
+        if t.token is None:
+            if _is_block(t):
+                return self.block(t, known)
+            return t
+
+        token_type = t.token.type
+        children = t.children
+
+        if token_type in _CONDITIONAL_TYPES:
+            children[1] = self.block(children[1], known)
+            if len(children) == 3:
+                children[2] = self.statement(children[2], known)
+
+        elif token_type is PGT.WHILE:
+            children[1] = self.block(children[1], known, loop_body=True)
+
+        elif token_type is PGT.DEF:
+            params = {param.token.text for param in children[1].children}
+            children[2] = self.block(children[2], params)
+
+        elif token_type is PGT.CLASS:
+            # Class bodies are sorted by what each statement is, when the
+            # class is defined; only the blocks nested in them are marked
+            members = children[1].children
+            for i, member in enumerate(members):
+                members[i] = self.statement(member, set())
+        return t
+
+    def block(self, t: PG_AST, known: set, loop_body=False) -> PG_AST:
+        """
+        Returns the node to replace block 't' with
+        """
+        binds, imports = self.statements(t, known)
+        if not binds:
+            scope = SCOPE_ELIDED
+        elif loop_body and not imports:
+            scope = SCOPE_REUSED
+        else:
+            return t
+        self.stats["elide_scopes"] += 1
+        return PG_Block(t, scope)
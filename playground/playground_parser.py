@@ -1,29 +1,82 @@
-from functools import wraps
-
-from abstract.abs_parser import AbstractParser, ParsingError
+from abstract.abs_errors import ParsingError
+from abstract.abs_parser import AbstractParser
+from abstract.abs_lexer import LexingError
 from playground_ast import PG_AST
 from playground_token import PG_Type as PGT
-from playground_lexer import PlaygroundLexer
-
-DEBUG=False
-def _reraise_with_rule_name(fn):
-    if DEBUG: return fn
-    @wraps(fn)
-    def wrapper(*args, **kwargs):
-        try:
-            return fn(*args, **kwargs)
-        except Exception as e:
-            msg = getattr(e, "message", str(e))
-            raise ParsingError(f"\nrule `{fn.__name__}`: {msg}")
-
-    return wrapper
+from playground_lexer import PlaygroundLexer, PlaygroundStreamLexer
+
+# Binary operators, and how tightly each binds; all are left associative.
+# Lowest to highest: or, and, comparisons, add ops, mult ops
+BINARY_PRECEDENCE = {
+    PGT.OR: 1,
+    PGT.AND: 2,
+    PGT.LT: 3,
+    PGT.LE: 3,
+    PGT.GT: 3,
+    PGT.GE: 3,
+    PGT.EQ: 3,
+    PGT.PLUS: 4,
+    PGT.MINUS: 4,
+    PGT.STAR: 5,
+    PGT.FSLASH: 5,
+    PGT.PERCENT: 5,
+}
+_LPAREN, _RPAREN, _NAME = PGT.LPAREN, PGT.RPAREN, PGT.NAME
+
+# Atoms that are a single token
+_ATOM_TYPES = {PGT.NAME, PGT.INT, PGT.FLOAT, PGT.STRING, PGT.TRUE, PGT.FALSE}
 
 
 class PlaygroundParser(AbstractParser):
-    def __init__(self, input_str):
-        super().__init__(input_lexer=PlaygroundLexer(input_str), k=4, AST_Class=PG_AST)
+    def __init__(self, input_str=None, tokenize_all=True, source=None):
+        """
+        Parses 'input_str'. Alternatively, pass a file object or an mmap as
+        'source' to lex it in chunks as the parser asks for tokens; the
+        source is never read in all at once, so 'tokenize_all' is ignored.
+        """
+        if source is not None:
+            input_lexer = PlaygroundStreamLexer(source)
+            tokenize_all = False
+        else:
+            input_lexer = PlaygroundLexer(input_str)
+
         self.testing = False
 
+        # Whether the statements being parsed are those of a class body
+        self.in_class_body = False
+
+        # In tokenize-all mode the whole input is lexed right here. Any error
+        # the lexer finds is kept, and reported by program() like the rest.
+        self.lexing_error = None
+        try:
+            super().__init__(
+                input_lexer=input_lexer,
+                k=4,
+                AST_Class=PG_AST,
+                tokenize_all=tokenize_all,
+            )
+        except LexingError as le:
+            self.lexing_error = le
+
+        self.statement_LA_set = {
+            PGT.LPAREN,
+            PGT.NAME,
+            PGT.IMPORT,
+            PGT.FROM,
+            PGT.PRINT,
+            PGT.INT,
+            PGT.FLOAT,
+            PGT.LCURBRACK,
+            PGT.TRUE,
+            PGT.FALSE,
+            PGT.IF,
+            PGT.WHILE,
+            PGT.DEF,
+            PGT.MEMO,
+            PGT.CLASS,
+            PGT.RETURN,
+        }
+
         self.expr_LA_set = {
             PGT.LPAREN,
             PGT.NAME,
@@ -36,10 +89,14 @@ class PlaygroundParser(AbstractParser):
 
     def program(self):
         try:
+            if self.lexing_error is not None:
+                raise self.lexing_error
+
             root = self.statements()
             if self.LA(1) != PGT.EOF:
-                raise ParsingError(
-                    f"Failed to reach EOF before parsing halted. Last token retrieved: {self.LT(1)} on line {self.input.line_number}"
+                self.error(
+                    "Failed to reach EOF before parsing halted",
+                    expected=self.statement_LA_set | {PGT.EOF},
                 )
             return root
         except ParsingError as pe:
@@ -51,35 +108,21 @@ class PlaygroundParser(AbstractParser):
 
             return None
 
-    @_reraise_with_rule_name
     def statements(self):
         root = PG_AST(artificial=True, name="$STATEMENTS")
-        while self.LA(1) in {
-            PGT.LPAREN,
-            PGT.NAME,
-            PGT.IMPORT,
-            PGT.PRINT,
-            PGT.INT,
-            PGT.FLOAT,
-            PGT.LCURBRACK,
-            PGT.TRUE,
-            PGT.FALSE,
-            PGT.IF,
-            PGT.WHILE,
-            PGT.DEF,
-            PGT.CLASS,
-            PGT.RETURN,
-        }:
+        while self.LA(1) in self.statement_LA_set:
             root.add_child(self.statement())
         return root
 
-    @_reraise_with_rule_name
     def statement(self):
         root = None
         # Parse built in print function
         if self.LA(1) == PGT.IMPORT:
             root = self.pg_import()
 
+        elif self.LA(1) == PGT.FROM:
+            root = self.pg_from_import()
+
         elif self.LA(1) == PGT.PRINT:
             root = self.pg_print()
 
@@ -89,6 +132,9 @@ class PlaygroundParser(AbstractParser):
         elif self.LA(1) == PGT.DEF:
             root = self.func_def()
 
+        elif self.LA(1) == PGT.MEMO:
+            root = self.memo_def()
+
         elif self.LA(1) == PGT.RETURN:
             root = self.return_stat()
 
@@ -115,13 +161,10 @@ class PlaygroundParser(AbstractParser):
             root = self.while_stat()
 
         else:
-            raise ParsingError(
-                f"Expecting a statement; found {self.LT(1)} on line {self.input.line_number}"
-            )
+            self.error("Expecting a statement", expected=self.statement_LA_set)
 
         return root
 
-    @_reraise_with_rule_name
     def pg_import(self):
         root = self.match(PGT.IMPORT)
         path = self.match(PGT.STRING)
@@ -129,7 +172,19 @@ class PlaygroundParser(AbstractParser):
         self.match(PGT.SEMI_COLON)
         return root 
 
-    @_reraise_with_rule_name
+    def pg_from_import(self):
+        """
+        from "module.plgd" import name, ...;
+        """
+        root = self.match(PGT.FROM)
+        root.add_child(self.match(PGT.STRING))
+        self.match(PGT.IMPORT)
+        if self.LA(1) != PGT.NAME:
+            self.error("Expecting the names to import", expected={PGT.NAME})
+        root.add_child(self.id_list())
+        self.match(PGT.SEMI_COLON)
+        return root
+
     def pg_print(self):
         root = self.match(PGT.PRINT)
         self.match(PGT.LPAREN)
@@ -138,7 +193,6 @@ class PlaygroundParser(AbstractParser):
         self.match(PGT.SEMI_COLON)
         return root
 
-    @_reraise_with_rule_name
     def arg_list(self):
         root = PG_AST(artificial=True, name="$ARG_LIST")
 
@@ -167,7 +221,6 @@ class PlaygroundParser(AbstractParser):
 
         return root
 
-    @_reraise_with_rule_name
     def assign(self):
         name = self.match(PGT.NAME)
         dot_name = None
@@ -184,14 +237,12 @@ class PlaygroundParser(AbstractParser):
         root.add_children(name, expr)
         return root
 
-    @_reraise_with_rule_name
     def block_stat(self):
         self.match(PGT.LCURBRACK)
         root = self.statements()
         self.match(PGT.RCURBRACK)
         return root
 
-    @_reraise_with_rule_name
     def if_stat(self):
         root = self.match(PGT.IF)
         test = self.bool_expr()
@@ -206,7 +257,6 @@ class PlaygroundParser(AbstractParser):
 
         return root
 
-    @_reraise_with_rule_name
     def elif_stat(self):
         root = self.match(PGT.ELIF)
         test = self.bool_expr()
@@ -221,12 +271,10 @@ class PlaygroundParser(AbstractParser):
 
         return root
 
-    @_reraise_with_rule_name
     def else_stat(self):
         self.match(PGT.ELSE)
         return self.block_stat()
 
-    @_reraise_with_rule_name
     def while_stat(self):
         root = self.match(PGT.WHILE)
         test = self.bool_expr()
@@ -234,17 +282,32 @@ class PlaygroundParser(AbstractParser):
         root.add_children(test, block)
         return root
 
-    @_reraise_with_rule_name
     def func_def(self):
         root = self.match(PGT.DEF)
         root.add_child(self.match(PGT.NAME))
         self.match(PGT.LPAREN)
         root.add_child(self.id_list())
         self.match(PGT.RPAREN)
+        in_class_body = self.in_class_body
+        self.in_class_body = False
         root.add_child(self.block_stat())
+        self.in_class_body = in_class_body
+        return root
+
+    def memo_def(self):
+        """
+        memo def NAME ( id_list ) block_stat; parsed to the def node, with
+        the 'memo' node as its last child
+        """
+        if self.in_class_body:
+            self.error("Methods can't be memoized")
+        memo = self.match(PGT.MEMO)
+        if self.LA(1) != PGT.DEF:
+            self.error("Expecting a function definition", expected={PGT.DEF})
+        root = self.func_def()
+        root.add_child(memo)
         return root
 
-    @_reraise_with_rule_name
     def func_call(self):
         root = self.match(PGT.NAME)
         self.match(PGT.LPAREN)
@@ -252,22 +315,22 @@ class PlaygroundParser(AbstractParser):
         self.match(PGT.RPAREN)
         return root
 
-    @_reraise_with_rule_name
     def return_stat(self):
         root = self.match(PGT.RETURN)
         root.add_child(self.bool_expr())
         self.match(PGT.SEMI_COLON)
         return root
 
-    @_reraise_with_rule_name
     def class_def(self):
         root = self.match(PGT.CLASS)
         class_name = self.match(PGT.NAME)
+        in_class_body = self.in_class_body
+        self.in_class_body = True
         class_body = self.block_stat()
+        self.in_class_body = in_class_body
         root.add_children(class_name, class_body)
         return root
 
-    @_reraise_with_rule_name
     def dotted_expr(self):
         LHS = self.match(PGT.NAME)
         root = self.match(PGT.DOT)
@@ -283,183 +346,89 @@ class PlaygroundParser(AbstractParser):
         root.add_children(LHS, RHS)
         return root
 
-    @_reraise_with_rule_name
     def bool_expr(self):
-        if self.LA(1) not in self.expr_LA_set:
-            raise ParsingError(
-                f"Expecting an bool expression; found {self.LT(1)} on line {self.input.line_number}"
-            )
-        root = None
-        left = self.and_expr()
-
-        while self.LA(1) == PGT.OR:
-            if root != None:
-                left = root
-            root = self.match(PGT.OR)
-            right = self.and_expr()
-            root.add_children(left, right)
-
-        return root if root != None else left
-
-    @_reraise_with_rule_name
-    def and_expr(self):
-        if self.LA(1) not in self.expr_LA_set:
-            raise ParsingError(
-                f"Expecting an and expression; found {self.LT(1)} on line {self.input.line_number}"
-            )
-        root = None
-        left = self.comp_expr()
-
-        while self.LA(1) == PGT.AND:
-            if root != None:
-                left = root
-            root = self.match(PGT.AND)
-            right = self.comp_expr()
-            root.add_children(left, right)
-
-        return root if root != None else left
-
-    @_reraise_with_rule_name
-    def comp_expr(self):
-        if self.LA(1) not in self.expr_LA_set:
-            raise ParsingError(
-                f"Expecting a comp expression; found {self.LT(1)} on line {self.input.line_number}"
-            )
-        root = None
-        left = self.add_expr()
-
-        while self.LA(1) in {
-            PGT.LT,
-            PGT.LE,
-            PGT.GT,
-            PGT.GE,
-            PGT.EQ,
-        }:
-            if root != None:
-                left = root
-            root = self.cmp_op()
-            right = self.add_expr()
-            root.add_children(left, right)
-
-        return root if root != None else left
-
-    @_reraise_with_rule_name
-    def cmp_op(self):
-        root = None
-        if self.LA(1) == PGT.LT:
-            root = self.match(PGT.LT)
-        elif self.LA(1) == PGT.LE:
-            root = self.match(PGT.LE)
-        elif self.LA(1) == PGT.GT:
-            root = self.match(PGT.GT)
-        elif self.LA(1) == PGT.GE:
-            root = self.match(PGT.GE)
-        elif self.LA(1) == PGT.EQ:
-            root = self.match(PGT.EQ)
-        else:
-            raise ParsingError(
-                f"Expecting a comparison operator; found {self.LT(1)} on line {self.input.line_number}"
+        """
+        Parses a whole expression: bool_expr, and_expr, comp_expr, add_expr
+        and mult_expr in the grammar, plus parenthesized sub expressions.
+
+        Instead of one method per precedence level, this is a single
+        operator precedence loop, with explicit stacks for operands and
+        pending operators. Parentheses are pushed on the operator stack too,
+        so how deeply they nest is not limited by Python's recursion limit.
+
+        Builds the same trees the one-method-per-level parser did: each
+        operator is the root of its left and right operands, and chains of
+        operators with the same precedence lean left.
+        """
+        LA = self.LA
+        operands = []
+        operators = []  # Operator nodes; None marks an open parenthesis
+        open_parens = 0
+
+        while True:
+            while LA(1) == _LPAREN:
+                self.consume()
+                operators.append(None)
+                open_parens += 1
+
+            if LA(1) not in self.expr_LA_set:
+                self.error("Expecting an expression", expected=self.expr_LA_set)
+            operands.append(self.atom())
+
+            # Close any parentheses that end after this operand
+            while open_parens > 0 and LA(1) == _RPAREN:
+                self.consume()
+                while operators[-1] is not None:
+                    self._reduce(operands, operators)
+                operators.pop()
+                open_parens -= 1
+
+            precedence = BINARY_PRECEDENCE.get(LA(1))
+            if precedence is None:
+                break
+
+            # Everything on the stack that binds at least as tightly as the
+            # new operator is complete; this is what makes chains lean left.
+            while (
+                len(operators) > 0
+                and operators[-1] is not None
+                and BINARY_PRECEDENCE[operators[-1].token.type] >= precedence
+            ):
+                self._reduce(operands, operators)
+            operators.append(self.match(LA(1)))
+
+        if open_parens > 0:
+            self.error(
+                f"Expecting {PGT.RPAREN}",
+                expected={_RPAREN, *BINARY_PRECEDENCE},
             )
-        return root
 
-    @_reraise_with_rule_name
-    def add_expr(self):
-        if self.LA(1) not in self.expr_LA_set:
-            raise ParsingError(
-                f"Expecting an add expression; found {self.LT(1)} on line {self.input.line_number}"
-            )
-        root = None
-        left = self.mult_expr()
-
-        while self.LA(1) in {PGT.PLUS, PGT.MINUS}:
-            if root != None:
-                left = root
-            root = self.add_op()
-            right = self.mult_expr()
-            root.add_children(left, right)
-
-        return root if root != None else left
-
-    @_reraise_with_rule_name
-    def mult_expr(self):
-        if self.LA(1) not in self.expr_LA_set:
-            raise ParsingError(
-                f"Expecting an add expression; found {self.LT(1)} on line {self.input.line_number}"
-            )
+        while len(operators) > 0:
+            self._reduce(operands, operators)
+        return operands[0]
+
+    def _reduce(self, operands, operators):
+        """
+        Pops the top operator and its two operands, and pushes the operator,
+        now the root of the two operands, back on as an operand.
+        """
+        root = operators.pop()
+        right = operands.pop()
+        left = operands.pop()
+        root.add_children(left, right)
+        operands.append(root)
 
-        root = None
-        left = self.atom()
-
-        while self.LA(1) in {PGT.STAR, PGT.FSLASH, PGT.PERCENT}:
-            # Root can be set if we're parsing a continuous string of
-            # multiplications:
-            # 2 * 2 * 2
-            # Tree looks like = * (2 2),
-            #              then * ((* (2 2)) 2)
-            if root != None:
-                left = root
-            root = self.mult_op()
-            right = self.atom()
-            root.add_children(left, right)
-
-        return root if root != None else left
-
-    @_reraise_with_rule_name
     def atom(self):
         root = None
-        if self.LA(1) == PGT.NAME and self.LA(2) == PGT.DOT:
+        token_type = self.LA(1)
+        if token_type == _NAME and self.LA(2) == PGT.DOT:
             root = self.dotted_expr()
-        elif self.LA(1) == PGT.NAME and self.LA(2) == PGT.LPAREN:
+        elif token_type == _NAME and self.LA(2) == _LPAREN:
             root = self.func_call()
-        elif self.LA(1) == PGT.NAME:
-            root = self.match(PGT.NAME)
-        elif self.LA(1) == PGT.INT:
-            root = self.match(PGT.INT)
-        elif self.LA(1) == PGT.FLOAT:
-            root = self.match(PGT.FLOAT)
-        elif self.LA(1) == PGT.STRING:
-            root = self.match(PGT.STRING)
-        elif self.LA(1) == PGT.TRUE:
-            root = self.match(PGT.TRUE)
-        elif self.LA(1) == PGT.FALSE:
-            root = self.match(PGT.FALSE)
-        elif self.LA(1) == PGT.LPAREN:
-            self.match(PGT.LPAREN)
-            root = self.bool_expr()
-            self.match(PGT.RPAREN)
+        elif token_type in _ATOM_TYPES:
+            root = self.match(token_type)
         else:
-            raise ParsingError(
-                f"Expecting an atom; found {self.LT(1)} on line {self.input.line_number}"
-            )
-        return root
-
-    @_reraise_with_rule_name
-    def add_op(self):
-        root = None
-        if self.LA(1) == PGT.PLUS:
-            root = self.match(PGT.PLUS)
-        elif self.LA(1) == PGT.MINUS:
-            root = self.match(PGT.MINUS)
-        else:
-            raise ParsingError(
-                f"Expecting an add op ('+' or '-'); found {self.LT(1)} on line {self.input.line_number}"
-            )
-        return root
-
-    @_reraise_with_rule_name
-    def mult_op(self):
-        root = None
-        if self.LA(1) == PGT.STAR:
-            root = self.match(PGT.STAR)
-        elif self.LA(1) == PGT.FSLASH:
-            root = self.match(PGT.FSLASH)
-
-        elif self.LA(1) == PGT.PERCENT:
-            root = self.match(PGT.PERCENT)
-        else:
-            raise ParsingError(
-                f"Expecting an mult op ('*' or '/'); found {self.LT(1)} on line {self.input.line_number}"
-            )
+            self.error("Expecting an atom", expected=_ATOM_TYPES)
         return root
 
 
@@ -0,0 +1,123 @@
+"""
+Adaptive specialization ("quickening") of arithmetic and comparisons, for
+the tree-walker; switched on with PlaygroundInterpreter(adaptive=True).
+
+Before a program runs, quicken() replaces each of its arithmetic and
+comparison nodes with a PG_QuickOp, holding a PG_OpSite: the operator
+function for the node's operator, picked once, so running the node no
+longer goes through _op()'s or _cmp()'s if/elif ladder. The site watches
+the types of the operands it is given, and once it has seen the same pair
+WARMUP times in a row, of one of
+
+    int, int    float, float    str, str
+
+it specializes for them: while the operands are of those types, running the
+node is a type check and a call of the operator function. Operands of
+other types deoptimize it, back to watching; a site that deoptimizes
+MAX_DEOPTS times stays generic.
+
+The closure and VM backends pick the operation of each node when they
+compile it already, so they leave PG_QuickOp nodes alone.
+"""
+import operator
+
+from playground_ast import PG_AST, PG_Literal, PG_QuickOp
+from playground_token import PG_Type as PGT
+
+# The same operations PlaygroundInterpreter._op() and _cmp() perform
+OPERATORS = {
+    PGT.PLUS: operator.add,
+    PGT.MINUS: operator.sub,
+    PGT.STAR: operator.mul,
+    PGT.FSLASH: operator.truediv,
+    PGT.PERCENT: operator.mod,
+    PGT.EQ: operator.eq,
+    PGT.LT: operator.lt,
+    PGT.LE: operator.le,
+    PGT.GT: operator.gt,
+    PGT.GE: operator.ge,
+}
+
+# The operand types a site specializes for
+SPECIALIZABLE = {(int, int), (float, float), (str, str)}
+
+# How many times in a row a site sees the same operand types before it
+# specializes for them
+WARMUP = 8
+
+# How many times a site deoptimizes before it stays generic
+MAX_DEOPTS = 4
+
+
+class PG_OpSite:
+    __slots__ = ("fn", "left", "right", "seen", "count", "deopts")
+
+    def __init__(self, fn):
+        self.fn = fn  # The operator function
+        self.left = None  # The operand types the site is specialized for
+        self.right = None
+        self.seen = None  # The operand types seen last, while not specialized
+        self.count = 0  # How many times in a row they were seen
+        self.deopts = 0
+
+    @property
+    def specialized(self):
+        return self.left is not None
+
+    @property
+    def generic(self):
+        return self.deopts >= MAX_DEOPTS
+
+    def miss(self, a, b):
+        """
+        Runs the operation on operands the site isn't specialized for, and
+        specializes, or deoptimizes, the site as need be.
+
+        Returns the result
+        """
+        types = (type(a), type(b))
+        if self.left is not None:
+            self.left = self.right = None
+            self.deopts += 1
+            self.count = 0
+
+        if self.deopts < MAX_DEOPTS and types in SPECIALIZABLE:
+            if types == self.seen:
+                self.count += 1
+                if self.count >= WARMUP:
+                    self.left, self.right = types
+            else:
+                self.seen = types
+                self.count = 1
+        return self.fn(a, b)
+
+    def __repr__(self):
+        if self.left is not None:
+            state = f"{self.left.__name__}, {self.right.__name__}"
+        else:
+            state = "generic" if self.generic else "watching"
+        return f"<OpSite: {self.fn.__name__}, {state}, deopts: {self.deopts}>"
+
+
+def quicken(t: PG_AST, sites: list):
+    """
+    Replaces the arithmetic and comparison nodes in the tree rooted at 't'
+    with PG_QuickOp nodes, in place, appending the site of each to 'sites'.
+    """
+    stack = [t]
+    while stack:
+        node = stack.pop()
+        children = node.children
+        for i, child in enumerate(children):
+            if child is None or type(child) is PG_Literal:
+                continue
+            if (
+                type(child) is PG_AST
+                and child.token is not None
+                and child.token.type in OPERATORS
+                and len(child.children) == 2
+            ):
+                site = PG_OpSite(OPERATORS[child.token.type])
+                sites.append(site)
+                child = children[i] = PG_QuickOp(child, site)
+            stack.append(child)
@@ -0,0 +1,204 @@
+"""
+Lexical addressing: binds the names in a function body that can only ever
+mean one of the function's own parameters to a (depth, slot) address.
+
+    depth  How many scopes up from the scope the name is used in the
+           function's PG_FunctionScope is: 1 for the function body's own
+           block scope, plus one for each block statement nested in it;
+           blocks the optimizer elided (see PG_Block) push no scope, and
+           a loop body it reused pushes one for the whole loop, test
+           included
+    slot   Index of the parameter in PG_FunctionScope.slots
+
+Playground scoping is dynamic: the scope a function runs in is pushed on
+top of its caller's, so a name that isn't one of the function's
+parameters can mean something different on every call. Parameters are the
+exception; they are bound in the scope pushed for the call, which nothing in
+the function body can shadow, unless it:
+
+    - defines a function, or class, of the same name, which is bound in the
+      block scope the definition runs in
+    - imports a module, or defines a class, whose code can define anything
+      in the function's scopes
+
+Names in functions that import or define classes, and names shadowed by a
+definition, are left to be looked up by name. So are names evaluated with an
+instance pushed as the current scope: the arguments of a dotted method call.
+Constructors bind their arguments in the new instance, not a function scope,
+so none of their names get an address either.
+
+binds_only_params() tells the bytecode compiler which functions' tail calls
+may drop the caller's scopes; see TAIL_CALL in playground_bytecode.py.
+"""
+from playground_ast import PG_AST, PG_Block, SCOPE_ELIDED, SCOPE_REUSED
+from playground_token import PG_Type as PGT
+
+# Statements that bind names other than by assignment
+_BINDING_STATEMENTS = {PGT.IMPORT, PGT.FROM, PGT.CLASS, PGT.DEF}
+
+
+def resolve_function(t: PG_AST, class_name: str = None) -> dict:
+    """
+    Resolves the names in the body of the function defined by DEF node 't';
+    'class_name' is the name of the class 't' is a method of, if any.
+
+    Returns a dict mapping the NAME nodes that have an address to their
+    (depth, slot) address
+    """
+    name = t.children[0].token.text
+    params = [param.token.text for param in t.children[1].children]
+    body = t.children[2]
+    if len(params) == 0 or name == class_name:
+        return {}
+
+    defined = set()
+    if not _collect_definitions(body, defined):
+        return {}
+
+    slot_index = {param: slot for slot, param in enumerate(params)}
+    for shadowed in defined:
+        slot_index.pop(shadowed, None)
+
+    addresses = {}
+    if len(slot_index) > 0:
+        _Resolver(slot_index, addresses).block(body, depth=_pushed(body))
+    return addresses
+
+
+def binds_only_params(t: PG_AST, class_name: str = None) -> bool:
+    """
+    Whether the only names the body of the function defined by DEF node 't'
+    can bind, in the scopes pushed for a call of it, are its parameters: it
+    assigns no other plain names, and defines and imports nothing. The
+    scopes of a call of such a function hold nothing a function it calls
+    with the same parameter names could see.
+
+    Constructors bind their arguments in the new instance, and are never
+    such functions.
+    """
+    if t.children[0].token.text == class_name:
+        return False
+    params = {param.token.text for param in t.children[1].children}
+    return _binds_only(t.children[2], params)
+
+
+def _binds_only(t: PG_AST, params: set) -> bool:
+    token_type = t.token.type if t.token is not None else None
+    if token_type in _BINDING_STATEMENTS:
+        return False
+
+    if token_type is PGT.ASSIGN:
+        lhs = t.children[0]
+        if lhs.token.type is PGT.NAME and lhs.token.text not in params:
+            return False
+
+    for child in t.children:
+        if child is not None and not _binds_only(child, params):
+            return False
+    return True
+
+
+def _collect_definitions(t: PG_AST, defined: set) -> bool:
+    """
+    Adds the names of the functions defined in 't', outside nested function
+    bodies, to 'defined'.
+
+    Returns False if 't' imports a module or defines a class.
+    """
+    token_type = t.token.type if t.token is not None else None
+    if token_type is PGT.IMPORT or token_type is PGT.FROM or token_type is PGT.CLASS:
+        return False
+
+    if token_type is PGT.DEF:
+        defined.add(t.children[0].token.text)
+        return True
+
+    for child in t.children:
+        if child is not None and not _collect_definitions(child, defined):
+            return False
+    return True
+
+
+def _pushed(t: PG_AST) -> int:
+    """
+    Returns how many scopes running block 't' pushes
+    """
+    return 0 if type(t) is PG_Block and t.scope is SCOPE_ELIDED else 1
+
+
+class _Resolver:
+    def __init__(self, slot_index: dict, addresses: dict):
+        self.slot_index = slot_index
+        self.addresses = addresses
+
+    def block(self, t: PG_AST, depth: int):
+        for statement in t.children:
+            self.visit(statement, depth)
+
+    def name(self, t: PG_AST, depth: int):
+        slot = self.slot_index.get(t.token.text)
+        if slot is not None:
+            self.addresses[t] = (depth, slot)
+
+    def visit(self, t: PG_AST, depth: int):
+        if t.token is None:
+            if t.artificial and t.name == "$STATEMENTS":
+                self.block(t, depth + _pushed(t))
+            return
+
+        token_type = t.token.type
+        children = t.children
+
+        if token_type is PGT.NAME:
+            if len(children) > 0 and children[0].name == "$ARG_LIST":
+                # A call; the callee is looked up by the interpreter
+                self.args(children[0], depth)
+            else:
+                self.name(t, depth)
+
+        elif token_type is PGT.DOT:
+            self.dotted(t, depth)
+
+        elif token_type is PGT.ASSIGN:
+            lhs = children[0]
+            if lhs.token.type is PGT.NAME:
+                self.name(lhs, depth)
+            self.visit(children[1], depth)
+
+        elif token_type is PGT.PRINT:
+            if len(children) > 0:
+                self.args(children[0], depth)
+
+        elif token_type is PGT.DEF:
+            # A nested function resolves its own names
+            return
+
+        elif (
+            token_type is PGT.WHILE
+            and type(children[1]) is PG_Block
+            and children[1].scope is SCOPE_REUSED
+        ):
+            # The test and every iteration run in the loop's one scope
+            self.visit(children[0], depth + 1)
+            self.block(children[1], depth + 1)
+
+        else:
+            for child in children:
+                self.visit(child, depth)
+
+    def args(self, arg_list: PG_AST, depth: int):
+        for arg in arg_list.children:
+            self.visit(arg, depth)
+
+    def dotted(self, t: PG_AST, depth: int):
+        lhs = t.children[0]
+        rhs = t.children[1]
+
+        # The instance is loaded before it is pushed as a scope; 'this' is
+        # never a name
+        if lhs.token.text != "this":
+            self.name(lhs, depth)
+
+        # The next link of a chain is also evaluated before anything is pushed
+        if rhs is not None and rhs.token.type is PGT.DOT:
+            self.dotted(rhs, depth)
@@ -1,42 +1,392 @@
+from collections.abc import Mapping, MutableMapping
+from copy import deepcopy
+
 from playground_ast import PG_AST
 from abstract.abs_scope import AbstractScope
 
 
 class PG_Scope(AbstractScope):
+    # 'binds_cached': whether the scope binds a name a call, or global,
+    # cache depends on; see PlaygroundInterpreter._bound()
+    __slots__ = ("binds_cached",)
+
     def __init__(self, name=None):
         super().__init__(name=name)
+        self.binds_cached = False
+
+
+class PG_SlotSymbols(dict):
+    """
+    The symbol table of a PG_FunctionScope. A dict like any other scope's,
+    for everything that looks symbols up by name, which also keeps the
+    scope's parameter slots up to date when a parameter is assigned to.
+    """
+
+    __slots__ = ("slots", "params")
+
+    def __init__(self, slots: list, params: list):
+        super().__init__(zip(params, slots))
+        self.slots = slots
+        self.params = params
+
+    def __setitem__(self, name, value):
+        dict.__setitem__(self, name, value)
+        params = self.params
+        if name in params:
+            # The last of any parameters of the same name is the one bound
+            slot = len(params) - 1 - params[::-1].index(name)
+            self.slots[slot] = value
+
+
+class PG_FunctionScope(PG_Scope):
+    """
+    The frame of a function call, which its arguments are bound in.
+    Arguments are kept in an array, 'slots', in the order the parameters
+    are declared, so code compiled with lexical addresses (see
+    playground_resolver.py) can read and write them by index. 'parent' is
+    the scope the call was made from; scoping is dynamic.
+    """
+
+    __slots__ = ("slots",)
+
+    def __init__(self, name: str, params: list, args: list):
+        self.name = name
+        self.depth = 0
+        self.parent = None
+        self.children = None
+        self.binds_cached = False
+        self.slots = list(args)
+        self.symbols = PG_SlotSymbols(self.slots, params)
+
+
+class PG_InstanceScope(PG_Scope):
+    """
+    The scope pushed for an instance: to call a method, or constructor, of
+    it, or to look up one of its fields. Its symbols are the instance's own
+    symbol table, so names bound and looked up in it are bound and looked up
+    in the instance; the instance itself is never pushed, and never takes
+    on a parent. 'outer' is the instance scope that was innermost when it
+    was pushed.
+    """
+
+    __slots__ = ("instance", "outer")
+
+    def __init__(self, instance):
+        self.name = instance.name
+        self.depth = 0
+        self.parent = None
+        self.children = None
+        self.binds_cached = False
+        self.symbols = instance.symbols
+        self.instance = instance
+        self.outer = None
 
 
 class PG_Function:
-    def __init__(self, name: str, params: PG_Scope, code: PG_AST):
+    def __init__(self, name: str, params: PG_Scope, code: PG_AST, body=None, memo=None):
         self.name = name
         self.params = params
         self.code = code
+        self.body = body  # 'code' compiled by a backend other than the tree-walker
+        self.memo = memo  # The PG_MemoTable of a function defined with memo def
 
     def __repr__(self):
         return f"<Function: {self.name}, params: {self.params}>"
 
 
+class PG_Shape:
+    """
+    The layout of an instance's attributes: which slot of its values list
+    each attribute is kept in.
+
+    The instances of a class start out sharing the shape derived from the
+    class body. Binding a name the shape doesn't have (a constructor
+    parameter that isn't an attribute, say) moves the instance on to a
+    shape with one more slot; that shape is cached on the old one, so
+    instances that bind the same names, in the same order, share it too.
+    """
+
+    __slots__ = ("names", "index", "transitions")
+
+    def __init__(self, names: tuple = ()):
+        self.names = names
+        self.index = {name: slot for slot, name in enumerate(names)}
+        self.transitions = {}  # Name bound -> the shape that results
+
+    def adding(self, name: str):
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = self.transitions[name] = PG_Shape(self.names + (name,))
+        return shape
+
+    def __repr__(self):
+        return f"<Shape: {self.names}>"
+
+
+class PG_InstanceSymbols(MutableMapping):
+    """
+    The symbol table of a class instance: its attribute values, laid out
+    by 'shape', and the methods of its class, which every instance shares.
+    Attributes shadow methods of the same name.
+    """
+
+    __slots__ = ("shape", "values", "methods")
+
+    def __init__(self, shape: PG_Shape, values: list, methods: dict):
+        self.shape = shape
+        self.values = values
+        self.methods = methods
+
+    def __contains__(self, name):
+        return name in self.shape.index or name in self.methods
+
+    def __getitem__(self, name):
+        slot = self.shape.index.get(name)
+        if slot is not None:
+            return self.values[slot]
+        return self.methods[name]
+
+    def __setitem__(self, name, value):
+        slot = self.shape.index.get(name)
+        if slot is not None:
+            self.values[slot] = value
+        else:
+            self.shape = self.shape.adding(name)
+            self.values.append(value)
+
+    def __delitem__(self, name):
+        raise TypeError(f"Can't delete '{name}' from an instance")
+
+    def __iter__(self):
+        yield from self.shape.names
+        for name in self.methods:
+            if name not in self.shape.index:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        values = [_copy_value(value) for value in self.values]
+        return PG_InstanceSymbols(self.shape, values, self.methods)
+
+
+class PG_ClassSymbols(dict):
+    """
+    The symbol table of a class definition; files every symbol bound in it
+    in the class's attribute, or method, table as well.
+    """
+
+    __slots__ = ("class_def",)
+
+    def __init__(self, class_def):
+        super().__init__()
+        self.class_def = class_def
+
+    def __setitem__(self, name, value):
+        dict.__setitem__(self, name, value)
+        self.class_def._bind(name, value)
+
+
+class PG_MembersView(Mapping):
+    """
+    A read-only view of a class's, or an instance's, attributes or methods;
+    what 'attrs' and 'methods' return. It is live: it shows the members as
+    they are when it is read, not when it was made.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, name):
+        return self._table[name]
+
+    def __iter__(self):
+        return iter(self._table)
+
+    def __len__(self):
+        return len(self._table)
+
+    def __contains__(self, name):
+        return name in self._table
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class _InstanceAttrs(PG_MembersView):
+    """
+    The attributes of an instance; '_table' is its PG_InstanceSymbols, the
+    attributes are the names of its shape, in order
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        return self._table.values[self._table.shape.index[name]]
+
+    def __iter__(self):
+        return iter(self._table.shape.names)
+
+    def __len__(self):
+        return len(self._table.shape.names)
+
+    def __contains__(self, name):
+        return name in self._table.shape.index
+
+
+class _InstanceMethods(PG_MembersView):
+    """
+    The methods of an instance; '_table' is its PG_InstanceSymbols. An
+    attribute shadows its class's method of the same name.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, name):
+        if name in self._table.shape.index:
+            raise KeyError(name)
+        return self._table.methods[name]
+
+    def __iter__(self):
+        index = self._table.shape.index
+        return (name for name in self._table.methods if name not in index)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, name):
+        return name in self._table.methods and name not in self._table.shape.index
+
+
+def _is_func_dict(item):
+    """
+    Is 'item' a method table: param count -> PG_Function?
+    """
+    if type(item) is not dict or len(item) == 0:
+        return False
+    return type(next(iter(item.values()))) is PG_Function
+
+
+# Attribute values of these types are never copied into a new instance
+_IMMUTABLE = {int, float, str, bool, type(None)}
+
+
+def _copy_value(value):
+    if type(value) in _IMMUTABLE:
+        return value
+    if type(value) is PG_Class and not value.is_class_def:
+        return value.copy()
+    return deepcopy(value)
+
+
 class PG_Class(PG_Scope):
     def __init__(self, name: str, is_class_def=False):
         # Is this the "original" object? I.E. the class definition?
         self.is_class_def = is_class_def
         super().__init__(name=name)
-    
-    def _is_func_dict(self, item):
-        return (
-            type(item) is dict 
-            and type(list(item.keys())[0]) is int 
-            and type(list(item.values())[0]) is PG_Function
-        )
+
+        # (shape, attribute values, methods, values need copying) of the
+        # instances of a class definition; worked out on first instantiation
+        self.layout = None
+
+        # The symbols of the class, split into attributes, and methods: name ->
+        # {param count -> PG_Function}. Kept up to date by PG_ClassSymbols.
+        self._attrs = {}
+        self._methods = {}
+        self.symbols = PG_ClassSymbols(self)
+
+    def _bind(self, name: str, value):
+        """
+        Files symbol 'name', just bound to 'value', in the attribute or
+        method table
+        """
+        self.layout = None
+        if _is_func_dict(value):
+            self._methods[name] = value
+            self._attrs.pop(name, None)
+        else:
+            self._attrs[name] = value
+            self._methods.pop(name, None)
+
+    def add_method(self, method: PG_Function):
+        """
+        Adds 'method' to the class, replacing any method of the same name
+        and number of parameters
+        """
+        self.layout = None
+        name = method.name
+        methods = self._methods.get(name)
+        if methods is None:
+            methods = self._methods[name] = {}
+            dict.__setitem__(self.symbols, name, methods)
+            self._attrs.pop(name, None)
+        methods[len(method.params)] = method
+
+    def constructor(self, args_len: int):
+        """
+        Returns the constructor of the class that takes 'args_len'
+        arguments, or None if there isn't one
+        """
+        constructors = self._methods.get(self.name)
+        if constructors is None:
+            return None
+        return constructors.get(args_len)
 
     @property
     def attrs(self):
-        return { k:v for k,v in self.symbols.items() if not self._is_func_dict(v) }
-        
+        if type(self.symbols) is PG_InstanceSymbols:
+            return _InstanceAttrs(self.symbols)
+        return PG_MembersView(self._attrs)
+
     @property
     def methods(self):
-        return { k:v for k,v in self.symbols.items() if self._is_func_dict(v) }
+        if type(self.symbols) is PG_InstanceSymbols:
+            return _InstanceMethods(self.symbols)
+        return PG_MembersView(self._methods)
+
+    def _make_layout(self):
+        defaults = list(self._attrs.values())
+        copy_values = any(type(value) not in _IMMUTABLE for value in defaults)
+        return PG_Shape(tuple(self._attrs)), defaults, dict(self._methods), copy_values
+
+    def instantiate(self):
+        """
+        Creates a new instance of this class definition. The instance's
+        attributes start out with the values they have in the definition;
+        its methods are the definition's own.
+
+        Returns the new instance
+        """
+        if self.layout is None:
+            self.layout = self._make_layout()
+        shape, defaults, methods, copy_values = self.layout
+
+        if copy_values:
+            values = [_copy_value(value) for value in defaults]
+        else:
+            values = defaults.copy()
+        return self._new_instance(PG_InstanceSymbols(shape, values, methods))
+
+    def copy(self):
+        """
+        Returns a copy of this instance, with copies of its attribute values
+        """
+        return self._new_instance(self.symbols.copy())
+
+    def _new_instance(self, symbols):
+        instance = PG_Class.__new__(PG_Class)
+        instance.name = self.name
+        instance.is_class_def = False
+        instance.layout = None
+        instance.depth = 0
+        instance.symbols = symbols
+        instance.parent = None
+        instance.children = None
+        instance.binds_cached = False
+        return instance
 
     def __repr__(self):
         if self.is_class_def:
@@ -38,14 +38,19 @@ class PG_Type(Enum):
     ELSE = auto()
     WHILE = auto()
     RETURN = auto()
+    FROM = auto()
+    MEMO = auto()
     INVALID_TOKEN_TYPE = 0
     EOF = -1
 
 
 class PG_Token(AbstractToken):
-    def __init__(self, token_type=None, token_text=""):
-        super().__init__(token_type=token_type, token_text=token_text)
-        self.scope = "global"
+    __slots__ = ()
+
+    def __init__(self, token_type=None, token_text="", line=None, column=None):
+        super().__init__(
+            token_type=token_type, token_text=token_text, line=line, column=column
+        )
 
 
 if __name__ == "__main__":
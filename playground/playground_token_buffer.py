@@ -0,0 +1,86 @@
+from array import array
+
+from playground_token import PG_Type as PGT, PG_Token
+
+# Token types are stored in the buffer as small ints: their index in TYPE_TABLE
+TYPE_TABLE = tuple(PGT)
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TYPE_TABLE)}
+STRING_CODE = TYPE_CODES[PGT.STRING]
+EOF_CODE = TYPE_CODES[PGT.EOF]
+
+
+class PG_TokenBuffer:
+    """
+    A whole token stream, stored column wise in parallel arrays over the
+    source string:
+
+        types[i]    Token type of token i, as a code into TYPE_TABLE
+        starts[i]   Offset of token i in the source string
+        lengths[i]  Length of token i in the source string
+        lines[i]    Source line (1 based) token i starts on
+
+    and line_starts[j], the offset in the source of line first_line + j,
+    for every line the tokens are on, so a token's column is one
+    subtraction away.
+
+    No PG_Token objects are kept. Token text is sliced out of the source
+    only when token(i) or text(i) is called, e.g. when the parser builds an
+    AST node for the token.
+
+    Filled in by PlaygroundLexer.tokenize_all()
+    """
+
+    type_table = TYPE_TABLE
+
+    def __init__(self, source: str, first_line: int = 1, line_start: int = 0):
+        self.source = source
+        self.types = array("b")
+        self.starts = array("i")
+        self.lengths = array("i")
+        self.lines = array("i")
+        self.first_line = first_line
+        self.line_starts = array("i", (line_start,))
+
+    def __len__(self):
+        return len(self.types)
+
+    def append(self, token_type: PGT, start: int, length: int, line: int):
+        self.types.append(TYPE_CODES[token_type])
+        self.starts.append(start)
+        self.lengths.append(length)
+        self.lines.append(line)
+
+    def type(self, i: int) -> PGT:
+        return TYPE_TABLE[self.types[i]]
+
+    def text(self, i: int) -> str:
+        code = self.types[i]
+        if code == EOF_CODE:
+            return "<EOF>"
+
+        start = self.starts[i]
+        text = self.source[start : start + self.lengths[i]]
+        if code == STRING_CODE and '\\"' in text:
+            text = text.replace('\\"', '"')
+        return text
+
+    def column(self, i: int) -> int:
+        """
+        Column (1 based) token i starts at, worked out from its offset and
+        the offset of its line
+        """
+        start = self.starts[i]
+        if self.types[i] == STRING_CODE:
+            start -= 1  # The opening quote
+        return start - self.line_starts[self.lines[i] - self.first_line] + 1
+
+    def token(self, i: int) -> PG_Token:
+        """
+        Materializes token i as a PG_Token
+        """
+        return PG_Token(
+            TYPE_TABLE[self.types[i]], self.text(i), self.lines[i], self.column(i)
+        )
+
+    def __repr__(self):
+        return f"<PG_TokenBuffer: {len(self)} tokens over {len(self.source)} chars>"
@@ -0,0 +1,509 @@
+"""
+The bytecode backend's virtual machine: runs the PG_Code objects compiled by
+playground_bytecode.BytecodeCompiler.
+
+Every program, function body, method body, constructor body and class body
+runs in a PG_Frame of its own, with its own operand stack. Symbols still live
+in the interpreter's scopes (PG_Scope, PG_Class), which the VM pushes and
+pops just as the tree-walker does, so both backends behave the same.
+
+Calls of compiled functions and methods don't recurse in Python: the VM
+keeps its frames in a list, PlaygroundVM.frames, and a call pushes a frame
+there and carries on running the callee in the same loop. So Playground
+recursion is only as deep as memory allows. Constructors, class bodies and
+imports still run in a loop of their own, through PlaygroundVM.run().
+
+A returned call may reuse the caller's frame instead; see TAIL_CALL.
+"""
+from playground_ast import PG_AST
+from playground_scope import PG_FunctionScope, PG_Function, PG_Class
+from playground_inline_cache import MISS
+from playground_bytecode import (
+    PG_Code,
+    PG_FunctionCode,
+    LOAD_CONST,
+    LOAD_NAME,
+    STORE_NAME,
+    LOAD_LOCAL,
+    STORE_LOCAL,
+    STORE_DOTTED,
+    POP,
+    BINARY_ADD,
+    BINARY_SUB,
+    BINARY_MUL,
+    BINARY_DIV,
+    BINARY_MOD,
+    COMPARE_EQ,
+    COMPARE_LT,
+    COMPARE_LE,
+    COMPARE_GT,
+    COMPARE_GE,
+    AND_JUMP,
+    OR_JUMP,
+    EQ_TRUE,
+    JUMP,
+    POP_JUMP_IF_FALSE,
+    PUSH_SCOPE,
+    PUSH_INSTANCE_SCOPE,
+    POP_SCOPE,
+    CLEAR_SCOPE,
+    CALL,
+    CALL_METHOD,
+    TAIL_CALL,
+    LOAD_FIELD,
+    LOAD_MEMBERS,
+    MAKE_FUNCTION,
+    MAKE_METHOD,
+    STORE_CLASS_ATTR,
+    CLASS_DEF,
+    PRINT_ITEM,
+    PRINT_NEWLINE,
+    IMPORT,
+    EXEC_NODE,
+    RETURN_VALUE,
+    RETURN_EARLY,
+)
+
+_dict_setitem = dict.__setitem__
+
+
+class PG_Frame:
+    """
+    The state of one running code object
+    """
+
+    __slots__ = ("code", "pc", "stack", "new_class", "locals", "memo", "memo_key")
+
+    def __init__(
+        self, code: PG_Code, new_class: PG_Class = None, locals: PG_FunctionScope = None
+    ):
+        self.code = code
+        self.pc = 0  # Offset of the next instruction in code.ops
+        self.stack = []
+        self.new_class = new_class  # The class a class body frame is defining
+        self.locals = locals  # The scope a function call frame's arguments are bound in
+
+        # The memo table of the memoized function the frame is running, and
+        # the key the value it returns is stored under
+        self.memo = None
+        self.memo_key = None
+
+    def __repr__(self):
+        return f"<PG_Frame: {self.code.name} at {self.pc}>"
+
+
+class PG_CompiledBody:
+    """
+    The body of a function the VM defined; kept as PG_Function.body.
+
+    Calling it runs the body in a new frame, which is what
+    PlaygroundInterpreter._run_function() does when constructors are called.
+    """
+
+    __slots__ = ("vm", "code")
+
+    def __init__(self, vm, code: PG_Code):
+        self.vm = vm
+        self.code = code
+
+    def __call__(self):
+        return self.vm.run(self.code)
+
+    # A class definition held as an attribute value is deep copied into
+    # each new instance; the copies share compiled bodies, and the VM
+    def __deepcopy__(self, memo):
+        return self
+
+
+class PlaygroundVM:
+    def __init__(self, interp):
+        self.interp = interp
+        self.frames = []  # The frames being run, innermost last
+
+        # How many returned calls reused their caller's frame
+        self.tail_calls = 0
+
+        # The PG_Function of each PG_FunctionCode, made the first time it is
+        # defined; see _make_function()
+        self.functions = {}
+
+    def run(
+        self, code: PG_Code, new_class: PG_Class = None, locals: PG_FunctionScope = None
+    ):
+        """
+        Runs 'code' in a new frame, in the current scope.
+
+        Returns the value the code returns
+        """
+        frames = self.frames
+        base = len(frames)
+        frames.append(PG_Frame(code, new_class, locals))
+        try:
+            return self._run_frames(base + 1)
+        finally:
+            del frames[base:]
+
+    def _run_frames(self, depth: int):
+        """
+        Runs the innermost frame, and the frames of the calls it makes, until
+        the frame at 'depth' in self.frames returns.
+
+        Returns the value it returns
+        """
+        interp = self.interp
+        cached_names = interp.cached_names
+        frames = self.frames
+        frame = frames[-1]
+
+        while True:
+            code = frame.code
+            ops = code.ops
+            consts = code.consts
+            names = code.names
+            global_caches = code.global_caches
+            params = code.params
+            local_scope = frame.locals
+            stack = frame.stack
+            push = stack.append
+            pop = stack.pop
+            pc = frame.pc
+
+            # Runs until a call or a return switches frames
+            while True:
+                op = ops[pc]
+                arg = ops[pc + 1]
+                pc += 2
+
+                if op == LOAD_LOCAL:
+                    push(local_scope.slots[arg])
+
+                elif op == LOAD_NAME:
+                    push(interp._load_name(global_caches[arg]))
+
+                elif op == LOAD_CONST:
+                    push(consts[arg])
+
+                elif op == STORE_NAME:
+                    name = names[arg]
+                    symbol_scope = interp.current_space.resolve_scope(name)
+                    if symbol_scope is None:
+                        symbol_scope = interp.current_space
+                    value = pop()
+                    symbol_scope.symbols[name] = value
+                    if name in cached_names:
+                        interp._bound(symbol_scope, name)
+
+                elif op == STORE_LOCAL:
+                    value = pop()
+                    local_scope.slots[arg] = value
+                    _dict_setitem(local_scope.symbols, params[arg], value)
+                    if params[arg] in cached_names:
+                        interp._bound(local_scope, params[arg])
+
+                elif op == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        pc = arg
+
+                elif op == JUMP:
+                    pc = arg
+
+                elif op == BINARY_ADD:
+                    b = pop()
+                    stack[-1] = stack[-1] + b
+                elif op == BINARY_SUB:
+                    b = pop()
+                    stack[-1] = stack[-1] - b
+                elif op == BINARY_MUL:
+                    b = pop()
+                    stack[-1] = stack[-1] * b
+                elif op == BINARY_DIV:
+                    b = pop()
+                    stack[-1] = stack[-1] / b
+                elif op == BINARY_MOD:
+                    b = pop()
+                    stack[-1] = stack[-1] % b
+
+                elif op == COMPARE_LT:
+                    b = pop()
+                    stack[-1] = stack[-1] < b
+                elif op == COMPARE_GT:
+                    b = pop()
+                    stack[-1] = stack[-1] > b
+                elif op == COMPARE_EQ:
+                    b = pop()
+                    stack[-1] = stack[-1] == b
+                elif op == COMPARE_LE:
+                    b = pop()
+                    stack[-1] = stack[-1] <= b
+                elif op == COMPARE_GE:
+                    b = pop()
+                    stack[-1] = stack[-1] >= b
+
+                elif op == PUSH_SCOPE:
+                    interp._push_scope()
+
+                elif op == POP_SCOPE:
+                    interp._pop_scope()
+
+                elif op == CLEAR_SCOPE:
+                    interp._clear_scope()
+
+                elif op == CALL:
+                    t = consts[arg]
+                    args_list = self._pop_args(stack, t)
+                    frame.pc = pc
+                    func = interp._call_target(t, len(args_list))
+                    if type(func) is not PG_Function or type(func.body) is not PG_CompiledBody:
+                        push(interp._invoke(func, args_list))
+                    else:
+                        callee = self._enter(func, args_list)
+                        if callee is not None:
+                            frame = callee
+                            break
+
+                elif op == CALL_METHOD:
+                    t, cache = consts[arg]
+                    args_list = self._pop_args(stack, t)
+                    frame.pc = pc
+                    method = cache.find_method(interp.current_space, len(args_list))
+                    if method is None:
+                        method = interp._call_target(t, len(args_list))
+                    if type(method) is not PG_Function:
+                        push(interp._invoke(method, args_list))
+                    elif type(method.body) is not PG_CompiledBody:
+                        push(interp._call_function(method, args_list))
+                    else:
+                        callee = self._enter(method, args_list)
+                        if callee is not None:
+                            frame = callee
+                            break
+
+                elif op == TAIL_CALL:
+                    t, scopes = consts[arg]
+                    args_list = self._pop_args(stack, t)
+                    frame.pc = pc
+                    func = interp._call_target(t, len(args_list))
+                    if type(func) is not PG_Function or type(func.body) is not PG_CompiledBody:
+                        push(interp._invoke(func, args_list))
+                    elif self._can_reuse(frame, func):
+                        self._reuse(frame, func, args_list, scopes)
+                        break
+                    else:
+                        callee = self._enter(func, args_list)
+                        if callee is not None:
+                            frame = callee
+                            break
+
+                elif op == POP:
+                    pop()
+
+                elif op == AND_JUMP:
+                    if stack[-1] == False:
+                        stack[-1] = False
+                        pc = arg
+                    else:
+                        pop()
+
+                elif op == OR_JUMP:
+                    if stack[-1] == True:
+                        stack[-1] = True
+                        pc = arg
+                    else:
+                        pop()
+
+                elif op == EQ_TRUE:
+                    stack[-1] = stack[-1] == True
+
+                elif op == PUSH_INSTANCE_SCOPE:
+                    interp._push_instance(pop())
+
+                elif op == LOAD_FIELD:
+                    dot, field, cache = consts[arg]
+                    instance = pop()
+                    value = cache.load_field(instance)
+                    if value is MISS:
+                        value = interp._exec_reporting(
+                            dot, lambda: self._load_field(instance, field)
+                        )
+                    push(value)
+
+                elif op == LOAD_MEMBERS:
+                    stack[-1] = getattr(stack[-1], names[arg])
+
+                elif op == PRINT_ITEM:
+                    print(pop(), end="")
+
+                elif op == PRINT_NEWLINE:
+                    print()
+
+                elif op == STORE_DOTTED:
+                    t = consts[arg]
+                    value = pop()
+                    interp._exec_reporting(t, lambda: interp._store(t.children[0], value))
+
+                elif op == MAKE_FUNCTION:
+                    interp._define_function(self._make_function(consts[arg]))
+
+                elif op == MAKE_METHOD:
+                    frame.new_class.add_method(self._make_function(consts[arg]))
+
+                elif op == STORE_CLASS_ATTR:
+                    frame.new_class.symbols[names[arg]] = pop()
+
+                elif op == CLASS_DEF:
+                    class_body = consts[arg]
+                    new_class = PG_Class(name=class_body.name, is_class_def=True)
+                    frame.pc = pc
+                    self.run(class_body, new_class=new_class)
+                    # Place class object into current scope/symbol table
+                    interp.current_space.symbols[class_body.name] = new_class
+                    interp._bound(interp.current_space, class_body.name)
+
+                elif op == IMPORT:
+                    frame.pc = pc
+                    interp._import(consts[arg])
+
+                elif op == EXEC_NODE:
+                    push(interp._exec(consts[arg]))
+
+                elif op == RETURN_VALUE:
+                    value = pop()
+                    if len(frames) == depth:
+                        return value
+                    frame = self._leave(value)
+                    break
+
+                elif op == RETURN_EARLY:
+                    for _ in range(arg):
+                        interp._pop_scope()
+                    value = pop()
+                    if len(frames) == depth:
+                        return value
+                    frame = self._leave(value)
+                    break
+
+                else:
+                    raise RuntimeError(f"Bad opcode {op} at {pc - 2} in {code.name}")
+
+    def _pop_args(self, stack: list, t: PG_AST) -> list:
+        """
+        Pops the arguments of call node 't' off 'stack'
+        """
+        args_len = len(t.children[0].children) if len(t.children) > 0 else 0
+        if args_len == 0:
+            return []
+        args_list = stack[-args_len:]
+        del stack[-args_len:]
+        return args_list
+
+    def _enter(self, func: PG_Function, args_list: list) -> PG_Frame:
+        """
+        Starts a call of compiled function 'func': binds its arguments in a
+        new function scope, and pushes a frame for its body.
+
+        Returns the new frame; or None if 'func' is memoized and the call
+        is in its memo table, whose value is pushed on the caller's stack
+        """
+        memo = func.memo
+        if memo is not None:
+            key = memo.key(args_list)
+            value = memo.get(key)
+            if value is not MISS:
+                self.frames[-1].stack.append(value)
+                return None
+
+        function_scope = self.interp._function_scope(func, args_list)
+        self.interp._push_scope(scope_to_use=function_scope)
+        frame = PG_Frame(func.body.code, locals=function_scope)
+        if memo is not None:
+            frame.memo = memo
+            frame.memo_key = key
+        self.frames.append(frame)
+        return frame
+
+    def _leave(self, value) -> PG_Frame:
+        """
+        Ends the call the innermost frame is running, which returned 'value';
+        its caller's frame gets the value on its stack.
+
+        Returns the caller's frame
+        """
+        self.interp._pop_scope()
+        frames = self.frames
+        frame = frames.pop()
+        if frame.memo is not None:
+            frame.memo.store(frame.memo_key, value)
+        caller = frames[-1]
+        caller.stack.append(value)
+        return caller
+
+    def _can_reuse(self, frame: PG_Frame, func: PG_Function) -> bool:
+        """
+        Whether the call of 'func' returned by 'frame' may run in 'frame'
+        instead of a new one: 'frame' is running a call whose function
+        scope it pushed itself, and 'func' has every parameter the caller
+        has, so none of the caller's bindings could be seen from it. Calls
+        of, and from, memoized functions keep frames of their own, which
+        store the value they return.
+        """
+        if frame.locals is None or frame.memo is not None or func.memo is not None:
+            return False
+        code = func.body.code
+        if code is frame.code:
+            return True
+        return all(param in func.params for param in frame.code.params)
+
+    def _reuse(self, frame: PG_Frame, func: PG_Function, args_list: list, scopes: int):
+        """
+        Runs the call of 'func' in 'frame', in place of the call it was
+        running: pops the caller's 'scopes' block scopes and its function
+        scope, and binds the arguments in a new one.
+        """
+        interp = self.interp
+        for _ in range(scopes + 1):
+            interp._pop_scope()
+        function_scope = interp._function_scope(func, args_list)
+        interp._push_scope(scope_to_use=function_scope)
+        frame.code = func.body.code
+        frame.pc = 0
+        frame.locals = function_scope
+        frame.stack.clear()
+        self.tail_calls += 1
+
+    def _make_function(self, function_code: PG_FunctionCode) -> PG_Function:
+        """
+        Returns the PG_Function MAKE_FUNCTION or MAKE_METHOD binds for
+        'function_code'; the same one every time, but for memoized functions,
+        each definition of which has a memo table of its own.
+        """
+        function = self.functions.get(function_code)
+        if function is None:
+            function = self.functions[function_code] = PG_Function(
+                name=function_code.name,
+                params=function_code.params,
+                code=function_code.code,
+                body=PG_CompiledBody(self, function_code.body),
+            )
+        if function_code.memo:
+            return PG_Function(
+                name=function.name,
+                params=function.params,
+                code=function.code,
+                body=function.body,
+                memo=self.interp._memo_table(function.name, function.params),
+            )
+        return function
+
+    def _load_field(self, instance, field: PG_AST):
+        """
+        See PlaygroundInterpreter._dotted_expr(); a field of 'instance', or
+        of 'this' if 'instance' is None
+        """
+        interp = self.interp
+        interp._push_instance(instance)
+        if instance != None:
+            result = interp.current_space.resolve(field.token.text)
+        else:
+            result = interp._load(field, this=True)
+        interp._pop_scope()
+        return result
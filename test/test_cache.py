@@ -0,0 +1,97 @@
+import sys
+import os
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+import playground_cache
+from playground_interpreter import PlaygroundInterpreter
+
+MODULE = """
+def add(a, b){
+    return a + b;
+}
+print("Adding 5 and 10 via a func: ", add(5, 10));
+"""
+
+
+def write_module(tmp_path, text=MODULE):
+    module = tmp_path / "module.plgd"
+    module.write_text(text)
+    return str(module)
+
+
+def run_file(capfd, file_path, use_cache=True):
+    pgp = PlaygroundInterpreter(use_cache=use_cache)
+    pgp.interp_file(file_path)
+    out, err = capfd.readouterr()
+    return out.strip()
+
+
+def test_cache_off_by_default(capfd, tmp_path):
+    module = write_module(tmp_path)
+    pgp = PlaygroundInterpreter()
+    pgp.interp_file(module)
+    capfd.readouterr()
+    assert not (tmp_path / playground_cache.CACHE_DIR_NAME).exists()
+
+
+def test_cache_written_and_used(capfd, tmp_path):
+    module = write_module(tmp_path)
+    assert playground_cache.load(module) is None
+
+    assert run_file(capfd, module) == "Adding 5 and 10 via a func: 15"
+    assert os.path.exists(playground_cache.cache_path(module))
+    assert playground_cache.load(module) is not None
+
+    # Second run comes from the cache
+    assert run_file(capfd, module) == "Adding 5 and 10 via a func: 15"
+
+
+def test_cache_disabled(capfd, tmp_path):
+    module = write_module(tmp_path)
+    run_file(capfd, module, use_cache=False)
+    assert not os.path.exists(playground_cache.cache_path(module))
+
+
+def test_cache_stale_after_edit(capfd, tmp_path):
+    module = write_module(tmp_path)
+    run_file(capfd, module)
+
+    write_module(tmp_path, MODULE.replace("add(5, 10)", "add(50, 100)"))
+    assert playground_cache.load(module) is None
+    assert run_file(capfd, module) == "Adding 5 and 10 via a func: 150"
+
+
+def test_cache_fresh_after_touch(capfd, tmp_path):
+    module = write_module(tmp_path)
+    run_file(capfd, module)
+
+    stat = os.stat(module)
+    os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert playground_cache.load(module) is not None
+    assert playground_cache.info(module)[0]["fresh"]
+
+
+def test_cache_ignores_other_versions(capfd, tmp_path, monkeypatch):
+    module = write_module(tmp_path)
+    run_file(capfd, module)
+    monkeypatch.setattr(playground_cache, "CACHE_VERSION", -1)
+    assert playground_cache.load(module) is None
+
+
+def test_cache_info_and_clear(capfd, tmp_path):
+    module = write_module(tmp_path)
+    run_file(capfd, module)
+
+    entries = playground_cache.info(str(tmp_path))
+    assert len(entries) == 1
+    assert entries[0]["source_path"] == os.path.abspath(module)
+    assert entries[0]["fresh"]
+
+    # Only the entry itself is left behind; no temporary files
+    cache_dir = os.path.dirname(playground_cache.cache_path(module))
+    assert os.listdir(cache_dir) == [os.path.basename(playground_cache.cache_path(module))]
+
+    assert playground_cache.clear(str(tmp_path)) == 1
+    assert playground_cache.info(str(tmp_path)) == []
+    assert playground_cache.load(module) is None
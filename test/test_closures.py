@@ -0,0 +1,62 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+import pytest
+from playground_parser import PlaygroundParser
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from test_interpreter import run_backends
+
+
+def parse(input_str):
+    pgp = PlaygroundParser(input_str=input_str)
+    pgp.testing = True
+    return pgp.program()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        PlaygroundInterpreter(backend="no_such_backend")
+
+
+def test_compiled_once(capfd):
+    PI = PlaygroundInterpreter(backend="closure")
+    program = PI.closure_compiler.compile_program(
+        parse("while (a < 4) { print(a); a = a + 1; }")
+    )
+    PI.globals.symbols["a"] = 1
+    program()
+    PI.globals.symbols["a"] = 2
+    program()
+    out, err = capfd.readouterr()
+    assert out.split() == ["1", "2", "3", "2", "3"]
+
+
+def test_function_bodies_compiled(capfd):
+    PI = PlaygroundInterpreter(backend="closure")
+    PI.interp("def add(a, b){ return a + b; } print(add(1, 2));")
+    out, err = capfd.readouterr()
+    assert out.strip() == "3"
+    assert PI.globals.symbols["add"][2].body is not None
+
+
+def test_same_values(capfd):
+    # Blocks are valued None, function bodies by their last statement
+    in_str = """
+    def last(){ 1; 2; }
+    def last_is_if(){ 1; if (True) { 2; } }
+    def ret_then_more(){ return 1; 5 + 5; }
+    print(last(), last_is_if(), ret_then_more(), 3 / 2, 7 % 4, 1 == 1.0);
+    print(True and 0, 0 or 1, 2 or False, "s" == "s");
+    """
+    tree_out, closure_out, vm_out = run_backends(capfd, in_str)
+    assert tree_out == closure_out == vm_out
+    assert tree_out.split("\n")[0] == "2None11.53True"
+
+
+def test_same_errors_reported(capfd):
+    # 'this' outside of a class is reported, and the program carries on
+    tree_out, closure_out, vm_out = run_backends(capfd, "print(this.a); this.b = 1; print(1);")
+    assert tree_out == closure_out == vm_out
+    assert "Problem executing" in tree_out
+    assert tree_out.strip().endswith("1")
@@ -0,0 +1,208 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from test_interpreter import run_backends
+from playground_inline_cache import PG_InlineCache
+
+POINT = """
+Class Point {
+    x; y;
+    def Point(x, y){ this.x = x; this.y = y; }
+    def norm(){ return x * x + y * y; }
+}
+"""
+
+
+def test_monomorphic_sites(capfd):
+    in_str = POINT + """
+    p = Point(3, 4);
+    i = 0; total = 0;
+    while (i < 10) { total = total + p.x + p.norm(); i = i + 1; }
+    print(total);
+    """
+    for out, stats in run_backends(capfd, in_str, PlaygroundInterpreter.inline_cache_stats):
+        assert out == "280\n"
+        assert stats == {"sites": 2, "hits": 18, "misses": 2, "megamorphic": 0}
+
+
+def test_polymorphic_and_megamorphic_sites(capfd):
+    classes = "".join(
+        f"Class {name} {{ v = {n}; def get(){{ return v; }} }}\n"
+        for n, name in enumerate(["A", "B", "C", "D", "E", "F"])
+    )
+    in_str = classes + """
+    def sum(o){ return o.v + o.get(); }
+    print(sum(A()), sum(B()), sum(A()), sum(B()));
+    print(sum(C()), sum(D()), sum(E()), sum(F()), sum(F()));
+    """
+    for out, stats in run_backends(capfd, in_str, PlaygroundInterpreter.inline_cache_stats):
+        assert out == "0202\n4681010\n"
+        assert stats["sites"] == 2
+        assert stats["megamorphic"] == 2
+        # A and B hit at both sites the second time; F isn't remembered,
+        # the sites are full by then
+        assert stats["hits"] == 2 * 2
+
+
+def test_uncached_lookups(capfd):
+    in_str = POINT + """
+    Class Shadow { norm = 1; def Shadow(){ } }
+    def helper(){ return 7; }
+    p = Point(1, 2);
+    s = Shadow();
+    print(p.helper(), p.helper(), s.norm, p.attrs);
+    """
+    for out, stats in run_backends(capfd, in_str, PlaygroundInterpreter.inline_cache_stats):
+        assert out == "771{'x': 1, 'y': 2}\n"
+        assert stats["hits"] == 0
+
+
+def test_cache_entries():
+    cache = PG_InlineCache("x")
+    PI = PlaygroundInterpreter()
+    PI.interp(input_str=POINT + "p = Point(1, 2); q = Point(3, 4);")
+    p = PI.globals.symbols["p"]
+    q = PI.globals.symbols["q"]
+    assert cache.load_field(p) == 1
+    assert cache.load_field(q) == 3
+    assert cache.entries == {p.symbols.shape: 0}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def run_call_caches(capfd, in_str):
+    results = []
+    for backend in BACKENDS:
+        PI = PlaygroundInterpreter(backend=backend)
+        PI.interp(input_str=in_str)
+        out, err = capfd.readouterr()
+        results.append((out, PI.call_cache_stats()))
+    return results
+
+
+def test_call_caches_hit_in_loops(capfd):
+    in_str = """
+    def sq(x){ return x * x; }
+    def sq(x, y){ return x * y; }
+    i = 0; t = 0;
+    while (i < 10) { t = t + sq(i) + sq(i, 2); i = i + 1; }
+    print(t, str(t));
+    """
+    for out, stats in run_call_caches(capfd, in_str):
+        assert out == "375375\n"
+        # Binding names no call site calls never invalidates the caches
+        assert stats == {"sites": 3, "hits": 18, "misses": 3, "binding_version": 0}
+
+
+def test_call_caches_follow_bindings(capfd):
+    in_str = """
+    def f(){ return 1; }
+    def g(){ return f(); }
+    def h(){ def f(){ return 2; } return g(); }
+    def k(f){ return f(); }
+    def two(){ return 22; }
+    i = 0;
+    while (i < 4) {
+        print(g(), h(), g(), k(two), g());
+        if (i == 1) { def f(){ return 3; } }
+        if (i == 2) { f = two; }
+        i = i + 1;
+    }
+    """
+    for out, stats in run_call_caches(capfd, in_str):
+        assert out == "121221\n121221\n121221\n222222222\n"
+        assert stats["hits"] > 0
+
+
+def test_call_caches_interior_constructor_calls(capfd):
+    in_str = """
+    Class Node {
+        v = 0; d = 0; nxt;
+        def Node(v){ }
+        def grow(n){ if (n > 0) { this.d = n; this.nxt = Node(v + 1); nxt.grow(n - 1); } }
+        def total(){ if (d == 0) { return v; } return v + nxt.total(); }
+    }
+    def Twice(a){ return Node(a * 2); }
+    i = 0; t = 0;
+    while (i < 5) {
+        n = Twice(i);
+        n.grow(3);
+        t = t + n.total();
+        i = i + 1;
+    }
+    print(t);
+    """
+    for out, stats in run_call_caches(capfd, in_str):
+        assert out == "110\n"
+        assert stats["hits"] > 0
+
+
+def test_global_caches(capfd):
+    in_str = """
+    N = 3; K = 2;
+    def f(n){ if (n == 0) { return K; } return f(n - 1) + N; }
+    i = 0; t = 0;
+    while (i < 4) { t = t + f(2); i = i + 1; }
+    print(t);
+    """
+    for backend in BACKENDS:
+        PI = PlaygroundInterpreter(backend=backend)
+        PI.interp(input_str=in_str)
+        out, err = capfd.readouterr()
+        assert out == "32\n"
+        stats = PI.global_cache_stats()
+        # Rebinding globals leaves the caches valid
+        assert (stats["hits"], stats["misses"]) == (10, 2)
+        # K is read three calls deep, and N one and two: 9 scopes in all
+        # the hits skipped
+        assert stats["depth_avoided"] == 9 / 10
+
+
+def test_global_caches_depth_avoided(capfd):
+    # N is read three calls deep: a hit skips the scopes of g and h
+    in_str = """
+    N = 3;
+    def f(){ return N; }
+    def g(){ return f() + 0; }
+    def h(){ return g() + 0; }
+    i = 0; t = 0;
+    while (i < 4) { t = t + h(); i = i + 1; }
+    print(t);
+    """
+    for out, stats in run_backends(capfd, in_str, PlaygroundInterpreter.global_cache_stats):
+        assert out == "12\n"
+        assert stats["hits"] > 0
+        assert stats["depth_avoided"] == 2
+
+
+def test_global_caches_follow_shadowing(capfd):
+    in_str = """
+    x = 1; scale = 10;
+    def rd(){ return x * scale; }
+    def deep(n){ if (n == 0) { return rd(); } return deep(n - 1); }
+    def px(x){ return rd(); }
+    def bx(){ if (True) { def rd(){ return 0 - 1; } return deep(2); } }
+    Class Holder {
+        x = 7; scale;
+        def Holder(scale){ }
+        def get(){ return rd(); }
+    }
+    h = Holder(3);
+    i = 0;
+    while (i < 3) {
+        print(rd(), deep(3), px(5), bx(), h.get(), deep(4));
+        x = x + 1;
+        i = i + 1;
+    }
+    def late(){ return y; }
+    y = 5;
+    def sety(){ y = 9; return late(); }
+    print(late(), sety(), late());
+    """
+    for backend in BACKENDS:
+        PI = PlaygroundInterpreter(backend=backend)
+        PI.interp(input_str=in_str)
+        out, err = capfd.readouterr()
+        assert out == "101050-12110\n202050-12120\n303050-12130\n599\n"
+        assert PI.global_cache_stats()["hits"] > 0
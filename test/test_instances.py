@@ -0,0 +1,175 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+import pytest
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from playground_scope import PG_Class, PG_Function, PG_FunctionScope, PG_InstanceScope
+
+POINT = """
+Class Point {
+    x; y;
+    label = "point";
+    def Point(x, y){ this.x = x; this.y = y; }
+    def Point(x, y, z){ this.x = x + y + z; }
+    def sum(){ return x + y; }
+}
+"""
+
+
+def run(in_str, backend="tree"):
+    PI = PlaygroundInterpreter(backend=backend)
+    PI.interp(input_str=in_str)
+    return PI
+
+
+def test_instances_share_shape_and_methods():
+    PI = run(POINT + "a = Point(1, 2); b = Point(3, 4);")
+    a = PI.globals.symbols["a"]
+    b = PI.globals.symbols["b"]
+    point = PI.globals.symbols["Point"]
+    assert a.symbols.shape is b.symbols.shape
+    assert a.symbols.shape.names == ("x", "y", "label")
+    assert a.symbols.values == [1, 2, "point"]
+    assert b.symbols.values == [3, 4, "point"]
+    assert a.symbols["sum"] is point.symbols["sum"]
+    assert not a.is_class_def and a.name == "Point"
+
+
+def test_binding_new_names_moves_to_shared_shape():
+    PI = run(POINT + "a = Point(1, 2, 3); b = Point(4, 5, 6); c = Point(0, 0);")
+    a = PI.globals.symbols["a"]
+    b = PI.globals.symbols["b"]
+    c = PI.globals.symbols["c"]
+    # The constructor binds 'z' in the instance, as it did before shapes
+    assert a.attrs == {"x": 6, "y": 2, "label": "point", "z": 3}
+    assert a.symbols.shape is b.symbols.shape
+    assert c.symbols.shape.names == ("x", "y", "label")
+    assert c.symbols.shape.adding("z") is a.symbols.shape
+
+
+def test_attribute_values_are_copied(capfd):
+    in_str = """
+    Class Inner { v = 1; }
+    Class Outer {
+        inner = Inner();
+        def bump(){ inner.v = inner.v + 1; }
+    }
+    a = Outer(); b = Outer();
+    a.bump();
+    i = a.inner; j = b.inner;
+    print(i.v, j.v);
+    """
+    for backend in BACKENDS:
+        run(in_str, backend)
+        out, err = capfd.readouterr()
+        assert out == "21\n"
+
+
+def test_changed_class_definition(capfd):
+    in_str = POINT + """
+    a = Point(1, 2);
+    Point.label = "changed";
+    b = Point(1, 2);
+    print(a.label, b.label);
+    """
+    for backend in BACKENDS:
+        run(in_str, backend)
+        out, err = capfd.readouterr()
+        assert out == "pointchanged\n"
+
+
+def test_member_tables():
+    PI = run(POINT)
+    point = PI.globals.symbols["Point"]
+    assert dict(point.attrs) == {"x": None, "y": None, "label": "point"}
+    assert list(point.methods) == ["Point", "sum"]
+    assert point.constructor(2).params == ["x", "y"]
+    assert point.constructor(3).params == ["x", "y", "z"]
+    assert point.constructor(1) is None
+
+    # Binding a symbol files it in the right table, replacing a member of
+    # the other kind
+    point.symbols["sum"] = 5
+    assert point.attrs["sum"] == 5 and "sum" not in point.methods
+    point.add_method(PG_Function(name="label", params=[], code=None))
+    assert "label" in point.methods and "label" not in point.attrs
+
+
+def test_member_views():
+    PI = run(POINT + "p = Point(1, 2);")
+    point = PI.globals.symbols["Point"]
+    p = PI.globals.symbols["p"]
+    attrs = p.attrs
+    assert repr(attrs) == "{'x': 1, 'y': 2, 'label': 'point'}"
+    assert list(p.methods) == ["Point", "sum"]
+    with pytest.raises(TypeError):
+        attrs["x"] = 5
+
+    # Views are live
+    p.symbols["x"] = 10
+    assert attrs["x"] == 10
+    point.add_method(PG_Function(name="extra", params=[], code=None))
+    assert "extra" in point.methods
+    assert "extra" not in p.methods
+
+
+def test_no_constructor():
+    c = PG_Class(name="Empty", is_class_def=True)
+    assert c.constructor(0) is None
+    assert len(c.attrs) == 0 and len(c.methods) == 0
+
+
+def test_instances_never_pushed(capfd):
+    in_str = POINT + """
+    def outer(p){ q = Point(p.sum(), p.x); return q.sum(); }
+    a = Point(1, 2);
+    print(outer(a), a.sum(), a.label);
+    """
+    for backend in BACKENDS:
+        PI = run(in_str, backend)
+        out, err = capfd.readouterr()
+        assert out == "43point\n"
+        a = PI.globals.symbols["a"]
+        assert a.parent is None and a.depth == 0
+        assert PI.current_space is PI.globals
+
+
+def test_instance_scope_shares_symbols():
+    PI = run(POINT + "a = Point(1, 2);")
+    a = PI.globals.symbols["a"]
+    scope = PG_InstanceScope(a)
+    assert scope.symbols is a.symbols and scope.instance is a
+    scope.symbols["x"] = 7
+    assert a.attrs["x"] == 7
+    with pytest.raises(AttributeError):
+        scope.extra = 1
+    with pytest.raises(AttributeError):
+        PG_FunctionScope("f", ["a"], [1]).extra = 1
+
+
+def test_track_scopes(capfd):
+    in_str = POINT + """
+    def f(p){ return p.sum(); }
+    a = Point(1, 2);
+    print(f(a));
+    """
+    seen = []
+    PI = PlaygroundInterpreter(track_scopes=True)
+    push_scope = PI._push_scope
+
+    def watching_push_scope(*args, **kwargs):
+        push_scope(*args, **kwargs)
+        seen.append(list(PI.current_space.parent.children))
+
+    PI._push_scope = watching_push_scope
+    PI.interp(input_str=in_str)
+    out, err = capfd.readouterr()
+    assert out == "3\n"
+    # Each scope was the last child of the scope it was pushed on
+    assert len(seen) > 0 and all(len(children) == 1 for children in seen)
+    assert PI.globals.children == []
+
+    PI = run(in_str)
+    out, err = capfd.readouterr()
+    assert PI.globals.children is None
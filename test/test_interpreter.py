@@ -3,20 +3,40 @@ import sys
 sys.path.append("c:\\src\\lang-playground\\playground")
 
 import pytest
-from playground_interpreter import PlaygroundInterpreter
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+
+def run_backends(capfd, in_str, stats=None, ends_in_globals=False):
+    # Runs 'in_str' on every backend. Returns what each printed, in BACKENDS
+    # order; with 'stats', (printed, stats(interpreter)) for each. With
+    # 'ends_in_globals', each has to end back in the global scope, with no
+    # return pending
+    results = []
+    for backend in BACKENDS:
+        pgp = PlaygroundInterpreter(backend=backend)
+        pgp.interp(input_str=in_str)
+        out, err = capfd.readouterr()
+        if ends_in_globals:
+            assert pgp.current_space is pgp.globals, backend
+            assert pgp.returning == False, backend
+        results.append(out if stats is None else (out, stats(pgp)))
+    return results
 
 
 def run_stdout_test(capfd, in_str, ans_str):
     in_str = in_str.strip()
     ans_str = ans_str.strip()
-    pgp = PlaygroundInterpreter()
-    pgp.interp(input_str=in_str)
-    out, err = capfd.readouterr()
-    if '\n' not in ans_str:
-        assert out.strip() == ans_str.strip()
-    else:
-        for a,b in zip(out.split('\n'), ans_str.split('\n')):
-            assert a.strip() == b.strip()
+
+    # Every backend has to produce the same output
+    for backend in BACKENDS:
+        pgp = PlaygroundInterpreter(backend=backend)
+        pgp.interp(input_str=in_str)
+        out, err = capfd.readouterr()
+        if '\n' not in ans_str:
+            assert out.strip() == ans_str.strip(), backend
+        else:
+            for a,b in zip(out.split('\n'), ans_str.split('\n')):
+                assert a.strip() == b.strip(), backend
 
 # Test math operations
 def test_add_1(capfd):
@@ -343,4 +363,44 @@ def test_nested_class_2(capfd):
     <Instance of Class: Outer, attrs: {'a': 0, 'b': 1} >
     <Instance of Class: Inner, attrs: {'a': 7, 'b': 8, 'ai': 7, 'bi': 8} >
     """
-    run_stdout_test(capfd, in_str, ans_str)
\ No newline at end of file
+    run_stdout_test(capfd, in_str, ans_str)
+
+def test_interp_file(capfd, tmp_path):
+    module = tmp_path / "module.plgd"
+    module.write_text("""
+    def add(a, b){
+        return a + b;
+    }
+    print("Adding 5 and 10 via a func: ", add(5, 10));
+    """)
+    pgp = PlaygroundInterpreter()
+    pgp.interp_file(str(module))
+    out, err = capfd.readouterr()
+    assert out.strip() == "Adding 5 and 10 via a func: 15"
+
+
+def test_def_rerun_rebinds_same_function(capfd):
+    in_str = """
+    keep = 0; memo_keep = 0; cls = 0;
+    def mk(){
+        def g(a){ return a + 1; }
+        memo def h(a){ return a * 2; }
+        Class C { def C(){ } def m(){ return 1; } }
+        keep = g; memo_keep = h; cls = C;
+    }
+    mk(); first = keep; first_memo = memo_keep; first_cls = cls;
+    mk();
+    print(keep(1), memo_keep(2));
+    """
+    for backend in BACKENDS:
+        pgp = PlaygroundInterpreter(backend=backend)
+        pgp.interp(input_str=in_str)
+        out, err = capfd.readouterr()
+        assert out == "24\n", backend
+        resolve = pgp.globals.resolve
+        # Functions and methods are made once per def; a memoized function
+        # gets a new memo table, so a new function, each time it is defined
+        assert resolve("first")[1] is resolve("keep")[1]
+        assert resolve("first_memo")[1] is not resolve("memo_keep")[1]
+        assert resolve("first_cls") is not resolve("cls")
+        assert resolve("first_cls").methods["m"][0] is resolve("cls").methods["m"][0]
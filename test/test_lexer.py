@@ -0,0 +1,223 @@
+import sys
+from os import path
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+import io
+import mmap
+
+import pytest
+from playground_lexer import PlaygroundLexer, PlaygroundCharLexer, PlaygroundStreamLexer
+from playground_token import PG_Type as PGT
+
+
+def lex_all(lexer):
+    tokens = [lexer.next_token()]
+    while tokens[-1].type != PGT.EOF:
+        tokens.append(lexer.next_token())
+    return tokens
+
+
+def assert_same_stream(input_str):
+    new = [(t.type, t.text) for t in lex_all(PlaygroundLexer(input_str))]
+    old = [(t.type, t.text) for t in lex_all(PlaygroundCharLexer(input_str))]
+    assert new == old
+
+    tokens = PlaygroundLexer(input_str).tokenize_all()
+    buffered = [(tokens.type(i), tokens.text(i)) for i in range(len(tokens))]
+    assert buffered == old
+
+
+def test_same_stream_all_token_types():
+    assert_same_stream(
+        """
+        +-*/ = % ; , .
+        1 11 5.0 1.5.3
+        a ab a AB
+        print
+        () {}
+        True False and or
+        > < == <= >= ==>= =
+        if elif else while
+        "A test string: 10 9, ; .ouauht."
+        "..\\examples\\ex_module_Point.plgd"
+        def Class return import
+        underscored_name _underscored_name _underscored_name_
+        """
+    )
+
+
+def test_same_stream_program():
+    assert_same_stream(
+        """
+        # A comment on it's own line!
+        Class Point {
+            x; y;
+            def Point(x, y){
+                this.x = x; # A comment after a statement
+                this.y = y;
+            }
+            def to_str(){
+                return "<Point: (" + str(x) + ", " + str(y) +")>";
+            }
+        }
+        k = Point(10, 10);
+        while (k.x > 0) { k.x = k.x - 1; }
+        """
+    )
+
+
+def test_same_stream_examples():
+    for module in ["ex_module_Point.plgd", "ex_module_foo_class.plgd"]:
+        module_path = path.join(path.dirname(__file__), "..", "examples", module)
+        with open(module_path) as f:
+            assert_same_stream(f.read() + "\n")
+
+
+def test_line_numbers():
+    tokens = lex_all(PlaygroundLexer('a = 1;\n\n# comment\nb = "two\nlines";\nc;'))
+    lines = {t.text: t.line for t in tokens}
+    assert lines["a"] == 1
+    assert lines["b"] == 4
+    assert lines["c"] == 6
+
+
+def test_escaped_quote():
+    tokens = lex_all(PlaygroundLexer('print("say \\"hi\\"");'))
+    assert tokens[2].type == PGT.STRING
+    assert tokens[2].text == 'say "hi"'
+
+
+def test_backslashes_kept():
+    tokens = lex_all(PlaygroundLexer('import "..\\\\dir\\\\a.plgd";'))
+    assert tokens[1].text == "..\\\\dir\\\\a.plgd"
+
+
+def test_comment_at_eof():
+    tokens = lex_all(PlaygroundLexer("a; # no new line after me"))
+    assert [t.type for t in tokens] == [PGT.NAME, PGT.SEMI_COLON, PGT.EOF]
+
+
+def test_invalid_character():
+    with pytest.raises(Exception, match="Invalid character"):
+        lex_all(PlaygroundLexer("a = 5 $ 3;"))
+
+
+def test_unterminated_string():
+    with pytest.raises(Exception, match="Unterminated string"):
+        lex_all(PlaygroundLexer('a = "never closed;'))
+
+
+def test_float_needs_digit_after_dot():
+    with pytest.raises(Exception, match="floating point"):
+        lex_all(PlaygroundLexer("a = 5.;"))
+
+
+def test_tokenize_all_lines_and_padding():
+    input_str = 'a = "two\nlines";\nb;'
+    streamed = lex_all(PlaygroundLexer(input_str))
+    tokens = PlaygroundLexer(input_str).tokenize_all(eof_padding=3)
+    assert len(tokens) == len(streamed) + 2
+    assert [tokens.token(i).line for i in range(len(streamed))] == [
+        t.line for t in streamed
+    ]
+    assert [tokens.type(i) for i in range(len(streamed) - 1, len(tokens))] == [
+        PGT.EOF
+    ] * 3
+
+
+STREAM_INPUT = """
+# A comment that is longer than the smallest chunks
+Class Point {
+    x; y;
+    def Point(x, y){ this.x = x; this.y = y; }
+}
+a = 10 >= 5 == True;
+b = "a string with
+two lines, an escaped \\"quote\\" and some unicode: \u00e9\u00e8\u4e2d";
+c = 12.625 <= 100;
+last_name_without_new_line"""
+
+
+def token_info(tokens):
+    return [(t.type, t.text, t.line, t.column) for t in tokens]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 64 * 1024])
+def test_stream_matches_string(chunk_size):
+    expected = token_info(lex_all(PlaygroundLexer(STREAM_INPUT)))
+
+    text_source = io.StringIO(STREAM_INPUT)
+    streamed = lex_all(PlaygroundStreamLexer(text_source, chunk_size=chunk_size))
+    assert token_info(streamed) == expected
+
+    bytes_source = io.BytesIO(STREAM_INPUT.encode("utf-8"))
+    streamed = lex_all(PlaygroundStreamLexer(bytes_source, chunk_size=chunk_size))
+    assert token_info(streamed) == expected
+
+
+def test_stream_from_mmap(tmp_path):
+    module = tmp_path / "module.plgd"
+    module.write_bytes(STREAM_INPUT.encode("utf-8"))
+    expected = token_info(lex_all(PlaygroundLexer(STREAM_INPUT)))
+
+    with open(module, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            streamed = lex_all(PlaygroundStreamLexer(source, chunk_size=5))
+    assert token_info(streamed) == expected
+
+
+def test_stream_window_stays_small():
+    source = io.StringIO("a = 1;\n" * 10000)
+    lexer = PlaygroundStreamLexer(source, chunk_size=64)
+    longest = 0
+    while lexer.next_token().type != PGT.EOF:
+        longest = max(longest, len(lexer.input))
+    assert longest <= 64 + len("a = 1;\n")
+
+
+def test_stream_unterminated_string():
+    with pytest.raises(Exception, match="Unterminated string"):
+        lex_all(PlaygroundStreamLexer(io.StringIO('a = "never\nclosed;'), chunk_size=4))
+
+
+def test_stream_cannot_tokenize_all():
+    lexer = PlaygroundStreamLexer(io.StringIO("a = 1;"))
+    with pytest.raises(TypeError, match="whole source"):
+        lexer.tokenize_all()
+    assert lexer.next_token().text == "a"
+
+
+def test_columns():
+    input_str = 'a = 1;\n  bb = "x\ny" + c;\n\td'
+    tokens = lex_all(PlaygroundLexer(input_str))
+    columns = [(t.text, t.line, t.column) for t in tokens]
+    assert columns == [
+        ("a", 1, 1),
+        ("=", 1, 3),
+        ("1", 1, 5),
+        (";", 1, 6),
+        ("bb", 2, 3),
+        ("=", 2, 6),
+        ("x\ny", 2, 8),
+        ("+", 3, 4),
+        ("c", 3, 6),
+        (";", 3, 7),
+        ("d", 4, 2),
+        ("<EOF>", 4, 3),
+    ]
+
+    buffered = PlaygroundLexer(input_str).tokenize_all()
+    assert [
+        (buffered.text(i), buffered.lines[i], buffered.column(i))
+        for i in range(len(buffered))
+    ] == columns
+
+
+def test_tokenize_all_columns_after_streaming():
+    expected = token_info(lex_all(PlaygroundLexer(STREAM_INPUT)))
+    lexer = PlaygroundLexer(STREAM_INPUT)
+    streamed = [lexer.next_token() for _ in range(12)]
+    buffered = lexer.tokenize_all()
+    tokens = streamed + [buffered.token(i) for i in range(len(buffered))]
+    assert token_info(tokens) == expected
@@ -0,0 +1,114 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+import pytest
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from playground_parser import PlaygroundParser, ParsingError
+
+
+def run(capfd, in_str, backend="tree", **kwargs):
+    PI = PlaygroundInterpreter(backend=backend, **kwargs)
+    PI.interp(input_str=in_str)
+    out, err = capfd.readouterr()
+    assert PI.current_space is PI.globals
+    return PI, out
+
+
+FIB = """
+memo def fib(n){
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+"""
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_memo_fib(capfd, backend):
+    PI, out = run(capfd, FIB + "print(fib(80)); print(fib(80));", backend)
+    assert out == "23416728348467685\n23416728348467685\n"
+    assert PI.memo_stats() == {
+        "fib/1": {"hits": 79, "misses": 81, "evictions": 0, "size": 81}
+    }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_memo_overloads_cached_apart(capfd, backend):
+    in_str = """
+    memo def f(a){ print("one"); return a; }
+    memo def f(a, b){ print("two"); return a + b; }
+    def g(a, b, c){ return a + b + c; }
+    print(f(1), f(1), f(1, 2), f(1, 2), g(1, 2, 3));
+    """
+    PI, out = run(capfd, in_str, backend)
+    assert out == "one\n11two\n336\n"
+    stats = PI.memo_stats()
+    assert stats["f/1"]["hits"] == 1 and stats["f/1"]["size"] == 1
+    assert stats["f/2"]["hits"] == 1 and stats["f/2"]["size"] == 1
+    assert "g/3" not in stats
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_memo_lru_eviction(capfd, backend):
+    in_str = """
+    memo def sq(n){ print("run ", n); return n * n; }
+    sq(1); sq(2); sq(1); sq(3); sq(1); sq(2);
+    """
+    PI, out = run(capfd, in_str, backend, memo_size=2)
+    # 2 is evicted by 3, since 1 was used more recently
+    assert out == "run 1\nrun 2\nrun 3\nrun 2\n"
+    assert PI.memo_stats()["sq/1"] == {"hits": 2, "misses": 4, "evictions": 2, "size": 2}
+
+
+def test_memo_keys_typed(capfd):
+    in_str = """
+    memo def show(a){ return str(a); }
+    print(show(1), show(True), show(1.0), show(1));
+    """
+    PI, out = run(capfd, in_str)
+    assert out == "1True1.01\n"
+    assert PI.memo_stats()["show/1"]["size"] == 3
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_memo_unhashable_not_cached(capfd, backend):
+    in_str = """
+    def g(){ return 1; }
+    memo def f(a){ print("run"); return 2; }
+    f(g); f(g);
+    """
+    PI, out = run(capfd, in_str, backend)
+    assert out == "run\nrun\n"
+    assert PI.memo_stats()["f/1"] == {"hits": 0, "misses": 2, "evictions": 0, "size": 0}
+
+
+def test_memo_deep_recursion_vm(capfd):
+    PI, out = run(capfd, FIB + "print(fib(900) > 0);", "vm")
+    assert out == "True\n"
+
+
+def test_memo_def_parse():
+    pgp = PlaygroundParser(input_str="memo def f(a){ return a; }")
+    pgp.testing = True
+    func_def = pgp.program().children[0]
+    assert [child.token.text for child in func_def.children if child.token] == ["f", "memo"]
+
+    for input_str in ["memo f(a){ }", "Class A { memo def f(a){ } }"]:
+        pgp = PlaygroundParser(input_str=input_str)
+        pgp.testing = True
+        with pytest.raises(ParsingError):
+            pgp.program()
+
+
+def test_memo_def_in_method_body(capfd):
+    in_str = """
+    Class A {
+        def A(){ }
+        def run(n){ memo def sq(k){ return k * k; } return sq(n) + sq(n); }
+    }
+    a = A();
+    print(a.run(3));
+    """
+    PI, out = run(capfd, in_str)
+    assert out == "18\n"
+    assert PI.memo_stats()["sq/1"]["hits"] == 1
@@ -0,0 +1,237 @@
+import sys
+import os
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+import pytest
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+
+
+def write(directory, name, text):
+    module = directory / name
+    module.parent.mkdir(parents=True, exist_ok=True)
+    module.write_text(text)
+    return str(module)
+
+
+def run_file(capfd, file_path, backend="tree"):
+    pgp = PlaygroundInterpreter(use_cache=False, backend=backend)
+    pgp.interp_file(file_path)
+    out, err = capfd.readouterr()
+    return pgp, out
+
+
+def run_eager_and_lazy(capfd, file_path, backend):
+    """
+    Runs 'file_path' with eager, then lazy, imports; checks both print the
+    same and raise the same error, and returns what they printed and raised
+    """
+    results = []
+    for lazy_imports in (False, True):
+        pgp = PlaygroundInterpreter(use_cache=False, backend=backend, lazy_imports=lazy_imports)
+        error = None
+        try:
+            pgp.interp_file(file_path)
+        except Exception as e:
+            error = (type(e), str(e))
+        out, err = capfd.readouterr()
+        results.append((out, error))
+    assert results[0] == results[1]
+    return results[0]
+
+
+def test_diamond_runs_shared_module_once(capfd, tmp_path):
+    write(tmp_path, "shared.plgd", 'print("running shared"); def twice(a){ return a * 2; }')
+    write(tmp_path, "left.plgd", 'import "shared.plgd"; def left(){ return twice(1); }')
+    write(tmp_path, "right.plgd", 'import "shared.plgd"; def right(){ return twice(2); }')
+    main = write(
+        tmp_path, "main.plgd",
+        'import "left.plgd"; import "right.plgd"; print(left(), right(), twice(3));',
+    )
+    for backend in BACKENDS:
+        pgp, out = run_file(capfd, main, backend)
+        assert out == "running shared\n246\n"
+        stats = pgp.import_stats()
+        shared = [path for path in stats if path.endswith("shared.plgd")]
+        assert len(shared) == 1
+        assert stats[shared[0]]["imports"] == 2
+
+
+def test_paths_relative_to_importer(capfd, tmp_path):
+    write(tmp_path, "lib/util.plgd", 'import "../common/base.plgd"; def util(){ return base() + 1; }')
+    write(tmp_path, "common/base.plgd", "def base(){ return 41; }")
+    main = write(tmp_path, "app/main.plgd", 'import "..\\lib\\util.plgd"; print(util());')
+    pgp, out = run_file(capfd, main)
+    assert out == "42\n"
+
+
+def test_import_cycle(capfd, tmp_path):
+    write(tmp_path, "a.plgd", 'import "b.plgd"; def fa(){ 1; }')
+    write(tmp_path, "b.plgd", 'import "a.plgd"; def fb(){ 2; }')
+    main = write(tmp_path, "main.plgd", 'import "a.plgd";')
+    with pytest.raises(ImportError, match="a.plgd -> b.plgd -> a.plgd"):
+        run_file(capfd, main)
+
+    main = write(tmp_path, "self.plgd", 'import "self.plgd";')
+    with pytest.raises(ImportError, match="self.plgd -> self.plgd"):
+        run_file(capfd, main)
+
+
+def test_overloads_kept(capfd, tmp_path):
+    write(tmp_path, "lib.plgd", "def f(a){ return 1; }")
+    main = write(tmp_path, "main.plgd", 'def f(a, b){ return 2; } import "lib.plgd"; print(f(0), f(0, 0));')
+    pgp, out = run_file(capfd, main)
+    assert out == "12\n"
+
+
+def test_failed_module_not_registered(capfd, tmp_path):
+    pgp = PlaygroundInterpreter(use_cache=False)
+    lib = write(tmp_path, "lib.plgd", "x = y;")
+    main = write(tmp_path, "main.plgd", 'import "lib.plgd"; print(x);')
+    with pytest.raises(NameError):
+        pgp.interp_file(main)
+    assert pgp.modules.loading == []
+
+    write(tmp_path, "lib.plgd", "x = 5;")
+    pgp.interp_file(main)
+    out, err = capfd.readouterr()
+    assert out == "5\n"
+
+
+def test_from_import_binds_listed_names(capfd, tmp_path):
+    write(tmp_path, "lib.plgd", "a = 1; b = 2; def f(x){ return x + 1; }")
+    main = write(
+        tmp_path, "main.plgd",
+        'from "lib.plgd" import a, f; print(a, f(1)); print(b);',
+    )
+    with pytest.raises(NameError, match="Symbol b"):
+        run_file(capfd, main)
+    out, err = capfd.readouterr()
+    assert out == "12\n"
+
+
+def test_from_import_missing_name(capfd, tmp_path):
+    write(tmp_path, "lib.plgd", "a = 1;")
+    main = write(tmp_path, "main.plgd", 'from "lib.plgd" import a, c;')
+    with pytest.raises(ImportError, match="does not define c"):
+        run_file(capfd, main)
+
+
+def test_from_import_runs_module_once(capfd, tmp_path):
+    write(tmp_path, "lib.plgd", 'print("running lib"); a = 1; b = 2;')
+    main = write(
+        tmp_path, "main.plgd",
+        'from "lib.plgd" import a; from "lib.plgd" import b; import "lib.plgd"; print(a + b);',
+    )
+    pgp, out = run_file(capfd, main)
+    assert out == "running lib\n3\n"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_module_runs_in_scope_of_its_own(capfd, tmp_path, backend):
+    write(tmp_path, "lib.plgd", "counter = 5; def f(a){ return a + counter; }")
+    main = write(
+        tmp_path, "main.plgd",
+        'counter = 7; from "lib.plgd" import f; print(counter); print(f(1));',
+    )
+    pgp, out = run_file(capfd, main, backend)
+    assert out == "7\n8\n"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_module_names_independent_of_first_importer(capfd, tmp_path, backend):
+    write(tmp_path, "setter.plgd", "secret = 42;")
+    main = write(
+        tmp_path, "main.plgd",
+        'def load(){ secret = 1; import "setter.plgd"; return secret; }'
+        ' print(load()); import "setter.plgd"; print(secret);',
+    )
+    pgp, out = run_file(capfd, main, backend)
+    assert out == "42\n42\n"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_lazy_import_runs_module_on_first_use(capfd, tmp_path, backend):
+    write(tmp_path, "lib.plgd", 'print("running lib"); def f(x){ return x * 2; } a = 3;')
+    write(tmp_path, "unused.plgd", 'print("running unused"); u = 1;')
+    main = write(
+        tmp_path, "main.plgd",
+        'import "lib.plgd"; import "unused.plgd"; print("before"); print(f(a)); print(a);',
+    )
+    pgp = PlaygroundInterpreter(use_cache=False, backend=backend, lazy_imports=True)
+    pgp.interp_file(main)
+    out, err = capfd.readouterr()
+    assert out == "before\nrunning lib\n6\n3\n"
+
+    stats = pgp.import_stats()
+    lib, unused = (os.path.realpath(tmp_path / name) for name in ("lib.plgd", "unused.plgd"))
+    assert stats[os.path.normcase(lib)]["run"] > 0
+    assert stats[os.path.normcase(unused)]["run"] == 0
+    assert "u" in pgp.globals.symbols
+
+
+def test_lazy_import_unbinds_names_not_defined(capfd, tmp_path):
+    write(tmp_path, "lib.plgd", "if False { a = 1; } b = 2;")
+    main = write(tmp_path, "main.plgd", "a = 5; import \"lib.plgd\"; print(b); print(a);")
+    pgp = PlaygroundInterpreter(use_cache=False, lazy_imports=True)
+    pgp.interp_file(main)
+    out, err = capfd.readouterr()
+    assert out == "2\n5\n"
+
+
+def test_lazy_import_nested_and_overloads(capfd, tmp_path):
+    write(tmp_path, "base.plgd", "def f(a){ return 1; }")
+    write(tmp_path, "lib.plgd", 'import "base.plgd"; def g(){ return f(0); }')
+    main = write(
+        tmp_path, "main.plgd",
+        'def f(a, b){ return 2; } import "lib.plgd"; print(g(), f(0), f(0, 0));',
+    )
+    pgp = PlaygroundInterpreter(use_cache=False, lazy_imports=True)
+    pgp.interp_file(main)
+    out, err = capfd.readouterr()
+    assert out == "112\n"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_lazy_import_like_eager(capfd, tmp_path, backend):
+    write(tmp_path, "lib.plgd", "counter = 5; def f(a){ return a + counter; }")
+    main = write(
+        tmp_path, "main.plgd",
+        'import "lib.plgd"; counter = 7; print(f(1)); print(counter);',
+    )
+    assert run_eager_and_lazy(capfd, main, backend) == ("8\n7\n", None)
+
+    main = write(
+        tmp_path, "main.plgd",
+        'import "lib.plgd"; def f(a, b){ return a * b; } print(f(2, 3)); print(f(1));',
+    )
+    assert run_eager_and_lazy(capfd, main, backend) == ("6\n6\n", None)
+
+    main = write(tmp_path, "main.plgd", 'from "lib.plgd" import f, nothere; print("after");')
+    out, error = run_eager_and_lazy(capfd, main, backend)
+    assert error == (ImportError, "Module lib.plgd does not define nothere")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_lazy_import_cycle_like_eager(capfd, tmp_path, backend):
+    write(tmp_path, "a.plgd", 'import "b.plgd"; def fa(){ 1; }')
+    write(tmp_path, "b.plgd", 'from "a.plgd" import fa; def fb(){ 2; }')
+    main = write(tmp_path, "main.plgd", 'import "a.plgd"; print("after");')
+    out, error = run_eager_and_lazy(capfd, main, backend)
+    assert error == (ImportError, "Import cycle: a.plgd -> b.plgd -> a.plgd")
+
+    main = write(tmp_path, "self.plgd", 'import "self.plgd"; print("after");')
+    out, error = run_eager_and_lazy(capfd, main, backend)
+    assert error == (ImportError, "Import cycle: self.plgd -> self.plgd")
+
+
+def test_defining_overload_leaves_module_alone(capfd, tmp_path):
+    lib = write(tmp_path, "lib.plgd", "def f(a){ return 1; }")
+    main = write(tmp_path, "main.plgd", 'import "lib.plgd"; def f(a, b){ return 2; } print(f(0, 0));')
+    for lazy_imports in (False, True):
+        pgp = PlaygroundInterpreter(use_cache=False, lazy_imports=lazy_imports)
+        pgp.interp_file(main)
+        out, err = capfd.readouterr()
+        assert out == "2\n"
+        module = pgp.modules.get(os.path.normcase(os.path.realpath(lib)))
+        assert list(module.scope.symbols["f"]) == [1]
@@ -0,0 +1,179 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+import pytest
+from playground_parser import PlaygroundParser
+from playground_token import PG_Type as PGT
+from playground_nodes import (
+    from_pg_ast,
+    to_pg_ast,
+    Block,
+    Literal,
+    Name,
+    BinOp,
+    Dot,
+    Call,
+    Assign,
+    If,
+    While,
+    FuncDef,
+    ClassDef,
+    Return,
+    Print,
+    Import,
+    FromImport,
+)
+
+PROGRAM = """
+import "lib.plgd";
+a = 5 + 2 * 3;
+b = 2.5; c = "str"; d = True and not_a_keyword or False;
+print(a, b);
+print();
+foo(a, 1);
+if (a > 5) { print(a); } elif (a == 5) { b = 1; } else { b = 2; }
+while (a > 0) { a = a - 1; }
+def add(x, y){ return x + y; }
+Class Point {
+    x; y = 0;
+    def Point(x, y){ this.x = x; this.y = y; }
+    def to_str(){ return str(x); }
+}
+p = Point(1, 2);
+p.x = 5;
+print(p.to_str(), p.x, Outer.Inner.a);
+"""
+
+
+def parse(input_str):
+    pgp = PlaygroundParser(input_str=input_str)
+    pgp.testing = True
+    return pgp.program()
+
+
+def tree_shape(t):
+    token = (t.token.type, t.token.text) if t.token is not None else None
+    return (token, t.name, [tree_shape(child) for child in t.children])
+
+
+def test_node_types():
+    root = from_pg_ast(parse(PROGRAM))
+    assert type(root) is Block
+    kinds = [type(statement) for statement in root.statements]
+    assert kinds == [
+        Import, Assign, Assign, Assign, Assign, Print, Print, Call,
+        If, While, FuncDef, ClassDef, Assign, Assign, Print,
+    ]
+
+    imp, assign = root.statements[0], root.statements[1]
+    assert imp.path == "lib.plgd"
+    assert type(assign.target) is Name and assign.target.name == "a"
+    assert type(assign.value) is BinOp and assign.value.op is PGT.PLUS
+    assert assign.value.right.op is PGT.STAR
+
+    if_stat = root.statements[8]
+    assert type(if_stat.orelse) is If
+    assert type(if_stat.orelse.orelse) is Block
+
+    func_def = root.statements[10]
+    assert func_def.name == "add" and func_def.params == ("x", "y")
+    assert type(func_def.body.statements[0]) is Return
+
+    class_def = root.statements[11]
+    assert class_def.name == "Point"
+    assert [type(s) for s in class_def.body.statements] == [Name, Assign, FuncDef, FuncDef]
+
+    last_print = root.statements[14]
+    method_call, field, chained = last_print.args
+    assert type(method_call) is Dot and type(method_call.rhs) is Call
+    assert type(field.rhs) is Name
+    assert type(chained.rhs) is Dot
+
+
+def test_literal_values():
+    root = from_pg_ast(parse('print(1, 2.5, "s", True, False);'))
+    args = root.statements[0].args
+    assert [arg.value for arg in args] == [1, 2.5, "s", True, False]
+    assert all(type(arg) is Literal for arg in args)
+
+
+def test_leaves_are_compact():
+    root = from_pg_ast(parse("a; 1;"))
+    for leaf in root.statements:
+        assert not hasattr(leaf, "__dict__")
+        assert not hasattr(leaf, "children")
+        assert list(leaf.child_nodes()) == []
+
+
+def test_child_nodes():
+    root = from_pg_ast(parse("if (a) { b; } else { c; }"))
+    test, body, orelse = root.statements[0].child_nodes()
+    assert test.name == "a"
+    assert body.statements[0].name == "b"
+    assert orelse.statements[0].name == "c"
+
+
+def test_tokens_kept():
+    root = from_pg_ast(parse("a = 1;\nb = a + 2;"))
+    plus = root.statements[1].value
+    assert (plus.token.line, plus.token.column) == (2, 7)
+
+
+def test_round_trip():
+    pg_ast = parse(PROGRAM)
+    assert tree_shape(to_pg_ast(from_pg_ast(pg_ast))) == tree_shape(pg_ast)
+
+
+def test_from_import():
+    pg_ast = parse('from "lib.plgd" import a, f;')
+    imp = from_pg_ast(pg_ast).statements[0]
+    assert type(imp) is FromImport
+    assert imp.path == "lib.plgd" and imp.names == ("a", "f")
+    assert tree_shape(to_pg_ast(from_pg_ast(pg_ast))) == tree_shape(pg_ast)
+
+
+def test_memo_def():
+    pg_ast = parse("memo def f(a){ return a; } def g(){ }")
+    memo_def, func_def = from_pg_ast(pg_ast).statements
+    assert memo_def.memo.type is PGT.MEMO and func_def.memo is None
+    assert tree_shape(to_pg_ast(from_pg_ast(pg_ast))) == tree_shape(pg_ast)
+
+
+def test_dot_without_rhs():
+    pg_ast = parse("x = a.;")
+    dot = from_pg_ast(pg_ast).statements[0].value
+    assert type(dot) is Dot and dot.rhs is None
+    lhs, rhs = to_pg_ast(from_pg_ast(pg_ast)).children[0].children[1].children
+    assert lhs.token.text == "a" and rhs is None
+
+
+def test_literals_back_to_pg_literal():
+    from playground_ast import PG_Literal
+
+    pg_ast = parse('a = 1; b = "s";')
+    plain = to_pg_ast(from_pg_ast(pg_ast))
+    assert type(plain.children[0].children[1]) is not PG_Literal
+    materialized = to_pg_ast(from_pg_ast(pg_ast), literals=True)
+    assert [rhs.children[1].value for rhs in materialized.children] == [1, "s"]
+    assert tree_shape(materialized) == tree_shape(pg_ast)
+
+
+def test_round_trip_runs(capfd):
+    from playground_interpreter import PlaygroundInterpreter
+
+    program = """
+    def fact(n){ r = 1; while (n > 1) { r = r * n; n = n - 1; } return r; }
+    print(fact(5));
+    """
+    PI = PlaygroundInterpreter()
+    PI._program(to_pg_ast(from_pg_ast(parse(program))))
+    out, err = capfd.readouterr()
+    assert out == "120\n"
+
+
+def test_unconvertible():
+    from playground_ast import PG_AST
+
+    with pytest.raises(ValueError):
+        from_pg_ast(PG_AST(artificial=True, name="$NOT_A_NODE"))
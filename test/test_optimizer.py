@@ -0,0 +1,256 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+from itertools import combinations
+
+import pytest
+from playground_parser import PlaygroundParser
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from playground_optimizer import PlaygroundOptimizer, DEFAULT_PASSES
+from playground_ast import PG_Literal, PG_Block, SCOPE_ELIDED, SCOPE_REUSED
+from playground_token import PG_Type as PGT
+
+
+def parse(input_str):
+    pgp = PlaygroundParser(input_str=input_str)
+    pgp.testing = True
+    return pgp.program()
+
+
+def optimize(input_str, passes=DEFAULT_PASSES):
+    optimizer = PlaygroundOptimizer(passes)
+    return optimizer.optimize(parse(input_str)), optimizer.stats
+
+
+def rhs(root, index=0):
+    return root.children[index].children[1]
+
+
+def test_parsed_tree_left_alone():
+    root = parse("a = 1 + 2; if (True) { b = 3; }")
+    optimized = PlaygroundOptimizer().optimize(root)
+    assert root.children[0].children[1].token.type is PGT.PLUS
+    assert root.children[1].token.type is PGT.IF
+    assert optimized.children[0].children[1].value == 3
+
+
+def test_unknown_pass():
+    with pytest.raises(ValueError):
+        PlaygroundOptimizer(["no_such_pass"])
+
+
+def test_fold_constants():
+    root, stats = optimize("a = 5 * (3 + 2); b = 7 / 2; c = 1 < 2; d = \"ab\" + \"c\";")
+    assert [rhs(root, i).value for i in range(4)] == [25, 3.5, True, "abc"]
+    assert type(rhs(root, 1)) is PG_Literal
+    assert rhs(root, 2).token.type is PGT.TRUE
+    assert stats["fold_constants"] == 5
+
+
+def test_fold_without_materializing():
+    root, stats = optimize("a = 0.1 + 0.2;", passes=["fold_constants"])
+    folded = rhs(root)
+    assert type(folded) is not PG_Literal
+    assert folded.token.type is PGT.FLOAT
+    assert float(folded.token.text) == 0.1 + 0.2
+
+
+def test_no_fold():
+    # Errors are left to happen at run time; names are never constant
+    root, stats = optimize("a = 1 / 0; b = x + 1; c = \"a\" + 1;")
+    assert [rhs(root, i).token.type for i in range(3)] == [PGT.FSLASH, PGT.PLUS, PGT.PLUS]
+    assert stats["fold_constants"] == 0
+
+
+def test_fold_and_or():
+    root, stats = optimize("a = False and x; b = 1 or x; c = True and 0; d = x or True;")
+    assert rhs(root, 0).value is False
+    assert rhs(root, 1).value is True
+    assert rhs(root, 2).value is False
+    assert rhs(root, 3).token.type is PGT.OR
+
+
+def test_prune_branches():
+    root, stats = optimize("""
+    if (1 > 2) { print(1); } elif (x) { print(2); } else { print(3); }
+    if (0) { print(4); } elif (True) { print(5); } else { print(6); }
+    if (False) { print(7); }
+    print(8);
+    """)
+    first, second, last = root.children
+    # The first if is left, with its elif, and moved up into its place
+    assert first.token.type is PGT.ELIF
+    assert second.name == "$STATEMENTS"
+    assert second.children[0].children[0].children[0].value == 5
+    assert last.token.type is PGT.PRINT
+    assert stats["prune_branches"] == 4
+
+
+def test_pruned_function_value(capfd):
+    in_str = """
+    def f(){ a = 1; if (False) { a = 2; } }
+    print(f());
+    """
+    root, stats = optimize(in_str)
+    assert root.children[0].children[2].children[-1].name == "$STATEMENTS"
+    PlaygroundInterpreter().interp(input_str=in_str)
+    out, err = capfd.readouterr()
+    assert out == "None\n"
+
+
+def test_class_body_statements_kept():
+    root, stats = optimize("Class A { x = 1 + 1; if (True) { print(1); } }")
+    body = root.children[0].children[1]
+    assert body.children[0].children[1].value == 2
+    assert body.children[1].token.type is PGT.IF
+
+
+def test_drop_after_return():
+    in_str = "def f(){ return 1; print(2); print(3); } print(4);"
+    root, stats = optimize(in_str, passes=("fold_constants",))
+    assert len(root.children[0].children[2].children) == 3
+
+    root, stats = optimize(in_str)
+    assert len(root.children[0].children[2].children) == 1
+    assert len(root.children) == 2
+    assert stats["drop_after_return"] == 2
+
+
+def scope(t):
+    return t.scope if type(t) is PG_Block else None
+
+
+def test_elide_scopes():
+    in_str = """
+    def f(n){ t = 0; while (n > 0) { t = t + n; n = n - 1; } return t; }
+    def g(n){ while (n > 0) { k = n * 2; n = n - 1; } }
+    x = 1;
+    if (x) { x = x + 1; } else { y = 2; }
+    { x = 3; z = x; }
+    """
+    root, stats = optimize(in_str)
+    f, g = root.children[0], root.children[1]
+    # f binds t in its body scope; its loop body rebinds t and n
+    assert scope(f.children[2]) is None
+    assert scope(f.children[2].children[1].children[1]) is SCOPE_ELIDED
+    # g's body binds nothing but its parameter; its loop body binds k
+    assert scope(g.children[2]) is SCOPE_ELIDED
+    assert scope(g.children[2].children[0].children[1]) is SCOPE_REUSED
+    conditional = root.children[3]
+    assert scope(conditional.children[1]) is SCOPE_ELIDED
+    assert scope(conditional.children[2]) is None
+    assert scope(root.children[4]) is None
+    assert stats["elide_scopes"] == 4
+
+
+def test_elide_scopes_names_not_known():
+    # Names bound outside the function, or in a block that has ended,
+    # may not be there when the assignment runs
+    in_str = """
+    a = 1;
+    def f(){ a = 2; }
+    if (a) { b = 1; } { b = 2; }
+    """
+    root, stats = optimize(in_str)
+    assert scope(root.children[1].children[2]) is None
+    assert scope(root.children[3]) is None
+    assert stats["elide_scopes"] == 0
+
+
+ELIDE_PROGRAM = """
+def count(n){
+    t = 0;
+    while (n > 0) {
+        k = n * 2;
+        if (k > 6) { t = t + k; } else { m = k; t = t - m; }
+        n = n - 1;
+    }
+    return t;
+}
+def find(n){
+    i = 0;
+    while (i < n) {
+        j = i * i;
+        if (j > 10) { return j; }
+        i = i + 1;
+    }
+    return 0 - 1;
+}
+def inner(){ return 5; }
+def loop_defs(n){
+    t = 0;
+    while (n > 0) { def inner(){ return 1; } t = t + inner(); n = n - 1; }
+    return t + inner();
+}
+x = 1;
+{ x = x + 1; y = 2; }
+print(count(5), find(20), find(2), loop_defs(3), x);
+print(y);
+"""
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_elided_scopes_same_output(capfd, backend):
+    without = [name for name in DEFAULT_PASSES if name != "elide_scopes"]
+    outputs = []
+    for passes in (without, DEFAULT_PASSES):
+        PI = PlaygroundInterpreter(backend=backend, passes=passes)
+        with pytest.raises(NameError):
+            PI.interp(input_str=ELIDE_PROGRAM)
+        out, err = capfd.readouterr()
+        outputs.append(out)
+    assert outputs[0] == outputs[1] == "616-182\n"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_elided_scopes_pushed(capfd, backend):
+    in_str = """
+    def f(n){ t = 0; while (n > 0) { k = n; t = t + k; n = n - 1; } return t; }
+    print(f(10));
+    """
+    pushed = []
+    for passes in ([], ["elide_scopes"]):
+        PI = PlaygroundInterpreter(backend=backend, passes=passes)
+        push_scope = PI._push_scope
+
+        def counting_push_scope(*args, push_scope=push_scope, **kwargs):
+            pushed[-1] += 1
+            push_scope(*args, **kwargs)
+
+        pushed.append(0)
+        PI._push_scope = counting_push_scope
+        PI.interp(input_str=in_str)
+        out, err = capfd.readouterr()
+        assert out == "55\n"
+        assert PI.current_space is PI.globals
+    # The function scope, the body's, and one for each iteration; then a
+    # single one for the whole loop
+    assert pushed == [12, 3]
+
+
+PROGRAM = """
+def f(n){
+    r = n * (2 + 3);
+    if (1 == 1 and n > 2) { r = r + 1; } elif (False) { r = 0; } else { r = r - 1; }
+    r;
+}
+Class C { v = "c" + "d"; def get(){ return v + str(10 / 4); } }
+c = C();
+print(f(1), f(3), c.get(), 7 % 3, 2 >= 2.0, True or x);
+if (0) { print("no"); }
+"""
+
+
+def test_same_output_with_any_passes(capfd):
+    expected = None
+    for count in range(len(DEFAULT_PASSES) + 1):
+        for passes in combinations(DEFAULT_PASSES, count):
+            for backend in BACKENDS:
+                PlaygroundInterpreter(backend=backend, passes=passes).interp(
+                    input_str=PROGRAM
+                )
+                out, err = capfd.readouterr()
+                expected = out if expected is None else expected
+                assert out == expected
+    assert expected == "416cd2.51TrueTrue\n"
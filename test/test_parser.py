@@ -4,12 +4,18 @@ sys.path.append("c:\\src\\lang-playground\\playground")
 
 import pytest
 from playground_parser import PlaygroundParser, ParsingError
+from playground_token import PG_Type as PGT
 
 
-def run_pg_parser(input_str):
-    pgp = PlaygroundParser(input_str=input_str)
+def run_pg_parser(input_str, tokenize_all=True):
+    pgp = PlaygroundParser(input_str=input_str, tokenize_all=tokenize_all)
     pgp.testing = True
-    pgp.program()
+    return pgp.program()
+
+
+def tree_shape(t):
+    token = (t.token.type, t.token.text) if t.token is not None else None
+    return (token, t.name, [tree_shape(child) for child in t.children])
 
 
 # Test that parsing fails with bad input
@@ -77,3 +83,127 @@ def test_can_parse():
         run_pg_parser(input_str=input_str)
     except ParsingError:
         pytest.fail("Could not parse input")
+
+
+def test_tokenize_all_same_tree():
+    input_str = """
+            import "..\\examples\\ex_module_Point.plgd";
+            k = Point(10, 10);
+            print(k.to_str(), 5 * (3 + 2) >= 1 and True or False);
+            Class Goober {
+                a = 5;
+                def Goober(a){ this.a = a; }
+            }
+            while (a > 0) { a = a - 1; }
+            if (a) { b; } elif (c) { d; } else { e; }
+            """
+    buffered = run_pg_parser(input_str, tokenize_all=True)
+    streamed = run_pg_parser(input_str, tokenize_all=False)
+    assert tree_shape(buffered) == tree_shape(streamed)
+
+
+def test_tokenize_all_errors():
+    for input_str in ["5 + ", "(5 + 3)) * 3;", "a = ;"]:
+        for tokenize_all in [True, False]:
+            with pytest.raises(ParsingError):
+                run_pg_parser(input_str, tokenize_all=tokenize_all)
+
+
+def expr_shape(t):
+    if len(t.children) == 0:
+        return t.token.text
+    return (t.token.text, *[expr_shape(child) for child in t.children])
+
+
+def parse_expr(expr_str):
+    return expr_shape(run_pg_parser(expr_str + ";").children[0])
+
+
+def test_expr_precedence():
+    assert parse_expr("1 + 2 * 3 - 4") == ("-", ("+", "1", ("*", "2", "3")), "4")
+    assert parse_expr("2 * 2 * 2 % 3") == ("%", ("*", ("*", "2", "2"), "2"), "3")
+    assert parse_expr("a or b and c < d + e * f") == (
+        "or",
+        "a",
+        ("and", "b", ("<", "c", ("+", "d", ("*", "e", "f")))),
+    )
+    assert parse_expr("a and b or c and d") == (
+        "or",
+        ("and", "a", "b"),
+        ("and", "c", "d"),
+    )
+    assert parse_expr("(5 - 3) >= 2 + 5") == (">=", ("-", "5", "3"), ("+", "2", "5"))
+    assert parse_expr("5 * (3 + 2)") == ("*", "5", ("+", "3", "2"))
+    assert parse_expr("((1))") == "1"
+
+
+def test_expr_deeply_parenthesized():
+    depth = 5 * sys.getrecursionlimit()
+    assert parse_expr("(" * depth + "1 + 2" + ")" * depth) == ("+", "1", "2")
+
+
+def test_expr_unbalanced_parens():
+    for input_str in ["(1 + 2;", "((1 + 2);", "1 + (2 * 3;", "();"]:
+        with pytest.raises(ParsingError):
+            run_pg_parser(input_str)
+
+
+def parsing_error(input_str, tokenize_all=True):
+    with pytest.raises(ParsingError) as excinfo:
+        run_pg_parser(input_str, tokenize_all=tokenize_all)
+    return excinfo.value
+
+
+def test_error_location():
+    for tokenize_all in [True, False]:
+        error = parsing_error("a = 1;\n  b = ;", tokenize_all=tokenize_all)
+        assert (error.line, error.column) == (2, 7)
+        assert "on line 2, column 7" in str(error)
+
+
+def test_error_expected_tokens():
+    assert parsing_error("a = ;").expected == {
+        PGT.LPAREN,
+        PGT.NAME,
+        PGT.INT,
+        PGT.FLOAT,
+        PGT.STRING,
+        PGT.TRUE,
+        PGT.FALSE,
+    }
+    assert parsing_error("Class { }").expected == {PGT.NAME}
+    assert PGT.RPAREN in parsing_error("(1 + 2;").expected
+
+
+def test_error_rule_stack():
+    error = parsing_error("while (a > 0) { b = ; }")
+    assert error.rule_stack == [
+        "program",
+        "statements",
+        "statement",
+        "while_stat",
+        "block_stat",
+        "statements",
+        "statement",
+        "assign",
+        "bool_expr",
+    ]
+
+
+def test_lexing_error_is_parsing_error():
+    for tokenize_all in [True, False]:
+        error = parsing_error("a = 1;\nb = 5 $ 3;", tokenize_all=tokenize_all)
+        assert (error.line, error.column) == (2, 7)
+
+
+def test_from_import():
+    root = run_pg_parser('from "lib.plgd" import a, b;')
+    from_import = root.children[0]
+    assert from_import.token.type == PGT.FROM
+    path, names = from_import.children
+    assert path.token.text == "lib.plgd"
+    assert [name.token.text for name in names.children] == ["a", "b"]
+
+    for input_str in ['from "lib.plgd" import;', 'from "lib.plgd";', "from lib import a;"]:
+        with pytest.raises(ParsingError):
+            run_pg_parser(input_str)
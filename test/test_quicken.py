@@ -0,0 +1,103 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from playground_quicken import PG_OpSite, WARMUP, MAX_DEOPTS
+from playground_ast import PG_QuickOp
+
+
+def run(capfd, in_str, adaptive=True, backend="tree"):
+    PI = PlaygroundInterpreter(backend=backend, adaptive=adaptive)
+    PI.interp(input_str=in_str)
+    out, err = capfd.readouterr()
+    return PI, out
+
+
+def test_int_loop_specializes(capfd):
+    in_str = """
+    a = 50; t = 0;
+    while (a > 0) { t = t + a % 7; a = a - 1; }
+    print(t);
+    """
+    PI, out = run(capfd, in_str)
+    assert out == "148\n"
+    assert PI.quicken_stats() == {
+        "sites": 4,
+        "specialized": 4,
+        "by_types": {"int, int": 4},
+        "generic": 0,
+        "deopts": 0,
+    }
+
+
+def test_same_output_as_generic(capfd):
+    in_str = """
+    def f(a, b){ return a * b + a / b - a % b; }
+    def g(a, b){ return a < b; }
+    i = 0;
+    while (i < 20) {
+        print(f(i + 1, 3), f(i + 0.5, 2.5), g(i, 10), g("a", "b"), "x" + "y", True + i, i * "ab" == "");
+        i = i + 1;
+    }
+    """
+    PI, adaptive_out = run(capfd, in_str)
+    PI, generic_out = run(capfd, in_str, adaptive=False)
+    assert adaptive_out == generic_out
+
+
+def test_deopt_and_respecialize(capfd):
+    in_str = """
+    def add(a, b){ return a + b; }
+    i = 0; t = 0;
+    while (i < 10) { t = add(t, 1); i = i + 1; }
+    t = 0.5;
+    while (i < 20) { t = add(t, 1.5); i = i + 1; }
+    print(t);
+    """
+    PI, out = run(capfd, in_str)
+    assert out == "15.5\n"
+    stats = PI.quicken_stats()
+    assert stats["deopts"] == 1
+    assert stats["by_types"] == {"int, int": 4, "float, float": 1}
+
+
+def test_mixed_and_bool_operands_stay_generic(capfd):
+    in_str = """
+    i = 0; t = 0;
+    while (i < 20) { t = t + 1; t = True + t; i = i + 1; }
+    print(t);
+    """
+    PI, out = run(capfd, in_str)
+    assert out == "40\n"
+    assert PI.quicken_stats()["by_types"] == {"int, int": 3}
+
+
+def test_site_gives_up_after_deopts():
+    site = PG_OpSite(lambda a, b: a + b)
+    for n in range(MAX_DEOPTS):
+        for _ in range(WARMUP):
+            assert site.miss(1, 2) == 3
+        assert site.specialized
+        assert site.miss(1.0, 2.0) == 3.0
+        assert not site.specialized
+    assert site.generic
+    for _ in range(2 * WARMUP):
+        site.miss(1, 2)
+    assert not site.specialized and site.deopts == MAX_DEOPTS
+
+
+def test_other_backends_not_quickened(capfd):
+    in_str = "a = 1; while (a < 10) { a = a + 1; } print(a);"
+    for backend in BACKENDS[1:]:
+        PI, out = run(capfd, in_str, backend=backend)
+        assert out == "10\n"
+        assert PI.quicken_stats()["sites"] == 0
+
+
+def test_quickened_nodes_in_tree(capfd):
+    PI, out = run(capfd, "def f(a){ return a + 1 < 3; } print(f(1));")
+    assert out == "True\n"
+    func = PI.globals.resolve("f")[1]
+    cmp = func.code.children[0].children[0]
+    assert type(cmp) is PG_QuickOp and type(cmp.children[0]) is PG_QuickOp
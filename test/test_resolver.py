@@ -0,0 +1,85 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+from playground_parser import PlaygroundParser
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from test_interpreter import run_backends
+from playground_resolver import resolve_function, binds_only_params
+
+
+def parse_def(input_str, index=0):
+    pgp = PlaygroundParser(input_str=input_str)
+    pgp.testing = True
+    return pgp.program().children[index]
+
+
+def addressed(t, class_name=None):
+    return [
+        (name.token.text, depth, slot)
+        for name, (depth, slot) in resolve_function(t, class_name).items()
+    ]
+
+
+def test_params_in_body():
+    t = parse_def("def f(a, b){ c = a + b; a = c; }")
+    assert addressed(t) == [("a", 1, 0), ("b", 1, 1), ("a", 1, 0)]
+
+
+def test_depth_counts_blocks():
+    t = parse_def("def f(a){ if (a > 1) { while (a < 5) { a = a + 1; } } }")
+    assert addressed(t) == [("a", 1, 0), ("a", 2, 0), ("a", 3, 0), ("a", 3, 0)]
+
+
+def test_call_args_and_dotted_lhs():
+    t = parse_def("def f(a, p){ g(a); print(p.x, p.to_str(a)); }")
+    # Arguments of a dotted call are evaluated with 'p' pushed as a scope
+    assert addressed(t) == [("a", 1, 0), ("p", 1, 1), ("p", 1, 1)]
+
+
+def test_no_addresses():
+    assert addressed(parse_def("def f(){ a = 1; }")) == []
+    assert addressed(parse_def('def f(a){ import "m.plgd"; print(a); }')) == []
+    assert addressed(parse_def("def f(a){ Class A { x = 1; } print(a); }")) == []
+
+    t = parse_def("Class P { def P(x){ this.x = x; } }")
+    constructor = t.children[1].children[0]
+    assert addressed(constructor, "P") == []
+
+
+def test_shadowing_def():
+    t = parse_def("def f(a, b){ def a(){ 1; } print(a, b); }")
+    assert addressed(t) == [("b", 1, 1)]
+
+
+def test_dynamic_write_to_param(capfd):
+    in_str = """
+    def bump(){ n = n + 1; }
+    def f(n){ bump(); print(n); n = n * 10; bump(); print(n); }
+    f(1);
+    """
+    assert run_backends(capfd, in_str) == ["2\n21\n"] * len(BACKENDS)
+
+
+def test_method_params(capfd):
+    in_str = """
+    Class Point {
+        x; y;
+        def Point(x, y){ this.x = x; this.y = y; }
+        def Add(a){ Point(x + a.x, y + a.y); }
+        def to_str(){ return "(" + str(x) + ", " + str(y) + ")"; }
+    }
+    def sum(a, b, n){ while (n > 0) { a = a.Add(b); n = n - 1; } a; }
+    p = sum(Point(1, 2), Point(10, 20), 3);
+    print(p.to_str());
+    """
+    assert run_backends(capfd, in_str) == ["(31, 62)\n"] * len(BACKENDS)
+
+
+def test_binds_only_params():
+    assert binds_only_params(parse_def("def f(a){ a = a + 1; while (a < 3) { a = g(a); } }"))
+    assert binds_only_params(parse_def("def f(a){ this.b = a; }"))
+    assert not binds_only_params(parse_def("def f(a){ b = a; }"))
+    assert not binds_only_params(parse_def("def f(a){ def g(){ 1; } }"))
+    assert not binds_only_params(parse_def('def f(a){ import "m.plgd"; }'))
+    assert not binds_only_params(parse_def("def A(a){ 1; }"), class_name="A")
@@ -0,0 +1,70 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+from playground_interpreter import PlaygroundInterpreter, BACKENDS
+from test_interpreter import run_backends
+
+
+def test_return_from_loop(capfd):
+    in_str = """
+    def first_multiple(n, k){
+        i = 1;
+        while (i < n) {
+            if (i % k == 0) { return i; }
+            i = i + 1;
+        }
+        return 0;
+    }
+    def count(){ n = 0; while (True) { n = n + 1; if (n == 3) { return n; } } }
+    print(first_multiple(100, 7), first_multiple(5, 7), count());
+    """
+    tree_out, closure_out, vm_out = run_backends(capfd, in_str, ends_in_globals=True)
+    assert tree_out == closure_out == vm_out == "703\n"
+
+
+def test_statements_after_return_do_not_run(capfd):
+    in_str = """
+    def f(a){ if (a > 1) { print("big"); return 1; print("no"); } print("small"); return 2; print("no"); }
+    print(f(5));
+    print(f(0));
+    """
+    tree_out, closure_out, vm_out = run_backends(capfd, in_str, ends_in_globals=True)
+    assert tree_out == closure_out == vm_out == "big\n1\nsmall\n2\n"
+
+
+def test_recursion(capfd):
+    in_str = """
+    def fact(n){ if (n < 2) { return 1; } return n * fact(n - 1); }
+    def fib(n){ if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+    print(fact(6), fib(10));
+    """
+    tree_out, closure_out, vm_out = run_backends(capfd, in_str, ends_in_globals=True)
+    assert tree_out == closure_out == vm_out == "72055\n"
+
+
+def test_return_in_constructor_and_method(capfd):
+    in_str = """
+    Class P {
+        x = 0; y = 0;
+        def P(a){ x = a; if (a > 5) { return 0; } y = a; }
+        def get(){ while (True) { return x + y; } }
+    }
+    p = P(3);
+    q = P(9);
+    print(p.get(), q.get(), q.y);
+    """
+    tree_out, closure_out, vm_out = run_backends(capfd, in_str, ends_in_globals=True)
+    assert tree_out == closure_out == vm_out == "690\n"
+
+
+def test_return_outside_function(capfd):
+    in_str = """
+    Class A { a = 1; return 0; b = 2; }
+    x = A();
+    print(x.a, x.attrs);
+    return 5;
+    print("no");
+    """
+    tree_out, closure_out, vm_out = run_backends(capfd, in_str, ends_in_globals=True)
+    assert tree_out == closure_out == vm_out == "1{'a': 1}\n"
@@ -0,0 +1,153 @@
+import sys
+
+sys.path.append("c:\\src\\lang-playground\\playground")
+
+from playground_parser import PlaygroundParser
+from playground_interpreter import PlaygroundInterpreter
+from playground_bytecode import BytecodeCompiler, PG_Code, disassemble
+import playground_bytecode as bc
+
+
+def compile_program(input_str):
+    pgp = PlaygroundParser(input_str=input_str)
+    pgp.testing = True
+    return BytecodeCompiler(PlaygroundInterpreter().is_function_call).compile_program(
+        pgp.program()
+    )
+
+
+def opnames(code):
+    return [bc.OPNAMES[op] for op in code.ops[::2]]
+
+
+def run_vm(capfd, in_str):
+    PI = PlaygroundInterpreter(backend="vm")
+    PI.interp(input_str=in_str)
+    out, err = capfd.readouterr()
+    return PI, out
+
+
+def test_compile_expression():
+    code = compile_program("a = 1 + b * 2;")
+    assert opnames(code) == [
+        "LOAD_CONST", "LOAD_NAME", "LOAD_CONST", "BINARY_MUL", "BINARY_ADD",
+        "STORE_NAME", "LOAD_CONST", "RETURN_VALUE",
+    ]
+    assert code.names == ["b", "a"]
+    assert code.consts == [1, 2, None]
+
+
+def test_constants_told_apart_by_type():
+    code = compile_program("print(1, 1.0, True);")
+    assert [type(c) for c in code.consts[:3]] == [int, float, bool]
+
+
+def test_while_jumps():
+    code = compile_program("while (a < 3) { a = a + 1; }")
+    ops = code.ops
+    jump_at = opnames(code).index("JUMP") * 2
+    exit_at = opnames(code).index("POP_JUMP_IF_FALSE") * 2
+    assert ops[jump_at + 1] == 0
+    assert ops[exit_at + 1] == jump_at + 2
+
+
+def test_function_body_is_nested_code():
+    code = compile_program("def add(a, b){ return a + b; }")
+    function_code = code.consts[code.ops[1]]
+    assert function_code.params == ["a", "b"]
+    assert type(function_code.body) is PG_Code
+    assert opnames(function_code.body) == [
+        "PUSH_SCOPE", "LOAD_LOCAL", "LOAD_LOCAL", "BINARY_ADD", "POP_SCOPE",
+        "RETURN_VALUE",
+    ]
+
+
+def test_disassemble():
+    listing = disassemble(compile_program("""
+    Class Point { x = 0; def Point(x){ this.x = x; } }
+    p = Point(1);
+    print(p.x);
+    """))
+    assert "Disassembly of <program>:" in listing
+    assert "Disassembly of Point:" in listing
+    assert "CLASS_DEF" in listing and "MAKE_METHOD" in listing
+    assert "CALL" in listing and "(Point/1)" in listing
+    assert "STORE_DOTTED" in listing and "(this.x = ...)" in listing
+    assert "LOAD_FIELD" in listing and "(p.x)" in listing
+
+
+def test_arity_overloads(capfd):
+    PI, out = run_vm(capfd, """
+    def f(){ return 0; }
+    def f(a){ return a; }
+    def f(a, b){ return a + b; }
+    print(f(), f(1), f(1, 2));
+    """)
+    assert out.strip() == "013"
+    assert sorted(PI.globals.symbols["f"]) == [0, 1, 2]
+
+
+def test_constructors_and_this(capfd):
+    PI, out = run_vm(capfd, """
+    Class Counter {
+        count = 0;
+        def Counter(start){ this.count = start; }
+        def add(k){ this.count = count + k; return this.count; }
+    }
+    c = Counter(5);
+    c.add(2);
+    print(c.add(3), " ", c.count);
+    """)
+    assert out.strip() == "10 10"
+
+
+def test_frames_unwound(capfd):
+    PI, out = run_vm(capfd, "def f(n){ r = n; if (n > 0) { r = f(n - 1); } return r; } print(f(5));")
+    assert out.strip() == "0"
+    assert PI.vm.frames == []
+    assert PI.current_space is PI.globals
+
+
+def test_deep_recursion(capfd):
+    # Calls of compiled functions don't recurse in Python
+    PI, out = run_vm(capfd, "def depth(n){ if (n == 0) { return 0; } return 1 + depth(n - 1); } print(depth(1000));")
+    assert out.strip() == "1000"
+    assert PI.vm.frames == []
+    assert PI.current_space is PI.globals
+
+
+def test_tail_calls_reuse_frame(capfd):
+    PI, out = run_vm(capfd, """
+    def sum(n, acc){ if (n == 0) { return acc; } return sum(n - 1, acc + n); }
+    def even(n){ if (n == 0) { return True; } return odd(n - 1); }
+    def odd(n){ if (n == 0) { return False; } return even(n - 1); }
+    print(sum(20000, 0), even(5001));
+    """)
+    assert out.strip() == "200010000False"
+    assert PI.vm.tail_calls == 20000 + 5001
+    assert PI.current_space is PI.globals
+
+
+def test_tail_calls_keep_dynamic_scope(capfd):
+    # The callees see names bound in their callers' scopes, so those calls
+    # keep their frames
+    PI, out = run_vm(capfd, """
+    def g(){ return x; }
+    def f(n){ x = n; return g(); }
+    def k(a){ return b; }
+    def h(a, b){ return k(a); }
+    print(f(3), h(1, 2));
+    """)
+    assert out.strip() == "32"
+    assert PI.vm.tail_calls == 0
+
+
+def test_compile_tail_call():
+    code = compile_program("def f(n){ if (n > 0) { return f(n - 1); } return n; }")
+    body = code.consts[code.ops[1]].body
+    assert "TAIL_CALL" in opnames(body)
+    assert "(1 scopes)" not in disassemble(body)
+    assert "(2 scopes)" in disassemble(body)
+
+    code = compile_program("def f(n){ m = n; return f(m); }")
+    assert "TAIL_CALL" not in opnames(code.consts[code.ops[1]].body)